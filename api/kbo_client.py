@@ -0,0 +1,173 @@
+# kbo_client.py
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from config.config import settings
+from utils.cache import TTLCache, SingleFlight
+from utils.metrics import stage_timer
+
+KST = ZoneInfo("Asia/Seoul")
+
+# 업스트림 경기 상태 코드
+STATUS_BEFORE = "BEFORE"
+STATUS_STARTED = "STARTED"
+FINISHED_STATUSES = {"RESULT", "CANCEL"}
+
+def _seconds_until(game_date_time: Optional[str]) -> Optional[float]:
+    """경기 시작 시각(KST, ISO 형식)까지 남은 초"""
+    if not game_date_time:
+        return None
+    try:
+        start = datetime.fromisoformat(game_date_time)
+    except ValueError:
+        return None
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=KST)
+    return (start - datetime.now(KST)).total_seconds()
+
+def _ttl_for_games(games: list) -> float:
+    """경기 상태에 따른 캐시 TTL: 종료 경기는 길게, 진행 중 경기는 짧게, 시작 전은 첫 투구까지"""
+    statuses = {game.get("statusCode") for game in games}
+    if STATUS_STARTED in statuses:
+        return settings.kbo_live_ttl
+    if not games or statuses <= FINISHED_STATUSES:
+        return settings.kbo_finished_ttl
+
+    starts = [
+        _seconds_until(game.get("gameDateTime"))
+        for game in games
+        if game.get("statusCode") not in FINISHED_STATUSES
+    ]
+    starts = [s for s in starts if s is not None]
+    if not starts:
+        return settings.kbo_live_ttl
+    # 시작 시각이 지났는데 아직 BEFORE면 곧 상태가 바뀌므로 짧게
+    return max(settings.kbo_live_ttl, min(min(starts), settings.kbo_before_ttl))
+
+def schedule_ttl(data: Dict[str, Any]) -> float:
+    return _ttl_for_games(data.get("result", {}).get("games", []))
+
+def preview_ttl(data: Dict[str, Any]) -> float:
+    preview = data.get("result", {}).get("previewData", {})
+    game_info = preview.get("gameInfo") or {}
+    status = game_info.get("statusCode")
+    if status in FINISHED_STATUSES:
+        return settings.kbo_finished_ttl
+    if status == STATUS_STARTED:
+        return settings.kbo_live_ttl
+    until_start = _seconds_until(game_info.get("gameDateTime"))
+    if until_start is None:
+        return settings.kbo_before_ttl
+    # 프리뷰는 첫 투구 전까지 유효
+    return max(settings.kbo_live_ttl, until_start)
+
+class KboClient:
+    """KBO 일정/프리뷰 API 비동기 클라이언트
+
+    - 연결 풀을 재사용하는 httpx.AsyncClient
+    - 경기 상태별 TTL 응답 캐시
+    - 같은 요청의 동시 호출 병합
+    - 만료 직후에는 이전 응답을 바로 돌려주고 백그라운드에서 갱신(stale-while-revalidate),
+      업스트림 오류 시에도 이전 응답으로 폴백
+
+    base_url/transport를 바꿔 로컬 가짜 서버나 httpx.MockTransport로 테스트할 수 있다.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = None,
+        max_connections: int = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout if timeout is not None else settings.kbo_timeout
+        self.max_connections = max_connections or settings.kbo_max_connections
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache = TTLCache(maxsize=settings.kbo_cache_size, stale_ttl=settings.kbo_stale_ttl)
+        self._inflight = SingleFlight()
+        self._background: set[asyncio.Task] = set()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        for task in list(self._background):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def cache_stats(self) -> dict:
+        return self._cache.stats()
+
+    async def get_schedule(self, date: str) -> Dict[str, Any]:
+        params = {
+            "fields": "basic,schedule,baseball",
+            "upperCategoryId": "kbaseball",
+            "fromDate": date,
+            "toDate": date,
+            "size": 500
+        }
+        return await self._get("", params, schedule_ttl)
+
+    async def get_preview(self, game_id: str) -> Dict[str, Any]:
+        return await self._get(f"/{game_id}/preview", None, preview_ttl)
+
+    async def _get(self, path: str, params: Optional[dict], ttl_func: Callable[[dict], float]) -> Dict[str, Any]:
+        key = (path, tuple(sorted((params or {}).items())))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        stale = self._cache.get_stale(key)
+        if stale is not None:
+            # 이전 응답으로 즉시 응답하고 갱신은 백그라운드에서 (중복 갱신은 병합)
+            if not self._inflight.in_flight(key):
+                task = asyncio.ensure_future(self._revalidate(key, path, params, ttl_func))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return stale
+
+        return await self._inflight.do(key, lambda: self._fetch(key, path, params, ttl_func))
+
+    async def _revalidate(self, key, path, params, ttl_func):
+        try:
+            await self._inflight.do(key, lambda: self._fetch(key, path, params, ttl_func))
+        except (httpx.HTTPError, ValueError) as e:
+            logging.warning("KBO API 백그라운드 갱신 실패 (%s): %s", path or "/", e)
+
+    async def _fetch(self, key, path, params, ttl_func) -> Dict[str, Any]:
+        try:
+            with stage_timer("kbo_api"):
+                response = await self._get_client().get(f"{self.base_url}{path}", params=params)
+                response.raise_for_status()
+                data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError: 200 응답이지만 본문이 JSON이 아님 (점검/오류 HTML 페이지 등)
+            stale = self._cache.get_stale(key)
+            if stale is not None:
+                logging.warning("KBO API 호출 실패, 이전 응답 사용 (%s): %s", path or "/", e)
+                return stale
+            raise
+
+        self._cache.set(key, data, ttl_func(data))
+        return data
+
+# 애플리케이션 전역 클라이언트
+kbo_client = KboClient(settings.kbo_base_url)
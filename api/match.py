@@ -1,48 +1,44 @@
-import requests
-from typing import List, Dict, Any
-from config.config import settings
-from utils.db import get_stadium_by_team_name, get_team_id_by_name, get_match_id_by_teams_and_date
+import re
+from typing import List, Dict, Any, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from api.kbo_client import STATUS_STARTED, kbo_client
+from utils.db import get_match_ids_by_date
+from utils.team_cache import get_team_by_name, get_team_id_by_name
+from simulation.win_expectancy import get_league_model
 
-base_url = settings.kbo_base_url
+# 진행 중 경기의 statusInfo 예: "7회말"
+_INNING_PATTERN = re.compile(r"(\d+)회\s*(초|말)")
 
-def get_match_info_by_date(date: str) -> List[Dict[str, Any]]:
-    params = {
-        "fields": "basic,schedule,baseball",
-        "upperCategoryId": "kbaseball",
-        "fromDate": date,
-        "toDate": date,
-        "size": 500
-    }
-    
-    response = requests.get(base_url, params=params, timeout=10)
-    if response.status_code == 200:
-        data = response.json()
-        games = data.get('result', {}).get('games', [])
-        return [
-            _process_game_info(game)
-            for game in games
-            if game.get('categoryName') == 'KBO리그'
-        ]
-    
-    response.raise_for_status()
-    
-def _process_game_info(game: Dict[str, Any]) -> Dict[str, Any]:
+async def get_match_info_by_date(date: str) -> List[Dict[str, Any]]:
+    data = await kbo_client.get_schedule(date)
+    games = [
+        game for game in data.get('result', {}).get('games', [])
+        if game.get('categoryName') == 'KBO리그'
+    ]
+    # 경기 ID를 날짜 단위로 한 번에 조회한 뒤 메모리에서 조합
+    match_ids = await run_in_threadpool(get_match_ids_by_date, date) if games else {}
+    return [_process_game_info(game, match_ids) for game in games]
+
+def _process_game_info(
+    game: Dict[str, Any],
+    match_ids: Dict[Tuple[int, int], int],
+) -> Dict[str, Any]:
     # 게임 정보를 처리하여 필요한 형태로 변환
     home_team_name = game.get('homeTeamName')
     away_team_name = game.get('awayTeamName')
     game_date_time = game.get('gameDateTime')
     
-    # 데이터베이스에서 추가 정보 조회
-    stadium = get_stadium_by_team_name(home_team_name)
-    home_team_id = get_team_id_by_name(home_team_name)
-    away_team_id = get_team_id_by_name(away_team_name)
+    # 팀/구장 정보는 참조 데이터 캐시에서 조회
+    home_team = get_team_by_name(home_team_name) or {}
+    away_team = get_team_by_name(away_team_name) or {}
+    stadium = home_team.get('stadium')
+    home_team_id = home_team.get('id')
+    away_team_id = away_team.get('id')
     
     # None 값 체크 및 경기 ID 조회
     match_id = None
     if home_team_id and away_team_id and game_date_time:
-        match_id = get_match_id_by_teams_and_date(
-            home_team_id, away_team_id, game_date_time
-        )
+        match_id = match_ids.get((home_team_id, away_team_id))
     
     return {
         'match_id': match_id,
@@ -57,71 +53,86 @@ def _process_game_info(game: Dict[str, Any]) -> Dict[str, Any]:
         'away_team_score': game.get('awayTeamScore'),
         'status_code': game.get('statusCode'),
         'winner': game.get('winner'),
+        'home_win_probability': _live_win_probability(game),
     }
 
-def get_match_preview_info(game_id):
-    url = f"{base_url}/{game_id}/preview"
-    response = requests.get(url, timeout=10)
-    if response.status_code == 200:
-        data = response.json()
-        preview = data.get("result", {}).get("previewData", {})
+def _live_win_probability(game: Dict[str, Any]) -> Optional[float]:
+    """진행 중 경기의 홈 팀 승리 확률 (리그 평균 매치업, 현재 반 이닝 시작 시점 기준)"""
+    if game.get('statusCode') != STATUS_STARTED:
+        return None
+    match = _INNING_PATTERN.search(game.get('statusInfo') or '')
+    if not match:
+        return None
+    try:
+        home_score = int(game.get('homeTeamScore') or 0)
+        away_score = int(game.get('awayTeamScore') or 0)
+    except (TypeError, ValueError):
+        return None
+    result = get_league_model().evaluate(
+        int(match.group(1)), match.group(2) == '말', 0, 0, home_score, away_score,
+    )
+    return round(result['home_win_probability'], 4)
 
-        # 최근 경기 전적(승/무/패) 계산 함수
-        def get_recent_record(games):
-            win = sum(1 for g in games if g.get("result") == "승")
-            draw = sum(1 for g in games if g.get("result") == "무")
-            lose = sum(1 for g in games if g.get("result") == "패")
-            return {"win": win, "draw": draw, "lose": lose}
+async def get_match_preview_info(game_id):
+    data = await kbo_client.get_preview(game_id)
+    preview = data.get("result", {}).get("previewData", {})
 
-        # 홈팀
-        home_recent_games = preview.get("homeTeamPreviousGames", [])
-        home_recent_record = get_recent_record(home_recent_games)
-        home_standings = preview.get("homeStandings", {})
-        home_recent_ba = home_standings.get("hra")
-        home_recent_era = home_standings.get("era")
-        home_team_name = home_standings.get("name")
-        home_team_id = get_team_id_by_name(home_team_name)
-        home_starter = preview.get("homeStarter", {}).get("playerInfo", {}).get("name")
+    # 최근 경기 전적(승/무/패) 계산 함수
+    def get_recent_record(games):
+        win = sum(1 for g in games if g.get("result") == "승")
+        draw = sum(1 for g in games if g.get("result") == "무")
+        lose = sum(1 for g in games if g.get("result") == "패")
+        return {"win": win, "draw": draw, "lose": lose}
 
-        # 어웨이팀
-        away_recent_games = preview.get("awayTeamPreviousGames", [])
-        away_recent_record = get_recent_record(away_recent_games)
-        away_standings = preview.get("awayStandings", {})
-        away_recent_ba = away_standings.get("hra")
-        away_recent_era = away_standings.get("era")
-        away_team_name = away_standings.get("name")
-        away_team_id = get_team_id_by_name(away_team_name)
-        away_starter = preview.get("awayStarter", {}).get("playerInfo", {}).get("name")
+    # 홈팀
+    home_recent_games = preview.get("homeTeamPreviousGames", [])
+    home_recent_record = get_recent_record(home_recent_games)
+    home_standings = preview.get("homeStandings", {})
+    home_recent_ba = home_standings.get("hra")
+    home_recent_era = home_standings.get("era")
+    home_team_name = home_standings.get("name")
+    home_starter = preview.get("homeStarter", {}).get("playerInfo", {}).get("name")
 
-        # 상대 전적
-        season_vs = preview.get("seasonVsResult", {})
-        season_vs_result = {
-            "home_win": season_vs.get("hw"),
-            "home_draw": season_vs.get("hd"),
-            "home_lose": season_vs.get("hl"),
-            "away_win": season_vs.get("aw"),
-            "away_draw": season_vs.get("ad"),
-            "away_lose": season_vs.get("al"),
-        }
+    # 어웨이팀
+    away_recent_games = preview.get("awayTeamPreviousGames", [])
+    away_recent_record = get_recent_record(away_recent_games)
+    away_standings = preview.get("awayStandings", {})
+    away_recent_ba = away_standings.get("hra")
+    away_recent_era = away_standings.get("era")
+    away_team_name = away_standings.get("name")
+    away_starter = preview.get("awayStarter", {}).get("playerInfo", {}).get("name")
 
-        return {
-            "home": {
-                "team_id": home_team_id,
-                "team_name": home_team_name,
-                "recent_record": home_recent_record,
-                "recent_batting_average": home_recent_ba,
-                "recent_era": home_recent_era,
-                "starter": home_starter,
-            },
-            "away": {
-                "team_id": away_team_id,
-                "team_name": away_team_name,
-                "recent_record": away_recent_record,
-                "recent_batting_average": away_recent_ba,
-                "recent_era": away_recent_era,
-                "starter": away_starter,
-            },
-            "season_vs_result": season_vs_result
-        }
-    else:
-        response.raise_for_status()
+    # 양 팀 ID (참조 데이터 캐시)
+    home_team_id = get_team_id_by_name(home_team_name)
+    away_team_id = get_team_id_by_name(away_team_name)
+
+    # 상대 전적
+    season_vs = preview.get("seasonVsResult", {})
+    season_vs_result = {
+        "home_win": season_vs.get("hw"),
+        "home_draw": season_vs.get("hd"),
+        "home_lose": season_vs.get("hl"),
+        "away_win": season_vs.get("aw"),
+        "away_draw": season_vs.get("ad"),
+        "away_lose": season_vs.get("al"),
+    }
+
+    return {
+        "home": {
+            "team_id": home_team_id,
+            "team_name": home_team_name,
+            "recent_record": home_recent_record,
+            "recent_batting_average": home_recent_ba,
+            "recent_era": home_recent_era,
+            "starter": home_starter,
+        },
+        "away": {
+            "team_id": away_team_id,
+            "team_name": away_team_name,
+            "recent_record": away_recent_record,
+            "recent_batting_average": away_recent_ba,
+            "recent_era": away_recent_era,
+            "starter": away_starter,
+        },
+        "season_vs_result": season_vs_result
+    }
@@ -2,17 +2,14 @@
 import logging
 from typing import TypedDict, List, Optional
 from langgraph.graph import StateGraph, END
-from utils.model import tokenizer, model
+from utils.model import tokenizer, model, encode_prompt, timed_generate
 from utils.db import get_sqlalchemy_engine
+from utils.team_cache import get_teams
 from sqlalchemy import text
-import torch
 import json
 import re
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = logging.getLogger(__name__)
 
 # DB 연결 설정
 engine = get_sqlalchemy_engine()
@@ -180,11 +177,11 @@ class SQLAgent:
     
     def sql_generation_node(self, state: AgentState) -> AgentState:
         """SQL 쿼리 생성 노드"""
-        print(f"[SQL 생성] 질문: {state['question']}")
+        logger.info("[SQL 생성] 질문: %s", state['question'])
         
         try:
             sql_query = self._generate_sql_with_llama(state['question'])
-            print(f"[SQL 생성] 생성된 쿼리: {sql_query}")
+            logger.debug("[SQL 생성] 생성된 쿼리: %s", sql_query)
             
             return {
                 **state,
@@ -192,7 +189,7 @@ class SQLAgent:
                 "error_message": None
             }
         except Exception as e:
-            print(f"[SQL 생성] 오류: {e}")
+            logger.error("[SQL 생성] 오류: %s", e)
             return {
                 **state,
                 "error_message": f"SQL 생성 오류: {str(e)}"
@@ -226,7 +223,7 @@ class SQLAgent:
 # sql_validation_node에서 사용
     def sql_validation_node(self, state: AgentState) -> AgentState:
         """SQL 검증 및 정리 노드"""
-        print(f"[SQL 검증] 원본 쿼리: {state['sql_query']}")
+        logger.debug("[SQL 검증] 원본 쿼리: %s", state['sql_query'])
         
         try:
             # 새로운 추출 방법 사용
@@ -238,7 +235,7 @@ class SQLAgent:
                     "error_message": "유효하지 않은 SQL 쿼리"
                 }
             
-            print(f"[SQL 검증] 정리된 쿼리: {cleaned_sql}")
+            logger.info("[SQL 검증] 정리된 쿼리: %s", cleaned_sql)
             
             return {
                 **state,
@@ -246,7 +243,7 @@ class SQLAgent:
                 "error_message": None
             }
         except Exception as e:
-            print(f"[SQL 검증] 오류: {e}")
+            logger.error("[SQL 검증] 오류: %s", e)
             return {
                 **state,
                 "error_message": f"SQL 검증 오류: {str(e)}"
@@ -255,11 +252,11 @@ class SQLAgent:
     
     def sql_execution_node(self, state: AgentState) -> AgentState:
         """SQL 실행 노드"""
-        print(f"[SQL 실행] 쿼리: {state['cleaned_sql']}")
+        logger.debug("[SQL 실행] 쿼리: %s", state['cleaned_sql'])
         
         try:
             result = self._execute_sql_safely(state['cleaned_sql'])
-            print(f"[SQL 실행] 결과: {result}")
+            logger.debug("[SQL 실행] 결과: %s", result)
             
             return {
                 **state,
@@ -267,7 +264,7 @@ class SQLAgent:
                 "error_message": None
             }
         except Exception as e:
-            print(f"[SQL 실행] 오류: {e}")
+            logger.error("[SQL 실행] 오류: %s", e)
             return {
                 **state,
                 "error_message": f"SQL 실행 오류: {str(e)}"
@@ -275,7 +272,7 @@ class SQLAgent:
     
     def answer_generation_node(self, state: AgentState) -> AgentState:
         """자연어 답변 생성 노드 (폴백 강화)"""
-        print(f"[답변 생성] 시작")
+        logger.debug("[답변 생성] 시작")
         
         try:
             # 결과 검증
@@ -303,10 +300,10 @@ class SQLAgent:
                 final_answer = llm_answer.strip() 
                 
             except Exception as e:
-                print(f"[답변 생성] LLM 오류, 폴백 사용: {e}")
+                logger.warning("[답변 생성] LLM 오류, 폴백 사용: %s", e)
             
             
-            print(f"[답변 생성] 최종 답변: {final_answer}")
+            logger.info("[답변 생성] 최종 답변: %s", final_answer)
             
             return {
                 **state,
@@ -315,7 +312,7 @@ class SQLAgent:
             }
             
         except Exception as e:
-            print(f"[답변 생성] 오류: {e}")
+            logger.error("[답변 생성] 오류: %s", e)
             return {
                 **state,
                 "final_answer": "답변 생성 중 오류가 발생했습니다.",
@@ -325,7 +322,7 @@ class SQLAgent:
     
     def error_handling_node(self, state: AgentState) -> AgentState:
         """에러 처리 및 재시도 노드"""
-        print(f"[에러 처리] 재시도 횟수: {state['retry_count']}")
+        logger.warning("[에러 처리] 재시도 횟수: %s", state['retry_count'])
         
         retry_count = state.get('retry_count', 0) + 1
         
@@ -414,8 +411,7 @@ SELECT"""
         
         prompt = self._create_llama_text_to_sql_prompt(question)
         
-        inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=2048)
-        inputs = {k: v.to(model.device) for k, v in inputs.items()}
+        inputs, truncated_tokens = encode_prompt(prompt, max_length=2048)
         
         generation_config = {
             "max_new_tokens": 150,
@@ -427,8 +423,7 @@ SELECT"""
             "repetition_penalty": 1.1
         }
         
-        with torch.no_grad():
-            outputs = model.generate(**inputs, **generation_config)
+        outputs = timed_generate("chat_sql", inputs, truncated_tokens=truncated_tokens, **generation_config)
         
         full_output = tokenizer.decode(outputs[0], skip_special_tokens=True)
         return full_output
@@ -436,7 +431,7 @@ SELECT"""
     def _clean_and_validate_sql(self, sql: str) -> str:
         """생성된 SQL 정리 및 검증"""
         
-        print(f"원본 SQL: {sql}")
+        logger.debug("원본 SQL: %s", sql)
         
         sql = re.sub(r'<\|.*?\|>', '', sql)
         sql = re.sub(r'``````', '', sql, flags=re.DOTALL)
@@ -478,6 +473,11 @@ SELECT"""
     
     def _generate_natural_answer_with_llm(self, question: str, sql: str, result: str) -> str:
         
+        # 팀 ID → 팀 이름 매핑 (참조 데이터 캐시)
+        team_id_map = ", \n".join(
+            f'            "{team["id"]}": "{team["team_name"]}"' for team in get_teams()
+        )
+        
         answer_prompt = f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
 
         You are a helpful assistant that converts database query results into natural Korean answers.
@@ -489,16 +489,7 @@ SELECT"""
         쿼리 결과: {result}
         만약 matches 테이블을 이용해서 결과를 받아오면
             -team_id
-            "1": "KIA", 
-            "2": "삼성", 
-            "3": "LG", 
-            "4": "두산",
-            "5": "KT", 
-            "6": "SSG", 
-            "7": "롯데", 
-            "8": "한화",
-            "9": "NC", 
-            "10": "키움"
+{team_id_map}
         를 참고해주세요.
         
 
@@ -511,22 +502,22 @@ SELECT"""
         """
         
         try:
-            inputs = tokenizer(answer_prompt, return_tensors="pt", truncation=True, max_length=2048)
-            inputs = {k: v.to(model.device) for k, v in inputs.items()}
+            inputs, truncated_tokens = encode_prompt(answer_prompt, max_length=2048)
             
-            with torch.no_grad():
-                outputs = model.generate(
-                    **inputs,
-                    max_new_tokens=150,
-                    temperature=0.4,
-                    top_p=0.9,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id,
-                    eos_token_id=tokenizer.eos_token_id
-                )
+            outputs = timed_generate(
+                "chat_answer",
+                inputs,
+                truncated_tokens=truncated_tokens,
+                max_new_tokens=150,
+                temperature=0.4,
+                top_p=0.9,
+                do_sample=True,
+                pad_token_id=tokenizer.eos_token_id,
+                eos_token_id=tokenizer.eos_token_id
+            )
             
             full_output = tokenizer.decode(outputs[0], skip_special_tokens=True)
-            print(f"[LLM 답변] 전체 출력: {repr(full_output[-200:])}")  # 마지막 200자만
+            logger.debug("[LLM 답변] 전체 출력: %r", full_output[-200:])  # 마지막 200자만
             
             # SQL 추출과 동일한 방식으로 "assistant" 이후 추출
             if "assistant" in full_output:
@@ -539,17 +530,17 @@ SELECT"""
             answer = re.sub(r'<\|.*?\|>', '', answer)
             answer = answer.strip()
             
-            print(f"[LLM 답변] 추출된 답변: {repr(answer)}")
+            logger.debug("[LLM 답변] 추출된 답변: %r", answer)
             
             # 답변이 비어있지 않으면 반환
             if answer:
                 return answer
             else:
-                print("[LLM 답변] 빈 답변, None 반환")
+                logger.warning("[LLM 답변] 빈 답변, None 반환")
                 return ""
                 
         except Exception as e:
-            print(f"[LLM 답변] 생성 오류: {e}")
+            logger.error("[LLM 답변] 생성 오류: %s", e)
             return ""
 
 
@@ -624,7 +615,7 @@ def create_sql_agent_workflow():
 def ask_question(question: str) -> str:
     """메인 질문 처리 함수"""
     
-    print(f"질문 처리 시작: {question}")
+    logger.info("질문 처리 시작: %s", question)
     
     # 워크플로우 생성
     app = create_sql_agent_workflow()
@@ -644,10 +635,10 @@ def ask_question(question: str) -> str:
         # 워크플로우 실행
         final_state = app.invoke(initial_state)
         
-        print(f"최종 상태: {final_state}")
+        logger.debug("최종 상태: %s", final_state)
         return final_state.get("final_answer", "죄송합니다. 답변을 생성할 수 없습니다.")
         
     except Exception as e:
-        print(f"워크플로우 실행 오류: {e}")
+        logger.exception("워크플로우 실행 오류: %s", e)
         return "죄송합니다. 질문 처리 중 오류가 발생했습니다."
 
@@ -10,10 +10,44 @@ class Settings(BaseSettings):
     db_password: str
     db_database: str
     db_charset: str = "utf8mb4"
-    
+
+    # DB 연결 풀 설정
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 10       # 풀에서 연결을 기다리는 최대 시간(초)
+    db_pool_recycle: int = 1800     # 오래된 연결 재생성 주기(초)
+    db_connect_timeout: int = 5
+    db_query_timeout: int = 10      # 쿼리별 읽기/쓰기 타임아웃(초)
+
+    # 팀/구장 참조 데이터 캐시 갱신 주기(초)
+    team_cache_ttl: int = 3600
+
+    # 선수 기록 스냅샷: data_version 확인 주기 / 버전 테이블이 없을 때 재적재 주기(초)
+    player_stats_check_interval: int = 30
+    player_stats_ttl: int = 600
+
+    # 매치업별 승리 확률 표 캐시 (표 하나에 수 MB)
+    win_expectancy_cache_size: int = 16
+    win_expectancy_cache_ttl: int = 3600
+
+    # 시뮬레이션 프롬프트 캐시 (include_prompt 요청 시 로스터별)
+    simulation_prompt_cache_size: int = 256
+    simulation_prompt_cache_ttl: int = 600
+
+    # 시뮬레이션 결과 저장소 (공유/다시보기 링크 유효 기간, 만료 행 정리 주기)
+    simulation_store_ttl: int = 604800
+    simulation_store_cleanup_interval: int = 3600
+
     # 기타 설정
     hf_token: str
 
+    # 로깅 설정
+    log_level: str = "INFO"
+    log_levels: str = ""              # 모듈별 레벨 (예: "chat=DEBUG,simulation=WARNING")
+    log_json: bool = True
+    log_max_length: int = 2000        # 로그 메시지 최대 길이(자)
+    log_queue_size: int = 10000
+
     # Sentry 및 Slack 환경 변수
     sentry_repository_dsn: str
     sentry_environment: str
@@ -23,13 +57,40 @@ class Settings(BaseSettings):
 
     # JWT 설정
     jwt_secret: str
+    jwt_previous_secrets: str = ""            # 키 교체 기간에 함께 허용할 이전 키(쉼표 구분, base64)
+    jwt_verify_cache_size: int = 10000
+    jwt_verify_cache_ttl: int = 300           # 검증된 토큰 payload 캐시(초, 토큰 만료 시각이 상한)
+    jwt_blacklist_cache_size: int = 10000
+    jwt_blacklist_positive_ttl: int = 86400   # 블랙리스트 토큰 캐시(초, 토큰 만료 시각이 상한)
+    jwt_blacklist_negative_ttl: int = 30      # 정상 토큰 캐시(초)
+    # 유저 서비스가 블랙리스트 등록을 알려줄 때 사용하는 공유 비밀값 (미설정 시 엔드포인트 비활성)
+    jwt_blacklist_push_secret: Optional[str] = None
+    # 내부 관리 엔드포인트(/teams/refresh) 공유 비밀값 (미설정 시 엔드포인트 비활성)
+    internal_api_secret: Optional[str] = None
 
     # user-service 설정
     user_service_url: str
+    user_service_verify_ssl: bool = False
 
     # KBO BASE URL
     kbo_base_url: str
-    
+    kbo_timeout: float = 10.0
+    kbo_max_connections: int = 20
+    kbo_cache_size: int = 512
+    kbo_live_ttl: int = 5             # 진행 중 경기 캐시(초)
+    kbo_finished_ttl: int = 3600      # 종료/취소 경기 캐시(초)
+    kbo_before_ttl: int = 600         # 시작 전 일정 캐시 상한(초)
+    kbo_stale_ttl: int = 300          # 만료 후 이전 응답을 폴백으로 쓸 수 있는 시간(초)
+
+    # 크롤러 스케줄러 설정
+    crawl_hitters_interval: int = 86400     # 작업별 실행 주기(초)
+    crawl_pitchers_interval: int = 86400
+    crawl_schedule_interval: int = 3600
+    crawl_concurrency: int = 4              # 작업 내 동시에 처리할 단위(팀/월) 수
+    crawl_max_retries: int = 3
+    crawl_retry_backoff: float = 5.0        # 재시도 대기 시작값(초, 시도마다 2배)
+    crawl_changelog_keep_days: int = 30     # 변경 이력 보관 기간(일, 더 오래 뒤처진 캐시는 전체 재적재)
+
     model_config = { 
         "env_file": ".env",
         "env_file_encoding": "utf-8"
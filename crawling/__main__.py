@@ -0,0 +1,84 @@
+# python -m crawling {run,backfill,daemon,status}
+import argparse
+import datetime
+import logging
+import sys
+from crawling.jobs import JOBS, get_job
+from crawling.runner import ensure_tables, get_checkpoints, run_job
+from crawling.scheduler import run_forever
+
+def _parse_seasons(value: str) -> list:
+    """"2025", "2021-2025", "2019,2021" 형식"""
+    seasons = []
+    for part in value.split(","):
+        if "-" in part:
+            start, end = map(int, part.split("-"))
+            seasons.extend(range(start, end + 1))
+        else:
+            seasons.append(int(part))
+    return seasons
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(prog="python -m crawling", description="KBO 크롤링 작업 실행기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    job_names = list(JOBS)
+    current = str(datetime.date.today().year)
+
+    run = sub.add_parser("run", help="작업을 한 번 실행 (기본: 현재 시즌, 실패/미완료 단위부터 이어서)")
+    run.add_argument("jobs", nargs="*", help=f"실행할 작업 (기본: 전체, 가능: {', '.join(job_names)})")
+    run.add_argument("--seasons", type=_parse_seasons, default=_parse_seasons(current))
+    run.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 모든 단위 실행")
+    run.add_argument("--full", action="store_true", help="변경 감지 없이 전체 행 저장")
+    run.add_argument("--concurrency", type=int)
+
+    # 선수 기록은 id당 현재 시즌 한 행만 보관하므로 지난 시즌 적재는 일정 작업만 가능
+    history_jobs = [name for name, job in JOBS.items() if job.past_seasons]
+    backfill = sub.add_parser("backfill", help="여러 시즌 적재 (완료된 단위는 건너뜀, 일정 작업만)")
+    backfill.add_argument("seasons", type=_parse_seasons)
+    backfill.add_argument("--jobs", nargs="+", choices=job_names, default=history_jobs)
+    backfill.add_argument("--concurrency", type=int)
+
+    daemon = sub.add_parser("daemon", help="작업별 주기로 현재 시즌을 계속 갱신")
+    daemon.add_argument("--jobs", nargs="+", choices=job_names, default=job_names)
+
+    status = sub.add_parser("status", help="체크포인트 현황")
+    status.add_argument("job", nargs="?", choices=job_names)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        unknown = [name for name in args.jobs if name not in JOBS]
+        if unknown:
+            parser.error(f"알 수 없는 작업: {', '.join(unknown)}")
+        args.jobs = args.jobs or job_names
+    if args.command in ("run", "backfill"):
+        for name in args.jobs:
+            past = [season for season in args.seasons if season != int(current)]
+            if past and not JOBS[name].past_seasons:
+                parser.error(f"{name} 작업은 현재 시즌({current})만 적재할 수 있습니다 (지정: {past})")
+    ensure_tables()
+
+    if args.command == "run":
+        # 오늘 실행분 중 성공한 단위만 건너뜀 (중단된 실행 재개용)
+        since = datetime.datetime.combine(datetime.date.today(), datetime.time.min)
+        for name in args.jobs:
+            run_job(get_job(name), args.seasons, resume_since=since, resume=not args.restart,
+                    force=args.full, concurrency=args.concurrency)
+    elif args.command == "backfill":
+        for name in args.jobs:
+            run_job(get_job(name), args.seasons, concurrency=args.concurrency)
+    elif args.command == "daemon":
+        run_forever([get_job(name) for name in args.jobs])
+    elif args.command == "status":
+        for row in get_checkpoints(args.job):
+            print(f"{row['job']:<10} {row['season']} {row['unit']:<4} {row['status']:<7} "
+                  f"rows={row['rows']} attempts={row['attempts']} {row['finished_at']} {row['error'] or ''}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# bulk_writer.py
+# 크롤러 공용 DB 쓰기: 다중 행 upsert와 배치 단위 트랜잭션
+import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BATCH_SIZE = 500
+
+@dataclass
+class WriteResult:
+    """쓰기 결과 행 수. affected는 MySQL 기준 (upsert 시 신규 1, 변경 2, 동일 0으로 집계)"""
+    table: str
+    rows: int = 0
+    affected: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    version: Optional[int] = None   # 변경 적재 시 올라간 data_version
+
+    def __iadd__(self, other: "WriteResult"):
+        self.rows += other.rows
+        self.affected += other.affected
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        if other.version is not None:
+            self.version = other.version
+        return self
+
+    def __str__(self):
+        text = f"{self.table}: {self.rows}행, affected {self.affected}"
+        if self.inserted or self.updated or self.unchanged:
+            text += f" (신규 {self.inserted}, 변경 {self.updated}, 동일 {self.unchanged})"
+        if self.version is not None:
+            text += f", data_version {self.version}"
+        return text
+
+@contextmanager
+def transaction(conn):
+    """블록 전체를 하나의 트랜잭션으로 커밋, 예외 시 롤백"""
+    try:
+        yield conn.cursor()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def chunks(rows: Sequence, size: int):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+def bulk_upsert(
+    cursor,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[tuple],
+    update_columns: Sequence[str],
+    batch_size: int = BATCH_SIZE,
+) -> WriteResult:
+    """INSERT ... VALUES (...), (...) ON DUPLICATE KEY UPDATE 를 batch_size 행씩 실행"""
+    result = WriteResult(table, rows=len(rows))
+    if not rows:
+        return result
+
+    column_sql = ", ".join(f"`{c}`" for c in columns)
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    update_sql = ", ".join(f"`{c}`=VALUES(`{c}`)" for c in update_columns)
+
+    for chunk in chunks(rows, batch_size):
+        sql = (f"INSERT INTO {table} ({column_sql}) VALUES "
+               + ", ".join([placeholders] * len(chunk))
+               + f" ON DUPLICATE KEY UPDATE {update_sql}")
+        result.affected += cursor.execute(sql, [value for row in chunk for value in row])
+    return result
+
+# 선수 기록 테이블 컬럼 (크롤러 파싱 결과 + team_id, season 순서)
+HITTER_COLUMNS = ("id", "name", "avg", "G", "PA", "AB", "R", "H", "2B", "3B", "HR", "RBI", "SAC", "SF", "team_id", "season")
+PITCHER_COLUMNS = ("id", "name", "era", "ip", "whip", "g", "w", "l", "hld", "wpct", "h", "hr", "bb", "hbp", "so", "r", "er", "team_id", "season")
+
+# ---------------------------------------------------------------- 경기 일정
+
+MatchKey = Tuple[int, int, object, object]  # (home_team_id, away_team_id, match_date, start_time)
+
+def _as_date(value):
+    # DATE/DATETIME 컬럼 어느 쪽이든 같은 키가 되도록 날짜로 맞춤
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+def _as_time(value):
+    # 크롤러는 datetime, pymysql은 TIME 컬럼을 timedelta로 돌려주므로 둘 다 time으로 맞춤
+    if isinstance(value, datetime.datetime):
+        return value.time()
+    if isinstance(value, datetime.timedelta):
+        return (datetime.datetime.min + value).time()
+    return value
+
+def _match_key(row: dict) -> MatchKey:
+    return (row["home_team_id"], row["away_team_id"], _as_date(row["match_date"]), _as_time(row["start_time"]))
+
+def upsert_matches(cursor, matches: List[dict], batch_size: int = BATCH_SIZE) -> WriteResult:
+    """경기 일정 저장. matches 테이블에 유니크 키가 없으므로
+    (홈, 원정, 날짜, 시작 시각)으로 기존 행을 찾아 점수만 갱신하고 나머지는 신규 삽입 (재실행해도 중복 없음)"""
+    result = WriteResult("matches", rows=len(matches))
+    if not matches:
+        return result
+
+    # 중복 행(같은 키)은 마지막 값 사용
+    by_key: Dict[MatchKey, dict] = {_match_key(m): m for m in matches}
+    dates = sorted({key[2] for key in by_key})
+
+    cursor.execute("""
+        SELECT id, home_team_id, away_team_id, match_date, start_time, home_score, away_score
+        FROM matches
+        WHERE match_date >= %s AND match_date < %s + INTERVAL 1 DAY
+        FOR UPDATE
+    """, (dates[0], dates[-1]))
+    existing = {}
+    for row in cursor.fetchall():
+        if isinstance(row, dict):
+            existing[_match_key(row)] = row
+        else:
+            row_id, home_id, away_id, match_date, start_time, home_score, away_score = row
+            existing[(home_id, away_id, _as_date(match_date), _as_time(start_time))] = {
+                "id": row_id, "home_score": home_score, "away_score": away_score,
+            }
+
+    inserts, updates = [], []
+    for key, m in by_key.items():
+        current = existing.get(key)
+        if current is None:
+            inserts.append((m["home_team_id"], m["away_team_id"], m["match_date"], m["created_at"],
+                            m["home_score"], m["away_score"], key[3]))
+        elif (current["home_score"], current["away_score"]) != (m["home_score"], m["away_score"]):
+            updates.append((m["home_score"], m["away_score"], current["id"]))
+
+    for chunk in chunks(inserts, batch_size):
+        cursor.executemany("""
+            INSERT INTO matches
+                (home_team_id, away_team_id, match_date, created_at, home_score, away_score, start_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, chunk)
+    for chunk in chunks(updates, batch_size):
+        cursor.executemany("UPDATE matches SET home_score = %s, away_score = %s WHERE id = %s", chunk)
+
+    result.inserted = len(inserts)
+    result.updated = len(updates)
+    result.affected = len(inserts) + len(updates)
+    return result
@@ -1,33 +1,22 @@
+import argparse
+import asyncio
+import datetime
 import logging
 import re
-from selenium import webdriver
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import pymysql
-import os
 import time
 from utils.db import get_db_config
-# 로깅 기본 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-season = "2025"
-
-# 팀 코드 매핑
-teams = {
-    "HT": "KIA", "SS": "삼성", "LG": "LG", "OB": "두산",
-    "KT": "KT", "SK": "SSG", "LT": "롯데", "HH": "한화",
-    "NC": "NC", "WO": "키움"
-}
-
-def extractPlayers(driver):
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+from utils.data_version import ensure_data_version_tables
+from utils.team_cache import get_teams
+from crawling.bulk_writer import WriteResult, transaction
+from crawling.ingest import ingest_hitters, past_seasons
+from crawling.kbo_http import HITTER_URL, fetch_team_pages, load_fixtures, save_fixtures
+
+season = str(datetime.date.today().year)
+
+def extractPlayers(page_source: str):
+    soup = BeautifulSoup(page_source, "html.parser")
     table = soup.find("table", {"class": "tData01 tt"})
     if table is None:
         logging.error("통계 테이블을 찾지 못했습니다.")
@@ -71,82 +60,138 @@ def extractPlayers(driver):
 
     return players
 
-config = get_db_config()
-conn = pymysql.connect(
-    host=config['host'],
-    port=config['port'],
-    user=config['user'],
-    password=config['password'],
-    db=config['database'],  # 'database' 키 사용 (db 대신)
-    charset=config['charset']
-)
-
-cursor = conn.cursor()
-
-# 크롬 설정
-options = Options()
-options.add_argument("--headless")
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 10)
-
-driver.get("https://www.koreabaseball.com/Record/Player/HitterBasic/Basic1.aspx")
-time.sleep(2)
-
-# 팀별 크롤링
-for teamId, (code, teamName) in enumerate(teams.items(), start=1):
-    logging.info(f"크롤링 중: {teamName} (teamID: {teamId})")
-    
-    # 시즌 선택
-    seasonSelect = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlSeason_ddlSeason"))
-    seasonSelect.select_by_value(season)
-    time.sleep(5)
-    
-    # 팀 선택
-    teamSelect = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlTeam_ddlTeam"))
-    teamSelect.select_by_value(code)
-    time.sleep(5)
-
-    # 페이지 1
-    players = extractPlayers(driver)
-
-    # 페이지 2 (있다면)
+def crawl_with_http(teams, concurrency=4, fixtures_dir=None, save_fixtures_dir=None):
+    """postback을 HTTP로 재현해 전 팀/전 페이지를 병렬 조회 (fixtures_dir 지정 시 저장된 HTML 사용)"""
+    if fixtures_dir:
+        pages = load_fixtures(fixtures_dir, "hitter", season, teams.keys())
+    else:
+        pages = asyncio.run(fetch_team_pages(HITTER_URL, season, teams.keys(), concurrency=concurrency))
+        if save_fixtures_dir:
+            save_fixtures(pages, save_fixtures_dir, "hitter", season)
+
+    return {
+        code: [p for html in htmls for p in extractPlayers(html)]
+        for code, htmls in pages.items()
+    }
+
+def crawl_with_selenium(teams):
+    """기존 브라우저 기반 크롤링 (HTTP 방식이 막혔을 때의 대체 경로)"""
+    from selenium import webdriver
+    from selenium.webdriver.support.ui import Select
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    # 크롬 설정
+    options = Options()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    wait = WebDriverWait(driver, 10)
+
+    driver.get(HITTER_URL)
+    time.sleep(2)
+
+    results = {}
     try:
-        page2Btn = wait.until(EC.element_to_be_clickable(
-            (By.ID, "cphContents_cphContents_cphContents_ucPager_btnNo2")))
-        page2Btn.click()
-        time.sleep(5)
-        players += extractPlayers(driver)
-    except Exception as e:
-        logging.warning(f"페이지 2 없음 또는 클릭 실패: {e}")
-        pass
-    
-    # DB 저장
-    for p in players:
+        for code, team in teams.items():
+            logging.info(f"크롤링 중: {team['team_name']} (teamID: {team['id']})")
+
+            # 시즌 선택
+            seasonSelect = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlSeason_ddlSeason"))
+            seasonSelect.select_by_value(season)
+            time.sleep(5)
+
+            # 팀 선택
+            teamSelect = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlTeam_ddlTeam"))
+            teamSelect.select_by_value(code)
+            time.sleep(5)
+
+            # 페이지 1
+            players = extractPlayers(driver.page_source)
+
+            # 페이지 2 (있다면)
+            try:
+                page2Btn = wait.until(EC.element_to_be_clickable(
+                    (By.ID, "cphContents_cphContents_cphContents_ucPager_btnNo2")))
+                page2Btn.click()
+                time.sleep(5)
+                players += extractPlayers(driver.page_source)
+            except Exception as e:
+                logging.warning(f"페이지 2 없음 또는 클릭 실패: {e}")
+
+            results[code] = players
+
+            # 페이지 1로 돌아가기
+            try:
+                page1Btn = wait.until(EC.element_to_be_clickable(
+                        (By.ID, "cphContents_cphContents_cphContents_ucPager_btnNo1")))
+                page1Btn.click()
+                time.sleep(5)
+            except Exception as e:
+                logging.warning(f"페이지 1로 돌아가기 실패: {e}")
+    finally:
+        driver.quit()
+    return results
+
+def main():
+    global season
+    # 로깅 기본 설정
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="KBO 타자 기록 크롤링")
+    parser.add_argument("--mode", choices=["http", "selenium"], default="http")
+    parser.add_argument("--season", type=int, default=int(season))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fixtures", help="저장된 HTML 디렉터리 (네트워크 없이 실행)")
+    parser.add_argument("--save-fixtures", help="가져온 HTML을 저장할 디렉터리")
+    parser.add_argument("--full", action="store_true", help="변경 감지 없이 전체 행 저장")
+    args = parser.parse_args()
+    if past_seasons([args.season]):
+        parser.error(f"현재 시즌({season})만 적재할 수 있습니다 (지정: {args.season})")
+    season = str(args.season)
+
+    # 팀 코드 매핑 (참조 데이터 캐시, 팀 ID 순)
+    teams = {team["code"]: team for team in get_teams() if team.get("code")}
+
+    started = time.perf_counter()
+    if args.mode == "selenium":
+        results = crawl_with_selenium(teams)
+    else:
+        results = crawl_with_http(teams, args.concurrency, args.fixtures, args.save_fixtures)
+    logging.info(f"수집 완료: {sum(map(len, results.values()))}명, {time.perf_counter() - started:.1f}초")
+
+    config = get_db_config()
+    conn = pymysql.connect(
+        host=config['host'],
+        port=config['port'],
+        user=config['user'],
+        password=config['password'],
+        db=config['database'],  # 'database' 키 사용 (db 대신)
+        charset=config['charset']
+    )
+
+    with conn.cursor() as cursor:
+        ensure_data_version_tables(cursor)
+
+    # DB 저장: 저장된 해시와 다른 행만 팀 단위 다중 행 upsert,
+    # 데이터 버전/변경 이력도 같은 트랜잭션에 기록 (바뀐 행이 없으면 캐시도 그대로)
+    total = WriteResult("hitter_info")
+    for code, players in results.items():
         try:
-            cursor.execute("""
-                INSERT INTO hitter_info
-                    (id, name, avg, G, PA, AB, R, H, `2B`, `3B`, HR, RBI, SAC, SF, team_id, season)
-                VALUES
-                    (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    avg=VALUES(avg), G=VALUES(G), PA=VALUES(PA), AB=VALUES(AB), R=VALUES(R),
-                    H=VALUES(H), `2B`=VALUES(`2B`), `3B`=VALUES(`3B`), HR=VALUES(HR),
-                    RBI=VALUES(RBI), SAC=VALUES(SAC), SF=VALUES(SF)
-            """, (p[0], p[1], p[2], *p[3:], teamId, int(season)))
-        except Exception as e:
-            logging.error(f"DB 저장 에러: {e}")
-
-    conn.commit()
-
-    # 페이지 1로 돌아가기
-    try:
-        page1Btn = wait.until(EC.element_to_be_clickable(
-                (By.ID, "cphContents_cphContents_cphContents_ucPager_btnNo1")))
-        page1Btn.click()
-        time.sleep(5)
-    except Exception as e:
-        logging.warning(f"페이지 1로 돌아가기 실패: {e}")
-
-driver.quit()
-conn.close()
-logging.info("크롤링 및 저장 완료!")
+            with transaction(conn) as cursor:
+                result, _ = ingest_hitters(cursor, players, teams[code]["id"], season, force=args.full)
+            total += result
+            logging.info(f"저장 완료: {teams[code]['team_name']} - {result}")
+        except pymysql.Error as e:
+            logging.error(f"DB 저장 실패 ({teams[code]['team_name']}): {e}")
+    logging.info(f"저장 합계: {total}")
+
+    conn.close()
+    logging.info("크롤링 및 저장 완료!")
+
+if __name__ == "__main__":
+    main()
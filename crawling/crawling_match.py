@@ -1,162 +1,239 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import pymysql
-import time
+import argparse
 import datetime
+import json
 import logging
-import os
-import datetime
+import time
+import httpx
+import pymysql
+from bs4 import BeautifulSoup
 from utils.db import get_db_config
-# 로깅 설정
-logging.basicConfig(
-    filename='kbo_crawler12.log',
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s:%(message)s'
-)
-
-years = [2025]
+from utils.team_cache import get_teams
+from crawling.bulk_writer import WriteResult, transaction, upsert_matches
+from crawling.kbo_http import HEADERS
 
 url = "https://www.koreabaseball.com/Schedule/Schedule.aspx"
-
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 10)
-
-config = get_db_config()
-conn = pymysql.connect(
-    host=config['host'],
-    port=config['port'],
-    user=config['user'],
-    password=config['password'],
-    db=config['database'],  # 'database' 키 사용 (db 대신)
-    charset=config['charset']
-)
-
-cursor = conn.cursor()
-
-team_map = {
-    'KIA': 1, '삼성': 2, 'LG': 3, '두산': 4, 'KT': 5,
-    'SSG': 6, '롯데': 7, '한화': 8, 'NC': 9, '키움': 10
-}
-
-for year in years:
+# 일정 페이지가 표를 채울 때 호출하는 AJAX 엔드포인트
+SCHEDULE_LIST_URL = "https://www.koreabaseball.com/ws/Schedule.asmx/GetScheduleList"
+
+# 정규시즌/포스트시즌/타이브레이커
+SERIES_IDS = "0,9,6"
+SEASON_MONTHS = [f"{m:02d}" for m in range(3, 12)]
+
+def _cell(text: str, css_class: str, spans: list) -> dict:
+    return {"text": text.strip(), "class": css_class or "", "spans": [s.strip() for s in spans]}
+
+def fetch_month_rows(client: httpx.Client, year: int, month: str) -> list:
+    """한 달 일정 표의 행(셀 목록)을 HTTP로 조회"""
+    response = client.post(SCHEDULE_LIST_URL, data={
+        "leId": "1",
+        "srIdList": SERIES_IDS,
+        "seasonId": str(year),
+        "gameMonth": month,
+        "teamId": "",
+    })
+    response.raise_for_status()
+    rows = []
+    for item in json.loads(response.text).get("rows", []):
+        cells = []
+        for col in item.get("row", []):
+            soup = BeautifulSoup(col.get("Text") or "", "html.parser")
+            cells.append(_cell(soup.get_text(), col.get("Class"), [s.get_text() for s in soup.find_all("span")]))
+        rows.append(cells)
+    return rows
+
+def parse_month(year: int, rows: list, team_map: dict) -> list:
+    """일정 표 행 → matches 저장용 dict 목록"""
+    matches = []
+    current_date = None
+
+    for cols in rows:
+        if len(cols) < 8:
+            continue
+
+        if any("데이터가 없습니다" in c["text"] for c in cols):
+            continue
+
+        if 'day' in cols[0]["class"]:
+            raw_date = cols[0]["text"]  # 예: 04.01(화)
+            date_str = f"{year}-{raw_date.split('(')[0].replace('.', '-')}"
+            try:
+                current_date = datetime.datetime.strptime(date_str, "%Y-%m-%d")
+            except Exception as e:
+                logging.warning(f"날짜 파싱 오류: {date_str}, {e}")
+                continue
+            time_col_idx = 1
+            play_col_idx = 2
+        else:
+            time_col_idx = 0
+            play_col_idx = 1
+
+        if current_date is None:
+            continue
+
+        # 시간 포맷 맞추기
+        time_info = cols[time_col_idx]["text"]
+        if len(time_info) == 5:
+            time_info += ":00"
+        elif len(time_info) == 0:
+            time_info = "00:00:00"
+
+        # start_time을 datetime으로 합치기
+        try:
+            start_time = datetime.datetime.combine(
+                current_date.date(),
+                datetime.datetime.strptime(time_info, "%H:%M:%S").time()
+            )
+        except Exception as e:
+            logging.warning(f"start_time 파싱 오류: {current_date} {time_info}, {e}")
+            start_time = None
+
+        # 경기 정보 추출
+        play_spans = cols[play_col_idx]["spans"]
+
+        if len(play_spans) < 3:
+            continue
+
+        away_team = play_spans[0]
+        home_team = play_spans[-1]
+
+        away_score, home_score = None, None
+        if len(play_spans) >= 5:
+            try:
+                away_score = int(play_spans[1])
+                home_score = int(play_spans[3])
+            except Exception as e:
+                logging.warning(f"점수 파싱 오류: {play_spans}, {e}")
+                away_score = None
+                home_score = None
+
+        home_team_id = team_map.get(home_team)
+        away_team_id = team_map.get(away_team)
+        if home_team_id is None or away_team_id is None:
+            logging.warning(f"팀 매핑 실패: away_team={away_team}, home_team={home_team}")
+            continue
+
+        matches.append({
+            "home_team_id": home_team_id,
+            "away_team_id": away_team_id,
+            "match_date": current_date,  # datetime 객체
+            "created_at": datetime.datetime.now(),
+            "home_score": home_score,
+            "away_score": away_score,
+            "start_time": start_time,  # datetime 객체
+        })
+
+    return matches
+
+def crawl_with_http(years, team_map, months=None):
+    """(연도, 월) → 경기 목록"""
+    results = {}
+    with httpx.Client(headers=HEADERS, timeout=20.0) as client:
+        for year in years:
+            for month in months or SEASON_MONTHS:
+                try:
+                    rows = fetch_month_rows(client, year, month)
+                except (httpx.HTTPError, ValueError) as e:
+                    logging.error(f"[{year}년 {month}월] 일정 조회 실패: {e}")
+                    continue
+                results[(year, month)] = parse_month(year, rows, team_map)
+    return results
+
+def crawl_with_selenium(years, team_map):
+    """기존 브라우저 기반 크롤링 (HTTP 방식이 막혔을 때의 대체 경로)"""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import Select
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    driver = webdriver.Chrome(options=options)
+    wait = WebDriverWait(driver, 10)
+
+    results = {}
     try:
-        driver.get(url)
-        wait.until(EC.presence_of_element_located((By.ID, "ddlYear")))
-
-        year_dropdown = Select(driver.find_element(By.ID, "ddlYear"))
-        year_dropdown.select_by_value(str(year))
-        time.sleep(2)
-
-        month_dropdown = Select(driver.find_element(By.ID, "ddlMonth"))
-        available_months = [opt.get_attribute("value") for opt in month_dropdown.options if opt.get_attribute("value").isdigit()]
-
-        for month in available_months:
+        for year in years:
             try:
-                month_dropdown.select_by_value(month)
+                driver.get(url)
+                wait.until(EC.presence_of_element_located((By.ID, "ddlYear")))
+
+                year_dropdown = Select(driver.find_element(By.ID, "ddlYear"))
+                year_dropdown.select_by_value(str(year))
                 time.sleep(2)
-                rows = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#tblScheduleList > tbody > tr")))
-
-                current_date = None
-
-                for row in rows:
-                    cols = row.find_elements(By.TAG_NAME, "td")
-                    if len(cols) < 8:
-                        continue
-
-                    if any("데이터가 없습니다" in c.text for c in cols):
-                        continue
-
-                    if 'day' in cols[0].get_attribute("class"):
-                        raw_date = cols[0].text.strip()  # 예: 04.01(화)
-                        date_str = f"{year}-{raw_date.split('(')[0].replace('.', '-')}"
-                        try:
-                            current_date = datetime.datetime.strptime(date_str, "%Y-%m-%d")
-                        except Exception as e:
-                            logging.warning(f"날짜 파싱 오류: {date_str}, {e}")
-                            continue
-                        time_col_idx = 1
-                        play_col_idx = 2
-                    else:
-                        time_col_idx = 0
-                        play_col_idx = 1
-
-                    # 시간 포맷 맞추기
-                    time_info = cols[time_col_idx].text.strip()
-                    if len(time_info) == 5: 
-                        time_info += ":00"
-                    elif len(time_info) == 0:
-                        time_info = "00:00:00"
-
-                    # start_time을 datetime으로 합치기
-                    try:
-                        start_time = datetime.datetime.combine(
-                            current_date.date(),
-                            datetime.datetime.strptime(time_info, "%H:%M:%S").time()
-                        )
-                    except Exception as e:
-                        logging.warning(f"start_time 파싱 오류: {current_date} {time_info}, {e}")
-                        start_time = None
-
-                    # 경기 정보 추출
-                    play_td = cols[play_col_idx]
-                    play_spans = play_td.find_elements(By.TAG_NAME, "span")
-
-                    if len(play_spans) < 3:
-                        continue
-
-                    away_team = play_spans[0].text.strip()
-                    home_team = play_spans[-1].text.strip()
-
-                    away_score, home_score = None, None
-                    if len(play_spans) >= 5:
-                        try:
-                            away_score = int(play_spans[1].text.strip())
-                            home_score = int(play_spans[3].text.strip())
-                        except Exception as e:
-                            logging.warning(f"점수 파싱 오류: {[span.text for span in play_spans]}, {e}")
-                            away_score = None
-                            home_score = None
-
-                    home_team_id = team_map.get(home_team)
-                    away_team_id = team_map.get(away_team)
-                    if home_team_id is None or away_team_id is None:
-                        logging.warning(f"팀 매핑 실패: away_team={away_team}, home_team={home_team}")
-                        continue
 
+                month_dropdown = Select(driver.find_element(By.ID, "ddlMonth"))
+                available_months = [opt.get_attribute("value") for opt in month_dropdown.options if opt.get_attribute("value").isdigit()]
+
+                for month in available_months:
                     try:
-                        cursor.execute("""
-                            INSERT INTO matches 
-                                (home_team_id, away_team_id, match_date, created_at, home_score, away_score, start_time)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """, (
-                            home_team_id,
-                            away_team_id,
-                            current_date,  # datetime 객체
-                            datetime.datetime.now(),  # datetime 객체
-                            home_score,
-                            away_score,
-                            start_time  # datetime 객체
-                        ))
-
-                        conn.commit()
-                        logging.info(f"경기 저장 완료: {current_date} {time_info} {away_team} vs {home_team} ({away_score}, {home_score})")
+                        month_dropdown.select_by_value(month)
+                        time.sleep(2)
+                        rows = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#tblScheduleList > tbody > tr")))
+                        cells = [
+                            [
+                                _cell(c.text, c.get_attribute("class"), [s.text for s in c.find_elements(By.TAG_NAME, "span")])
+                                for c in row.find_elements(By.TAG_NAME, "td")
+                            ]
+                            for row in rows
+                        ]
+                        results[(year, month)] = parse_month(year, cells, team_map)
                     except Exception as e:
-                        logging.error(f"[{year}년 {month}월] DB 오류: {e}", exc_info=True)
+                        logging.error(f"[{year}년 {month}월] 오류: {e}", exc_info=True)
 
             except Exception as e:
-                logging.error(f"[{year}년 {month}월] 오류: {e}", exc_info=True)
-
-    except Exception as e:
-        logging.critical(f"[{year}년] 연도 변경 실패: {e}", exc_info=True)
-
-driver.quit()
-conn.close()
-logging.info("데이터 삽입 완료")
+                logging.critical(f"[{year}년] 연도 변경 실패: {e}", exc_info=True)
+    finally:
+        driver.quit()
+    return results
+
+def main():
+    # 로깅 설정
+    logging.basicConfig(
+        filename='kbo_crawler12.log',
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s:%(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="KBO 경기 일정 크롤링")
+    parser.add_argument("--mode", choices=["http", "selenium"], default="http")
+    parser.add_argument("--years", type=int, nargs="+", default=[datetime.date.today().year])
+    args = parser.parse_args()
+
+    # 팀 이름 → 팀 ID (참조 데이터 캐시)
+    team_map = {team['team_name']: team['id'] for team in get_teams()}
+
+    if args.mode == "selenium":
+        results = crawl_with_selenium(args.years, team_map)
+    else:
+        results = crawl_with_http(args.years, team_map)
+
+    config = get_db_config()
+    conn = pymysql.connect(
+        host=config['host'],
+        port=config['port'],
+        user=config['user'],
+        password=config['password'],
+        db=config['database'],  # 'database' 키 사용 (db 대신)
+        charset=config['charset']
+    )
+
+    total = WriteResult("matches")
+    for (year, month), month_matches in results.items():
+        # 월 단위 한 트랜잭션으로 저장 (같은 경기는 점수만 갱신되어 재실행해도 중복 없음)
+        try:
+            with transaction(conn) as cursor:
+                result = upsert_matches(cursor, month_matches)
+            total += result
+            logging.info(f"[{year}년 {month}월] 경기 저장 완료: {result}")
+        except pymysql.Error as e:
+            logging.error(f"[{year}년 {month}월] DB 오류: {e}", exc_info=True)
+
+    conn.close()
+    logging.info(f"데이터 삽입 완료: {total}")
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,27 @@
+import argparse
+import asyncio
+import datetime
 import logging
 import re
-from selenium import webdriver
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import pymysql
 import time
-import os
 from utils.db import get_db_config
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-# 팀 코드 매핑
-teams = {
-    "HT": "KIA", "SS": "삼성", "LG": "LG", "OB": "두산",
-    "KT": "KT", "SK": "SSG", "LT": "롯데", "HH": "한화",
-    "NC": "NC", "WO": "키움"
-}
-
-season = "2025"
-
-def extract_players(driver):
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+from utils.data_version import ensure_data_version_tables
+from utils.team_cache import get_teams
+from crawling.bulk_writer import WriteResult, transaction
+from crawling.ingest import ingest_pitchers, past_seasons
+from crawling.kbo_http import PITCHER_URL, fetch_team_pages, load_fixtures, save_fixtures
+
+season = str(datetime.date.today().year)
+
+def extract_players(page_source: str):
+    soup = BeautifulSoup(page_source, "html.parser")
     table = soup.find("table", {"class": "tData01 tt"})
-    tbody = table.find("tbody")
+    tbody = table.find("tbody") if table else None
+    if tbody is None:
+        logging.error("통계 테이블을 찾지 못했습니다.")
+        return []
     players = []
 
     for row in tbody.find_all("tr"):
@@ -76,88 +68,129 @@ def convert_ip(ip_str):
             total += float(part)
     return round(total, 3)
 
-
-config = get_db_config()
-conn = pymysql.connect(
-    host=config['host'],
-    port=config['port'],
-    user=config['user'],
-    password=config['password'],
-    db=config['database'],  
-    charset=config['charset']
-)
-
-cursor = conn.cursor()
-
-# 크롬 설정
-options = Options()
-options.add_argument("--headless")
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 10)
-
-driver.get("https://www.koreabaseball.com/Record/Player/PitcherBasic/Basic1.aspx")
-time.sleep(2)
-
-# 팀별 크롤링
-for team_id, (code, team_name) in enumerate(teams.items(), start=1):
-    logging.info(f"크롤링 중: {team_name} (teamID: {team_id})")
-
-    # 시즌 선택
-    season_select = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlSeason_ddlSeason"))
-    season_select.select_by_value(season)
-    time.sleep(3)
-
-    # 팀 선택
-    team_select = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlTeam_ddlTeam"))
-    team_select.select_by_value(code)
-    time.sleep(3)
-    
-    # 데이터 추출
-    pitchers = extract_players(driver)
-
-    # 2페이지 처리
+def crawl_with_http(teams, concurrency=4, fixtures_dir=None, save_fixtures_dir=None):
+    """postback을 HTTP로 재현해 전 팀/전 페이지를 병렬 조회 (fixtures_dir 지정 시 저장된 HTML 사용)"""
+    if fixtures_dir:
+        pages = load_fixtures(fixtures_dir, "pitcher", season, teams.keys())
+    else:
+        pages = asyncio.run(fetch_team_pages(PITCHER_URL, season, teams.keys(), concurrency=concurrency))
+        if save_fixtures_dir:
+            save_fixtures(pages, save_fixtures_dir, "pitcher", season)
+
+    return {
+        code: [p for html in htmls for p in extract_players(html)]
+        for code, htmls in pages.items()
+    }
+
+def crawl_with_selenium(teams):
+    """기존 브라우저 기반 크롤링 (HTTP 방식이 막혔을 때의 대체 경로)"""
+    from selenium import webdriver
+    from selenium.webdriver.support.ui import Select
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    # 크롬 설정
+    options = Options()
+    options.add_argument("--headless")
+    driver = webdriver.Chrome(options=options)
+    wait = WebDriverWait(driver, 10)
+
+    driver.get(PITCHER_URL)
+    time.sleep(2)
+
+    results = {}
     try:
-        page2_btn = wait.until(EC.element_to_be_clickable(
-            (By.ID, "cphContents_cphContents_cphContents_ucPager_btnNo2")))
-        page2_btn.click()
-        time.sleep(3)
-        pitchers += extract_players(driver)
-    except Exception as e:
-        logging.warning(f"페이지 2 처리 실패: {str(e)}")
-
-    # DB 저장
-    for p in pitchers:
+        for code, team in teams.items():
+            logging.info(f"크롤링 중: {team['team_name']} (teamID: {team['id']})")
+
+            # 시즌 선택
+            season_select = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlSeason_ddlSeason"))
+            season_select.select_by_value(season)
+            time.sleep(3)
+
+            # 팀 선택
+            team_select = Select(driver.find_element(By.ID, "cphContents_cphContents_cphContents_ddlTeam_ddlTeam"))
+            team_select.select_by_value(code)
+            time.sleep(3)
+
+            # 데이터 추출
+            pitchers = extract_players(driver.page_source)
+
+            # 2페이지 처리
+            try:
+                page2_btn = wait.until(EC.element_to_be_clickable(
+                    (By.ID, "cphContents_cphContents_cphContents_ucPager_btnNo2")))
+                page2_btn.click()
+                time.sleep(3)
+                pitchers += extract_players(driver.page_source)
+            except Exception as e:
+                logging.warning(f"페이지 2 처리 실패: {str(e)}")
+
+            results[code] = pitchers
+    finally:
+        driver.quit()
+    return results
+
+def main():
+    global season
+    # 로깅 설정
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="KBO 투수 기록 크롤링")
+    parser.add_argument("--mode", choices=["http", "selenium"], default="http")
+    parser.add_argument("--season", type=int, default=int(season))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fixtures", help="저장된 HTML 디렉터리 (네트워크 없이 실행)")
+    parser.add_argument("--save-fixtures", help="가져온 HTML을 저장할 디렉터리")
+    parser.add_argument("--full", action="store_true", help="변경 감지 없이 전체 행 저장")
+    args = parser.parse_args()
+    if past_seasons([args.season]):
+        parser.error(f"현재 시즌({season})만 적재할 수 있습니다 (지정: {args.season})")
+    season = str(args.season)
+
+    # 팀 코드 매핑 (참조 데이터 캐시, 팀 ID 순)
+    teams = {team["code"]: team for team in get_teams() if team.get("code")}
+
+    started = time.perf_counter()
+    if args.mode == "selenium":
+        results = crawl_with_selenium(teams)
+    else:
+        results = crawl_with_http(teams, args.concurrency, args.fixtures, args.save_fixtures)
+    logging.info(f"수집 완료: {sum(map(len, results.values()))}명, {time.perf_counter() - started:.1f}초")
+
+    config = get_db_config()
+    conn = pymysql.connect(
+        host=config['host'],
+        port=config['port'],
+        user=config['user'],
+        password=config['password'],
+        db=config['database'],  
+        charset=config['charset']
+    )
+
+    with conn.cursor() as cursor:
+        ensure_data_version_tables(cursor)
+
+    # DB 저장: 저장된 해시와 다른 행만 팀 단위 다중 행 upsert,
+    # 데이터 버전/변경 이력도 같은 트랜잭션에 기록 (바뀐 행이 없으면 캐시도 그대로)
+    total = WriteResult("pitcher_info")
+    for code, pitchers in results.items():
         try:
-            cursor.execute("""
-                INSERT INTO pitcher_info (
-                    id, name, era, ip, whip,
-                    g, w, l, hld, wpct,h, hr, bb, hbp, so, r, er,
-                    team_id, season
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s,  %s, %s, 
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    era=VALUES(era),
-                    ip=VALUES(ip),
-                    whip=VALUES(whip),
-                    g=VALUES(g),
-                    w=VALUES(w),
-                    l=VALUES(l),
-                    hld=VALUES(hld),
-                    wpct=VALUES(wpct),
-                    h=VALUES(h),
-                    hr=VALUES(hr),
-                    bb=VALUES(bb),
-                    hbp=VALUES(hbp),
-                    so=VALUES(so),
-                    r=VALUES(r),
-                    er=VALUES(er)
-            """, (*p, team_id, season))
-        except Exception as e:
-            logging.error(f"DB 저장 실패: {str(e)}")
-
-    conn.commit()
-
-driver.quit()
-conn.close()
-logging.info("크롤링 및 저장 완료!")
+            with transaction(conn) as cursor:
+                result, _ = ingest_pitchers(cursor, pitchers, teams[code]["id"], season, force=args.full)
+            total += result
+            logging.info(f"저장 완료: {teams[code]['team_name']} - {result}")
+        except pymysql.Error as e:
+            logging.error(f"DB 저장 실패 ({teams[code]['team_name']}): {e}")
+    logging.info(f"저장 합계: {total}")
+
+    conn.close()
+    logging.info("크롤링 및 저장 완료!")
+
+if __name__ == "__main__":
+    main()
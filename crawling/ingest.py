@@ -0,0 +1,74 @@
+# ingest.py
+# 변경 감지 적재: 파싱한 행을 해시로 비교해 바뀐 행만 쓰고, 데이터 버전/변경 이력을 같은 트랜잭션에 기록
+import datetime
+import hashlib
+import json
+from typing import Dict, Iterable, List, Sequence, Tuple
+from crawling.bulk_writer import BATCH_SIZE, HITTER_COLUMNS, PITCHER_COLUMNS, WriteResult, chunks, bulk_upsert
+from utils.data_version import bump_data_version
+
+# 변경 감지(행 해시/변경 이력) 대상 테이블
+TRACKED_TABLES = ("hitter_info", "pitcher_info")
+
+def row_hash(row: Sequence) -> str:
+    return hashlib.sha1(json.dumps(list(row), default=str, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def _stored_hashes(cursor, name: str, row_ids: Sequence[int]) -> Dict[int, str]:
+    stored = {}
+    for chunk in chunks(list(row_ids), BATCH_SIZE):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"SELECT row_id, row_hash FROM data_row_hash WHERE name = %s AND row_id IN ({placeholders})",
+            [name, *chunk],
+        )
+        for row in cursor.fetchall():
+            row_id, digest = (row["row_id"], row["row_hash"]) if isinstance(row, dict) else row
+            stored[row_id] = digest
+    return stored
+
+def ingest_rows(
+    cursor,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[tuple],
+    update_columns: Sequence[str],
+    force: bool = False,
+) -> Tuple[WriteResult, Dict[int, str]]:
+    """rows(첫 컬럼이 ID) 중 저장된 해시와 다른 행만 upsert.
+    바뀐 행이 있으면 data_version을 올리고 변경 이력을 남김 (호출자가 트랜잭션을 커밋)"""
+    hashes = {row[0]: row_hash(row) for row in rows}
+    stored = {} if force else _stored_hashes(cursor, table, list(hashes))
+
+    changed = [row for row in rows if stored.get(row[0]) != hashes[row[0]]]
+    changes = {row[0]: ("update" if row[0] in stored else "insert") for row in changed}
+
+    result = bulk_upsert(cursor, table, columns, changed, update_columns)
+    result.rows = len(rows)
+    result.unchanged = len(rows) - len(changed)
+    if not changed:
+        return result, changes
+
+    for chunk in chunks(changed, BATCH_SIZE):
+        cursor.executemany("""
+            INSERT INTO data_row_hash (name, row_id, row_hash, updated_at)
+            VALUES (%s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE row_hash = VALUES(row_hash), updated_at = NOW()
+        """, [(table, row[0], hashes[row[0]]) for row in chunk])
+
+    result.inserted = sum(1 for t in changes.values() if t == "insert")
+    result.updated = len(changes) - result.inserted
+    result.version = bump_data_version(cursor, table, changes)
+    return result, changes
+
+def past_seasons(seasons: Iterable) -> List[int]:
+    """현재 시즌이 아닌 시즌. 선수 기록 테이블은 id당 한 행이라 지난 시즌을 적재하면 현재 기록을 덮어씀"""
+    current = datetime.date.today().year
+    return [int(season) for season in seasons if int(season) != current]
+
+def ingest_hitters(cursor, players, team_id: int, season, force: bool = False):
+    rows = [(*p, team_id, int(season)) for p in players]
+    return ingest_rows(cursor, TRACKED_TABLES[0], HITTER_COLUMNS, rows, HITTER_COLUMNS[2:14], force)
+
+def ingest_pitchers(cursor, pitchers, team_id: int, season, force: bool = False):
+    rows = [(*p, team_id, int(season)) for p in pitchers]
+    return ingest_rows(cursor, TRACKED_TABLES[1], PITCHER_COLUMNS, rows, PITCHER_COLUMNS[2:17], force)
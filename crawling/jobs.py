@@ -0,0 +1,79 @@
+# jobs.py
+# 크롤링 작업 레지스트리: 작업은 (시즌, 단위) 단위로 나뉘어 체크포인트/재시도/병렬 처리됨
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+import httpx
+from config.config import settings
+from utils.team_cache import get_teams
+from crawling.bulk_writer import WriteResult, transaction, upsert_matches
+from crawling.crawling_hitter import extractPlayers
+from crawling.crawling_match import SEASON_MONTHS, fetch_month_rows, parse_month
+from crawling.crawling_pitcher import extract_players
+from crawling.ingest import ingest_hitters, ingest_pitchers
+from crawling.kbo_http import HEADERS, HITTER_URL, PITCHER_URL, fetch_team_pages
+
+@dataclass
+class Job:
+    name: str
+    interval: int                                   # 스케줄러 실행 주기(초)
+    units: Callable[[int], List[str]]               # 시즌 → 처리 단위 목록 (팀 코드, 월 등)
+    run_unit: Callable[..., WriteResult]            # (conn, season, unit, force) → 저장 결과
+    # 지난 시즌 적재 가능 여부. 선수 기록 테이블은 id당 한 행(현재 시즌)이라
+    # 지난 시즌을 쓰면 현재 기록을 덮어쓰므로 타자/투수는 현재 시즌만 허용
+    past_seasons: bool = True
+
+JOBS: Dict[str, Job] = {}
+
+def register(job: Job) -> Job:
+    JOBS[job.name] = job
+    return job
+
+def get_job(name: str) -> Job:
+    if name not in JOBS:
+        raise KeyError(f"알 수 없는 작업: {name} (가능: {', '.join(JOBS)})")
+    return JOBS[name]
+
+def _team_codes(season: int) -> List[str]:
+    return [team["code"] for team in get_teams() if team.get("code")]
+
+def _team_by_code(code: str) -> dict:
+    return next(team for team in get_teams() if team.get("code") == code)
+
+def _fetch_team_html(url: str, season: int, code: str) -> List[str]:
+    pages = asyncio.run(fetch_team_pages(url, str(season), [code], concurrency=2))
+    if code not in pages:
+        raise RuntimeError(f"팀 페이지 조회 실패: {code}")
+    return pages[code]
+
+# ---------------------------------------------------------------- 타자/투수 기록
+
+def _run_hitters(conn, season: int, code: str, force: bool = False) -> WriteResult:
+    players = [p for html in _fetch_team_html(HITTER_URL, season, code) for p in extractPlayers(html)]
+    with transaction(conn) as cursor:
+        result, _ = ingest_hitters(cursor, players, _team_by_code(code)["id"], season, force=force)
+    return result
+
+def _run_pitchers(conn, season: int, code: str, force: bool = False) -> WriteResult:
+    pitchers = [p for html in _fetch_team_html(PITCHER_URL, season, code) for p in extract_players(html)]
+    with transaction(conn) as cursor:
+        result, _ = ingest_pitchers(cursor, pitchers, _team_by_code(code)["id"], season, force=force)
+    return result
+
+# ---------------------------------------------------------------- 경기 일정
+
+def _schedule_months(season: int) -> List[str]:
+    # 남은 일정도 경기 ID 조회에 쓰이므로 시즌 전체 월을 저장
+    return list(SEASON_MONTHS)
+
+def _run_schedule(conn, season: int, month: str, force: bool = False) -> WriteResult:
+    team_map = {team["team_name"]: team["id"] for team in get_teams()}
+    with httpx.Client(headers=HEADERS, timeout=20.0) as client:
+        rows = fetch_month_rows(client, season, month)
+    matches = parse_month(season, rows, team_map)
+    with transaction(conn) as cursor:
+        return upsert_matches(cursor, matches)
+
+register(Job("hitters", settings.crawl_hitters_interval, _team_codes, _run_hitters, past_seasons=False))
+register(Job("pitchers", settings.crawl_pitchers_interval, _team_codes, _run_pitchers, past_seasons=False))
+register(Job("schedule", settings.crawl_schedule_interval, _schedule_months, _run_schedule))
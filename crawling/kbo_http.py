@@ -0,0 +1,135 @@
+# kbo_http.py
+# KBO 기록실(ASP.NET WebForms) 페이지를 브라우저 없이 postback으로 조회
+import asyncio
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+
+HITTER_URL = "https://www.koreabaseball.com/Record/Player/HitterBasic/Basic1.aspx"
+PITCHER_URL = "https://www.koreabaseball.com/Record/Player/PitcherBasic/Basic1.aspx"
+
+SEASON_SELECT_ID = "cphContents_cphContents_cphContents_ddlSeason_ddlSeason"
+TEAM_SELECT_ID = "cphContents_cphContents_cphContents_ddlTeam_ddlTeam"
+PAGER_ID_PREFIX = "cphContents_cphContents_cphContents_ucPager_btnNo"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+}
+
+_POSTBACK_RE = re.compile(r"__doPostBack\('([^']+)'")
+
+def parse_form_fields(html: str) -> Dict[str, str]:
+    """브라우저가 postback 때 보내는 폼 값(hidden/text input, select 선택값) 추출"""
+    soup = BeautifulSoup(html, "html.parser")
+    form = soup.find("form") or soup
+    fields = {}
+    for tag in form.find_all("input"):
+        name = tag.get("name")
+        if not name or tag.get("type", "text").lower() in ("submit", "button", "image", "checkbox", "radio"):
+            continue
+        fields[name] = tag.get("value", "")
+    for select in form.find_all("select"):
+        name = select.get("name")
+        if not name:
+            continue
+        selected = select.find("option", selected=True) or select.find("option")
+        fields[name] = selected.get("value", "") if selected else ""
+    return fields
+
+def find_control_name(html: str, element_id: str) -> Optional[str]:
+    tag = BeautifulSoup(html, "html.parser").find(id=element_id)
+    return tag.get("name") if tag else None
+
+def find_pager_targets(html: str) -> Dict[int, str]:
+    """페이지 번호 → postback 대상 (현재 페이지 제외)"""
+    soup = BeautifulSoup(html, "html.parser")
+    targets = {}
+    for anchor in soup.find_all("a", id=re.compile(f"^{PAGER_ID_PREFIX}\\d+$")):
+        match = _POSTBACK_RE.search(anchor.get("href", ""))
+        if match:
+            targets[int(anchor["id"][len(PAGER_ID_PREFIX):])] = match.group(1)
+    return targets
+
+async def postback(client: httpx.AsyncClient, url: str, html: str, target: str, values: Optional[dict] = None) -> str:
+    """현재 페이지 상태(html)에서 target 컨트롤의 postback을 재현"""
+    fields = parse_form_fields(html)
+    fields.update(values or {})
+    fields["__EVENTTARGET"] = target
+    fields["__EVENTARGUMENT"] = ""
+    response = await client.post(url, data=fields)
+    response.raise_for_status()
+    return response.text
+
+async def _fetch_team(client, semaphore, url: str, season_html: str, team_code: str) -> List[str]:
+    team_name = find_control_name(season_html, TEAM_SELECT_ID)
+    async with semaphore:
+        first_page = await postback(client, url, season_html, team_name, {team_name: team_code})
+
+    # 2페이지 이후는 1페이지 상태에서 동시에 요청
+    async def _fetch_page(target):
+        async with semaphore:
+            return await postback(client, url, first_page, target)
+
+    targets = [target for page, target in sorted(find_pager_targets(first_page).items()) if page > 1]
+    return [first_page] + list(await asyncio.gather(*(_fetch_page(t) for t in targets)))
+
+async def fetch_team_pages(
+    url: str,
+    season: str,
+    team_codes: Iterable[str],
+    concurrency: int = 4,
+    timeout: float = 20.0,
+) -> Dict[str, List[str]]:
+    """시즌을 선택한 뒤 팀별 기록 페이지(전체 페이지)의 HTML을 병렬로 가져옴"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(headers=HEADERS, timeout=timeout, limits=limits, follow_redirects=True) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        initial_html = response.text
+
+        season_name = find_control_name(initial_html, SEASON_SELECT_ID)
+        season_html = await postback(client, url, initial_html, season_name, {season_name: season})
+
+        semaphore = asyncio.Semaphore(concurrency)
+        codes = list(team_codes)
+        results = await asyncio.gather(
+            *(_fetch_team(client, semaphore, url, season_html, code) for code in codes),
+            return_exceptions=True,
+        )
+
+    pages = {}
+    for code, result in zip(codes, results):
+        if isinstance(result, Exception):
+            logging.error(f"팀 페이지 조회 실패 ({code}): {result}")
+            continue
+        pages[code] = result
+    return pages
+
+def _fixture_path(directory: str, kind: str, season: str, team_code: str, page: int) -> str:
+    return os.path.join(directory, f"{kind}_{season}_{team_code}_p{page}.html")
+
+def save_fixtures(pages: Dict[str, List[str]], directory: str, kind: str, season: str):
+    """가져온 HTML을 오프라인 재현/테스트용으로 저장"""
+    os.makedirs(directory, exist_ok=True)
+    for code, htmls in pages.items():
+        for page, html in enumerate(htmls, start=1):
+            with open(_fixture_path(directory, kind, season, code, page), "w", encoding="utf-8") as f:
+                f.write(html)
+
+def load_fixtures(directory: str, kind: str, season: str, team_codes: Iterable[str]) -> Dict[str, List[str]]:
+    """save_fixtures로 저장한 HTML을 네트워크 없이 읽어옴"""
+    pages = {}
+    for code in team_codes:
+        htmls = []
+        page = 1
+        while os.path.exists(path := _fixture_path(directory, kind, season, code, page)):
+            with open(path, encoding="utf-8") as f:
+                htmls.append(f.read())
+            page += 1
+        if htmls:
+            pages[code] = htmls
+    return pages
@@ -0,0 +1,178 @@
+# runner.py
+# 크롤링 작업 실행: (시즌, 단위)별 체크포인트, 재시도/백오프, 동시 실행 제한, 작업 잠금
+import datetime
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+import pymysql
+from config.config import settings
+from utils.db import get_db_config
+from utils.data_version import ensure_data_version_tables, prune_changelog, prune_row_hashes
+from crawling.ingest import TRACKED_TABLES, past_seasons
+from crawling.bulk_writer import WriteResult
+from crawling.jobs import Job
+
+CHECKPOINT_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS crawl_checkpoint (
+    job VARCHAR(30) NOT NULL,
+    season INT NOT NULL,
+    unit VARCHAR(30) NOT NULL,
+    status VARCHAR(10) NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    `rows` INT NOT NULL DEFAULT 0,
+    error TEXT NULL,
+    finished_at DATETIME NULL,
+    PRIMARY KEY (job, season, unit)
+)
+"""
+
+def connect():
+    config = get_db_config()
+    return pymysql.connect(
+        host=config['host'],
+        port=config['port'],
+        user=config['user'],
+        password=config['password'],
+        db=config['database'],
+        charset=config['charset'],
+        cursorclass=pymysql.cursors.DictCursor,
+    )
+
+def ensure_tables():
+    conn = connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(CHECKPOINT_TABLE_SQL)
+            ensure_data_version_tables(cursor)
+    finally:
+        conn.close()
+
+@contextmanager
+def job_lock(conn, job_name: str):
+    """같은 작업이 여러 프로세스에서 동시에 돌지 않도록 MySQL 네임드 락 사용"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (f"crawl:{job_name}",))
+        acquired = cursor.fetchone()["acquired"] == 1
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (f"crawl:{job_name}",))
+
+def completed_units(conn, job: str, season: int, since: Optional[datetime.datetime]) -> set:
+    """since 이후(없으면 언제든) 성공한 단위"""
+    sql = "SELECT unit FROM crawl_checkpoint WHERE job = %s AND season = %s AND status = 'done'"
+    params = [job, season]
+    if since is not None:
+        sql += " AND finished_at >= %s"
+        params.append(since)
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {row["unit"] for row in cursor.fetchall()}
+
+def save_checkpoint(conn, job: str, season: int, unit: str, status: str, attempts: int, rows: int = 0, error: str = None):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO crawl_checkpoint (job, season, unit, status, attempts, `rows`, error, finished_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE status = VALUES(status), attempts = VALUES(attempts),
+                `rows` = VALUES(`rows`), error = VALUES(error), finished_at = VALUES(finished_at)
+        """, (job, season, unit, status, attempts, rows, error[:2000] if error else None))
+    conn.commit()
+
+def get_checkpoints(job: Optional[str] = None) -> List[dict]:
+    conn = connect()
+    try:
+        with conn.cursor() as cursor:
+            if job:
+                cursor.execute("SELECT * FROM crawl_checkpoint WHERE job = %s ORDER BY season, unit", (job,))
+            else:
+                cursor.execute("SELECT * FROM crawl_checkpoint ORDER BY job, season, unit")
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+def prune_history(conn):
+    """변경 적재 후 오래된 변경 이력과 사라진 행의 해시 정리"""
+    with conn.cursor() as cursor:
+        prune_changelog(cursor, settings.crawl_changelog_keep_days)
+        for table in TRACKED_TABLES:
+            prune_row_hashes(cursor, table)
+    conn.commit()
+
+def _run_unit(job: Job, season: int, unit: str, force: bool) -> WriteResult:
+    """단위 하나를 재시도/백오프와 함께 실행하고 체크포인트 기록 (스레드마다 별도 연결)"""
+    conn = connect()
+    try:
+        for attempt in range(1, settings.crawl_max_retries + 1):
+            try:
+                result = job.run_unit(conn, season, unit, force)
+                save_checkpoint(conn, job.name, season, unit, "done", attempt, result.rows)
+                logging.info(f"[{job.name} {season} {unit}] {result}")
+                return result
+            except Exception as e:
+                if attempt == settings.crawl_max_retries:
+                    save_checkpoint(conn, job.name, season, unit, "failed", attempt, error=repr(e))
+                    logging.error(f"[{job.name} {season} {unit}] 실패 ({attempt}회 시도): {e}")
+                    raise
+                delay = settings.crawl_retry_backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logging.warning(f"[{job.name} {season} {unit}] 오류, {delay:.1f}초 후 재시도: {e}")
+                time.sleep(delay)
+    finally:
+        conn.close()
+
+def run_job(
+    job: Job,
+    seasons: Iterable[int],
+    resume_since: Optional[datetime.datetime] = None,
+    resume: bool = True,
+    force: bool = False,
+    concurrency: Optional[int] = None,
+) -> WriteResult:
+    """시즌별 단위를 병렬로 처리. resume이면 체크포인트가 있는(resume_since 이후 성공한) 단위는 건너뜀"""
+    seasons = list(seasons)
+    if not job.past_seasons:
+        past = past_seasons(seasons)
+        if past:
+            raise ValueError(f"[{job.name}] 현재 시즌만 적재할 수 있습니다: {past}")
+    total = WriteResult(job.name)
+    lock_conn = connect()
+    try:
+        with job_lock(lock_conn, job.name) as acquired:
+            if not acquired:
+                logging.warning(f"[{job.name}] 다른 프로세스에서 실행 중이라 건너뜀")
+                return total
+
+            for season in seasons:
+                units = job.units(season)
+                if resume:
+                    done = completed_units(lock_conn, job.name, season, resume_since)
+                    units = [unit for unit in units if unit not in done]
+                if not units:
+                    logging.info(f"[{job.name} {season}] 처리할 단위 없음 (체크포인트 완료)")
+                    continue
+
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency or settings.crawl_concurrency) as pool:
+                    futures = {pool.submit(_run_unit, job, season, unit, force): unit for unit in units}
+                    failed = []
+                    for future, unit in futures.items():
+                        try:
+                            total += future.result()
+                        except Exception:
+                            failed.append(unit)
+                logging.info(
+                    f"[{job.name} {season}] {len(units) - len(failed)}/{len(units)} 단위 완료, "
+                    f"{time.perf_counter() - started:.1f}초" + (f", 실패: {failed}" if failed else "")
+                )
+
+            if total.version is not None:
+                prune_history(lock_conn)
+    finally:
+        lock_conn.close()
+    logging.info(f"[{job.name}] 합계: {total}")
+    return total
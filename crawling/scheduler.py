@@ -0,0 +1,27 @@
+# scheduler.py
+# 작업별 주기로 현재 시즌을 갱신하는 데몬 루프
+import datetime
+import logging
+import time
+from typing import Dict, List
+from crawling.jobs import Job
+from crawling.runner import run_job
+
+def run_forever(jobs: List[Job], season: int = None, poll_interval: float = 30.0):
+    """각 작업을 interval마다 실행. 재시작 시 직전 주기에 성공한 단위는 건너뛰고 이어서 진행"""
+    next_run: Dict[str, float] = {job.name: 0.0 for job in jobs}
+    while True:
+        now = time.monotonic()
+        for job in jobs:
+            if now < next_run[job.name]:
+                continue
+            target_season = season or datetime.date.today().year
+            resume_since = datetime.datetime.now() - datetime.timedelta(seconds=job.interval)
+            try:
+                run_job(job, [target_season], resume_since=resume_since)
+            except Exception:
+                logging.exception(f"[{job.name}] 예약 실행 실패")
+            next_run[job.name] = time.monotonic() + job.interval
+
+        wait = max(0.0, min(next_run.values()) - time.monotonic())
+        time.sleep(min(wait, poll_interval))
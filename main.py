@@ -1,6 +1,9 @@
 import json
+import logging
 import os
 import re
+import time
+import uuid
 from typing import List
 
 import sentry_sdk
@@ -13,8 +16,17 @@ from fastapi.security import HTTPBearer
 from fastapi.openapi.utils import get_openapi
 
 from config.config import settings
-from utils.slack import send_slack_message
-from routers import simulation, detect, chat, match, team
+from utils.logger import setup_logging, request_id_var
+from utils.slack import slack_reporter
+from utils.team_cache import refresh_teams
+from simulation.store import ensure_simulation_store
+from api.kbo_client import kbo_client
+from utils.jwt import close_user_service_client
+from utils.metrics import http_request_duration, http_requests_in_flight
+from routers import simulation, detect, chat, match, team, token, metrics
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 class UnicornException(Exception):
     def __init__(self, name: str):
@@ -46,6 +58,38 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    # 로그 상관관계용 요청 ID (클라이언트가 보낸 X-Request-ID 우선)
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        request_id_var.reset(token)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    # 라우트별 지연 시간 히스토그램과 처리 중 요청 수 기록
+    http_requests_in_flight.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec()
+        route = request.scope.get("route")
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
 # Swagger에서 JWT Bearer 인증을 사용할 수 있도록 설정
 bearer_scheme = HTTPBearer()
 
@@ -74,11 +118,29 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
+@app.on_event("startup")
+async def on_startup():
+    # 팀/구장 참조 데이터를 미리 적재 (이후 TTL 또는 /teams/refresh로 갱신)
+    refresh_teams()
+    # 시뮬레이션 결과 테이블 생성(DDL)은 요청 경로가 아닌 시작 시에 수행
+    ensure_simulation_store()
+    if settings.sentry_environment in ["prod", "dev"]:
+        await slack_reporter.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await kbo_client.aclose()
+    await close_user_service_client()
+    await slack_reporter.stop()
+
+
 @app.exception_handler(Exception)
 async def unicorn_exception_handler(request: Request, exc: Exception):
-    print(exc)
+    logger.error("처리되지 않은 예외: %s", exc, exc_info=exc)
     if settings.sentry_environment in ["prod", "dev"]:
-        send_slack_message(exc)
+        # 백그라운드 리포터에 넘기고 바로 응답 (중복 제거/다이제스트 전송)
+        slack_reporter.report(exc)
     return JSONResponse(
         status_code=500,
         content={"detail": str(exc)}
@@ -89,3 +151,5 @@ app.include_router(detect.router)
 app.include_router(chat.router)
 app.include_router(match.router)
 app.include_router(team.router)
+app.include_router(token.router)
+app.include_router(metrics.router)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 class PlayerInput(BaseModel):
     id: int
@@ -10,10 +10,85 @@ class SimulationRequest(BaseModel):
     home_players: List[PlayerInput]
     away_team_name: str
     away_players: List[PlayerInput]
+    include_prompt: bool = False                    # LLM 프롬프트도 함께 반환 (기본은 생략)
+    seed: Optional[int] = None                      # 같은 시드/로스터/엔진 버전이면 같은 경기
 
 class SimulationResponse(BaseModel):
-    prompt: str
+    id: Optional[str] = None                        # GET /simulate/{id}로 다시 보기 (저장 실패 시 없음)
+    prompt: Optional[str] = None
     result: str
+    seed: Optional[int] = None
+    engine_version: Optional[int] = None
+
+class LineupOptimizeRequest(SimulationRequest):
+    team: Literal["home", "away"] = "home"          # 타순을 최적화할 팀
+    objective: Literal["runs", "win"] = "runs"      # 기대 득점 / 승리 확률
+    optimize_starter: bool = False                  # 선발 투수도 함께 선택
+    time_budget_ms: int = Field(1500, ge=100, le=10000)
+
+class LineupOptimizeResponse(BaseModel):
+    lineup: List[PlayerInput]                       # 최적 타순 (투수는 선발 투수부터)
+    expected_runs: float
+    baseline_expected_runs: float                   # 요청한 타순의 기대 득점
+    win_probability: Optional[float] = None
+    baseline_win_probability: Optional[float] = None
+    starter_id: Optional[int] = None
+    evaluations: int
+    elapsed_ms: float
+
+class WinProbabilityRequest(SimulationRequest):
+    # 현재 경기 상태 (home_players/away_players는 타순 순서의 타자 + 투수)
+    inning: int = Field(..., ge=1)
+    half: Literal["top", "bottom"]                  # 초(원정 공격) / 말(홈 공격)
+    outs: int = Field(0, ge=0, le=2)
+    runners: List[int] = []                         # 주자가 있는 루 (1~3)
+    home_score: int = Field(0, ge=0)
+    away_score: int = Field(0, ge=0)
+    home_batter_index: int = Field(0, ge=0)         # 다음 타석에 설 타순 (0부터)
+    away_batter_index: int = Field(0, ge=0)
+    home_pitcher_id: Optional[int] = None           # 현재 투수 (없으면 첫 투수)
+    away_pitcher_id: Optional[int] = None
+    used_pitcher_ids: List[int] = []                # 이미 교체되어 나간 투수
+
+class WinProbabilityResponse(BaseModel):
+    home_win_probability: float
+    away_win_probability: float
+    tie_probability: float
+    home_expected_remaining_runs: float
+    away_expected_remaining_runs: float
+    elapsed_ms: float
+
+class Substitution(BaseModel):
+    team: Literal["home", "away"]
+    out_id: int                                     # 빠지는 선수 (타순/보직 자리를 그대로 물려받음)
+    in_id: int
+    position: Optional[str] = None                  # 없으면 빠지는 선수의 포지션
+
+class SweepVariant(BaseModel):
+    name: Optional[str] = None
+    substitutions: List[Substitution] = Field(..., min_length=1)
+
+class SweepRequest(SimulationRequest):
+    variants: List[SweepVariant] = Field(..., min_length=1, max_length=20)
+    n_games: int = Field(2000, ge=100, le=20000)    # 변형마다 시뮬레이션할 경기 수
+    seed: Optional[int] = None                      # 같은 시드면 같은 결과
+
+class SweepResult(BaseModel):
+    name: str
+    home_win_probability: float
+    away_win_probability: float
+    tie_probability: float
+    home_expected_runs: float
+    away_expected_runs: float
+    delta_home_win_probability: float = 0.0         # 기본 로스터 대비
+    delta_std_error: float = 0.0
+
+class SweepResponse(BaseModel):
+    base: SweepResult
+    variants: List[SweepResult]
+    n_games: int
+    seed: int
+    elapsed_ms: float
 
 class Sentence(BaseModel):
     sentence: str
@@ -22,4 +97,8 @@ class ChatRequest(BaseModel):
     question: str
 
 class ChatResponse(BaseModel):
-    answer: str 
\ No newline at end of file
+    answer: str
+
+class TokenBlacklistEvent(BaseModel):
+    token: Optional[str] = None
+    jti: Optional[str] = None
@@ -0,0 +1,39 @@
+from typing import Optional
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from api.kbo_client import kbo_client
+from utils.db import get_pool_metrics
+from utils.jwt import get_jwt_cache_stats
+from utils.metrics import registry
+from utils.llm_telemetry import recent_generations, summarize
+from simulation.win_expectancy import get_win_expectancy_cache_stats
+
+router = APIRouter()
+
+def _db_pool_collector() -> dict:
+    return {f"playus_db_pool_{key}": value for key, value in get_pool_metrics().items()}
+
+def _cache_collector() -> dict:
+    caches = {
+        "kbo_api": kbo_client.cache_stats(),
+        "win_expectancy": get_win_expectancy_cache_stats(),
+        **{f"jwt_{k}": v for k, v in get_jwt_cache_stats().items()},
+    }
+    values = {}
+    for cache, stats in caches.items():
+        for key, value in stats.items():
+            values[f"playus_cache_{cache}_{key}"] = value
+    return values
+
+registry.register_collector(_db_pool_collector)
+registry.register_collector(_cache_collector)
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    # Prometheus 텍스트 포맷
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/metrics/llm", include_in_schema=False)
+def llm_metrics(task: Optional[str] = None, limit: int = 50):
+    # 작업별 LLM 생성 요약과 최근 생성 기록
+    return {"summary": summarize(), "recent": recent_generations(task, limit)}
@@ -1,10 +1,43 @@
 from fastapi import APIRouter, Depends
-from services.simulation_service import simulate_game
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from services.simulation_service import (
+    get_simulation, narrate_game, optimize_lineup, simulate_game, sweep, win_probability,
+)
 from utils.jwt import get_current_user
-from models import PlayerInput, SimulationRequest, SimulationResponse
+from models import (
+    LineupOptimizeRequest, LineupOptimizeResponse, PlayerInput, SimulationRequest, SimulationResponse,
+    SweepRequest, SweepResponse, WinProbabilityRequest, WinProbabilityResponse,
+)
 
 router = APIRouter()
 
 @router.post("/simulate", response_model=SimulationResponse)
 async def simulate(req: SimulationRequest, user: dict = Depends(get_current_user)):
-    return simulate_game(req, user) 
\ No newline at end of file
+    # 시뮬레이션 후 결과 저장(DB 쓰기)까지 하므로 스레드풀에서 실행
+    return await run_in_threadpool(simulate_game, req, user)
+
+@router.post("/simulate/narrative")
+async def simulate_narrative(req: SimulationRequest, user: dict = Depends(get_current_user)):
+    # 엔진 기록을 먼저 보내고, 반 이닝 해설은 생성이 끝나는 대로 한 줄(JSON)씩 스트리밍
+    return StreamingResponse(narrate_game(req, user), media_type="application/x-ndjson")
+
+@router.post("/simulate/optimize-lineup", response_model=LineupOptimizeResponse)
+async def simulate_optimize_lineup(req: LineupOptimizeRequest, user: dict = Depends(get_current_user)):
+    # CPU 작업(시간 예산만큼 탐색)이 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    return await run_in_threadpool(optimize_lineup, req, user)
+
+@router.post("/simulate/win-probability", response_model=WinProbabilityResponse)
+async def simulate_win_probability(req: WinProbabilityRequest, user: dict = Depends(get_current_user)):
+    # 매치업 표가 캐시에 없으면 첫 요청에서 계산(수백 ms)하므로 스레드풀에서 실행
+    return await run_in_threadpool(win_probability, req, user)
+
+@router.post("/simulate/sweep", response_model=SweepResponse)
+async def simulate_sweep(req: SweepRequest, user: dict = Depends(get_current_user)):
+    # 변형마다 수천 경기를 시뮬레이션하므로 스레드풀에서 실행
+    return await run_in_threadpool(sweep, req, user)
+
+@router.get("/simulate/{simulation_id}", response_model=SimulationResponse)
+async def simulate_replay(simulation_id: str, user: dict = Depends(get_current_user)):
+    # 저장된 경기를 ID로 조회 (공유 링크/새로고침 시 재시뮬레이션 없음)
+    return await run_in_threadpool(get_simulation, simulation_id, user)
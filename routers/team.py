@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, HTTPException
 from fastapi.responses import JSONResponse
+from config.config import settings
 from utils.jwt import get_current_user
+from utils.team_cache import refresh_teams
 from api.player import get_team_players
 
 router = APIRouter()
@@ -13,4 +17,14 @@ def team_players(team_id: int = Query(..., description="팀 ID"), user: dict = D
             raise HTTPException(status_code=404, detail="팀 정보를 찾을 수 없습니다.")
         return JSONResponse(content=result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.post("/teams/refresh", include_in_schema=False)
+def teams_refresh(x_internal_secret: Optional[str] = Header(None)):
+    # 팀/구장 참조 데이터 캐시 즉시 갱신 (운영용, 공유 비밀값으로 인증)
+    secret = settings.internal_api_secret
+    if not secret:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_internal_secret or not hmac.compare_digest(x_internal_secret, secret):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return {"teams": refresh_teams()}
@@ -0,0 +1,20 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from config.config import settings
+from utils.jwt import mark_token_blacklisted
+from models import TokenBlacklistEvent
+
+router = APIRouter()
+
+@router.post("/token/blacklist")
+async def token_blacklisted(req: TokenBlacklistEvent, x_internal_secret: Optional[str] = Header(None)):
+    # 유저 서비스 → AI 서버 블랙리스트 등록 알림 (공유 비밀값으로 인증)
+    secret = settings.jwt_blacklist_push_secret
+    if not secret:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_internal_secret or not hmac.compare_digest(x_internal_secret, secret):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if not mark_token_blacklisted(req.token, req.jti):
+        raise HTTPException(status_code=400, detail="token 또는 jti가 필요합니다.")
+    return {"invalidated": True}
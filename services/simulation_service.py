@@ -1,6 +1,20 @@
-from models import SimulationRequest, SimulationResponse
-from typing import Dict
-from simulation.simulate import simulate_game_rag
+from fastapi import HTTPException
+import json
+import random
+import time
+from models import (
+    LineupOptimizeRequest, LineupOptimizeResponse, PlayerInput, SimulationRequest, SimulationResponse,
+    Substitution, SweepRequest, SweepResponse, SweepResult, WinProbabilityRequest, WinProbabilityResponse,
+)
+from typing import Dict, Iterator, List, Optional
+from simulation.simulate import ENGINE_VERSION, get_player_stats_by_ids, simulate_game_rag
+from simulation.store import load_simulation, save_simulation
+from simulation.lineup_optimizer import choose_starter, search_lineup, team_runs_distribution
+from simulation.outcomes import FIRST, SECOND, THIRD
+from simulation.player_stats import player_stats_repository
+from simulation.win_expectancy import get_matchup_model
+from simulation.batch import CommonRandomStream, compare, simulate_games, summarize
+from simulation.narrative import stream_narrative
 
 def simulate_game(req: SimulationRequest, user: Dict) -> SimulationResponse:
     home_players = [player.dict() for player in req.home_players]
@@ -9,6 +23,210 @@ def simulate_game(req: SimulationRequest, user: Dict) -> SimulationResponse:
         req.home_team_name,
         home_players,
         req.away_team_name,
-        away_players
+        away_players,
+        include_prompt=req.include_prompt,
+        seed=req.seed,
+    )
+    simulation_id = None
+    if result["game"] is not None:
+        simulation_id = save_simulation(
+            result["game"], result["seed"], ENGINE_VERSION, req.home_team_name, req.away_team_name,
+        )
+    return SimulationResponse(
+        id=simulation_id,
+        prompt=result["prompt"],
+        result=result["result"],
+        seed=result["seed"],
+        engine_version=ENGINE_VERSION,
+    )
+
+def get_simulation(simulation_id: str, user: Dict) -> SimulationResponse:
+    """저장된 경기 다시 보기 (엔진/선수 기록 조회 없이 키 조회 한 번)"""
+    stored = load_simulation(simulation_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="시뮬레이션 결과가 없거나 만료되었습니다.")
+    return SimulationResponse(
+        id=stored["id"],
+        result=json.dumps(stored["game"], ensure_ascii=False, indent=2),
+        seed=stored["seed"],
+        engine_version=stored["engine_version"],
+    )
+
+def narrate_game(req: SimulationRequest, user: Dict) -> Iterator[str]:
+    """중계 모드 이벤트를 NDJSON 줄로 변환"""
+    events = stream_narrative(
+        req.home_team_name,
+        [player.dict() for player in req.home_players],
+        req.away_team_name,
+        [player.dict() for player in req.away_players],
+    )
+    for event in events:
+        yield json.dumps(event, ensure_ascii=False) + "\n"
+
+def _split_roster(players):
+    pitchers = get_player_stats_by_ids([p.id for p in players if p.position == "투수"], "투수")
+    hitters = get_player_stats_by_ids([p.id for p in players if p.position != "투수"], "타자")
+    return hitters, pitchers
+
+def _round(value, digits=4):
+    return None if value is None else round(value, digits)
+
+def optimize_lineup(req: LineupOptimizeRequest, user: Dict) -> LineupOptimizeResponse:
+    own, opponent = (req.home_players, req.away_players) if req.team == "home" else (req.away_players, req.home_players)
+    own_hitters, own_pitchers = _split_roster(own)
+    opponent_hitters, opponent_pitchers = _split_roster(opponent)
+
+    if len(own_hitters) < 2:
+        raise HTTPException(status_code=400, detail="기록이 있는 타자가 2명 이상 필요합니다.")
+    if req.objective == "win" and not opponent_hitters:
+        raise HTTPException(status_code=400, detail="승리 확률 최적화에는 상대 타자가 필요합니다.")
+
+    # 선발 투수: 요청 순서의 첫 투수 (엔진과 동일), 필요 시 상대 타선 기준으로 선택
+    starter_index = 0
+    if req.optimize_starter and own_pitchers and opponent_hitters:
+        starter_index = choose_starter(own_pitchers, opponent_hitters)
+    starter = own_pitchers[starter_index] if own_pitchers else None
+    opposing_starter = opponent_pitchers[0] if opponent_pitchers else None
+
+    opponent_dist = team_runs_distribution(opponent_hitters, starter) if req.objective == "win" else None
+    result = search_lineup(
+        own_hitters, opposing_starter, req.objective, opponent_dist,
+        time_budget=req.time_budget_ms / 1000,
+    )
+
+    # 기록이 없는 타자는 요청 순서대로 뒤에 붙임
+    ordered_ids = [own_hitters[i]["id"] for i in result["order"]]
+    ordered_ids += [p.id for p in own if p.position != "투수" and p.id not in ordered_ids]
+    positions = {p.id: p.position for p in own}
+    pitcher_ids = [p.id for p in own if p.position == "투수"]
+    if starter:
+        pitcher_ids.remove(starter["id"])
+        pitcher_ids.insert(0, starter["id"])
+
+    return LineupOptimizeResponse(
+        lineup=[PlayerInput(id=pid, position=positions[pid]) for pid in ordered_ids + pitcher_ids],
+        expected_runs=_round(result["expected_runs"]),
+        baseline_expected_runs=_round(result["baseline_expected_runs"]),
+        win_probability=_round(result["win_probability"]),
+        baseline_win_probability=_round(result["baseline_win_probability"]),
+        starter_id=starter["id"] if starter else None,
+        evaluations=result["evaluations"],
+        elapsed_ms=round(result["elapsed"] * 1000, 1),
+    )
+
+_BASE_BITS = {1: FIRST, 2: SECOND, 3: THIRD}
+
+def _batting_slot(players: List[PlayerInput], hitters: List[Dict], index: int) -> int:
+    """요청 타순의 index번째 타자 → 기록이 있는 타자 목록에서의 위치 (기록이 없으면 다음 타자)"""
+    order = [p.id for p in players if p.position != "투수"]
+    known = {h["id"]: i for i, h in enumerate(hitters)}
+    for k in range(len(order)):
+        pid = order[(index + k) % len(order)]
+        if pid in known:
+            return known[pid]
+    return 0
+
+def _pitching_staff(pitchers: List[Dict], current_id: Optional[int], used_ids: set) -> List[Dict]:
+    """[현재 투수, 아직 등판하지 않은 투수...]"""
+    current = next((p for p in pitchers if p["id"] == current_id), pitchers[0] if pitchers else None)
+    if current is None:
+        return []
+    return [current] + [p for p in pitchers if p is not current and p["id"] not in used_ids]
+
+def win_probability(req: WinProbabilityRequest, user: Dict) -> WinProbabilityResponse:
+    started = time.perf_counter()
+    home_hitters, home_pitchers = _split_roster(req.home_players)
+    away_hitters, away_pitchers = _split_roster(req.away_players)
+    if not home_hitters or not away_hitters:
+        raise HTTPException(status_code=400, detail="양 팀 모두 기록이 있는 타자가 필요합니다.")
+    if any(base not in _BASE_BITS for base in req.runners):
+        raise HTTPException(status_code=400, detail="runners는 1~3루만 허용됩니다.")
+
+    used = set(req.used_pitcher_ids)
+    model = get_matchup_model(
+        home_hitters, away_hitters,
+        _pitching_staff(home_pitchers, req.home_pitcher_id, used),
+        _pitching_staff(away_pitchers, req.away_pitcher_id, used),
+        version=player_stats_repository.version,
+    )
+    result = model.evaluate(
+        req.inning,
+        req.half == "bottom",
+        req.outs,
+        sum(_BASE_BITS[base] for base in set(req.runners)),
+        req.home_score,
+        req.away_score,
+        _batting_slot(req.home_players, home_hitters, req.home_batter_index),
+        _batting_slot(req.away_players, away_hitters, req.away_batter_index),
+    )
+    return WinProbabilityResponse(
+        **{name: _round(value) for name, value in result.items()},
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+def _substitute(players: List[PlayerInput], substitutions: List[Substitution], team: str) -> List[PlayerInput]:
+    """교체 선수가 빠지는 선수의 타순/보직 자리를 그대로 물려받은 로스터"""
+    roster = list(players)
+    for sub in substitutions:
+        if sub.team != team:
+            continue
+        index = next((i for i, p in enumerate(roster) if p.id == sub.out_id), None)
+        if index is None:
+            raise HTTPException(status_code=400, detail=f"{team} 로스터에 {sub.out_id} 선수가 없습니다.")
+        roster[index] = PlayerInput(id=sub.in_id, position=sub.position or roster[index].position)
+    return roster
+
+def _sweep_result(name: str, result: Dict, delta: Optional[Dict] = None) -> SweepResult:
+    summary = summarize(result)
+    return SweepResult(
+        name=name,
+        home_win_probability=_round(summary["home_win_probability"]),
+        away_win_probability=_round(summary["away_win_probability"]),
+        tie_probability=_round(summary["tie_probability"]),
+        home_expected_runs=_round(summary["home_expected_runs"]),
+        away_expected_runs=_round(summary["away_expected_runs"]),
+        **({key: _round(value) for key, value in delta.items()} if delta else {}),
+    )
+
+def sweep(req: SweepRequest, user: Dict) -> SweepResponse:
+    started = time.perf_counter()
+    seed = req.seed if req.seed is not None else random.randrange(2 ** 31)
+
+    rosters = [("기본", req.home_players, req.away_players)]
+    for i, variant in enumerate(req.variants, start=1):
+        rosters.append((
+            variant.name or f"변형{i}",
+            _substitute(req.home_players, variant.substitutions, "home"),
+            _substitute(req.away_players, variant.substitutions, "away"),
+        ))
+
+    # 모든 변형에 등장하는 선수 기록을 포지션별로 한 번에 조회
+    players = [p for _, home, away in rosters for p in home + away]
+    pitchers = {p["id"]: p for p in get_player_stats_by_ids(
+        list(dict.fromkeys(p.id for p in players if p.position == "투수")), "투수")}
+    hitters = {h["id"]: h for h in get_player_stats_by_ids(
+        list(dict.fromkeys(p.id for p in players if p.position != "투수")), "타자")}
+
+    def lookup(roster: List[PlayerInput], pitching: bool) -> List[Dict]:
+        table = pitchers if pitching else hitters
+        return [table[p.id] for p in roster if (p.position == "투수") == pitching and p.id in table]
+
+    # 모든 변형이 같은 위치에서 같은 난수를 쓰도록 공통 난수로 시뮬레이션
+    results = []
+    for name, home, away in rosters:
+        home_hitters, away_hitters = lookup(home, False), lookup(away, False)
+        if not home_hitters or not away_hitters:
+            raise HTTPException(status_code=400, detail=f"{name}: 양 팀 모두 기록이 있는 타자가 필요합니다.")
+        results.append((name, simulate_games(
+            home_hitters, away_hitters, lookup(home, True), lookup(away, True),
+            req.n_games, stream=CommonRandomStream(seed, req.n_games),
+        )))
+
+    (base_name, base), variants = results[0], results[1:]
+    return SweepResponse(
+        base=_sweep_result(base_name, base),
+        variants=[_sweep_result(name, result, compare(base, result)) for name, result in variants],
+        n_games=req.n_games,
+        seed=seed,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
     )
-    return result 
\ No newline at end of file
@@ -0,0 +1,213 @@
+# batch.py
+# 여러 경기를 numpy로 한꺼번에 몬테카를로 시뮬레이션
+#
+# 모든 경기가 같은 반 이닝을 함께 진행하고, 승부가 난 경기(9회말 생략, 끝내기, 연장 종료)와
+# 3아웃이 된 경기는 마스크로 빠져 이후 난수/연산을 쓰지 않는다.
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from simulation.outcomes import HOMERUN, MAX_INNINGS, N_BASES, OUT_OUTCOMES, OUTCOMES, REGULATION_INNINGS, TRANSITIONS
+from simulation.run_expectancy import MAX_PA_PER_INNING
+from simulation.matchup import cumulative, matchup_table
+from simulation.pitching import CHANGE_FROM_INNING, PITCHES_PER_OUTCOME, PitchingStaff
+
+_HOMERUN = OUTCOMES.index(HOMERUN)
+_IS_OUT = np.array([outcome in OUT_OUTCOMES for outcome in OUTCOMES], dtype=np.int64)
+
+def _transition_arrays():
+    """TRANSITIONS → [결과, 주자, 분기] 배열 (분기 누적 확률 / 다음 주자 / 득점)
+
+    분기 선택은 마지막 열을 뺀 누적 확률과 비교하므로 분기가 적은 칸의 나머지 열은 쓰이지 않음
+    """
+    n_branches = max(len(branches) for table in TRANSITIONS.values() for branches in table)
+    shape = (len(OUTCOMES), N_BASES, n_branches)
+    cum_prob = np.ones(shape)
+    next_bases = np.zeros(shape, dtype=np.int64)
+    runs = np.zeros(shape, dtype=np.int64)
+    for o, outcome in enumerate(OUTCOMES):
+        for bases, branches in enumerate(TRANSITIONS[outcome]):
+            total = 0.0
+            for b, (prob, nxt, r) in enumerate(branches):
+                total += prob
+                cum_prob[o, bases, b] = total
+                next_bases[o, bases, b], runs[o, bases, b] = nxt, r
+    return cum_prob, next_bases, runs
+
+_CUM_PROB, _NEXT_BASES, _RUNS = _transition_arrays()
+
+def lineup_cdf(hitters: Sequence[Dict[str, Any]], pitchers: Sequence[Optional[Dict[str, Any]]]) -> np.ndarray:
+    """[투수, 타순, 결과] 누적 확률 (OUTCOMES 순서, 마지막 열은 1)"""
+    return cumulative(matchup_table(hitters, pitchers).transpose(1, 0, 2))
+
+# 난수 용도
+_OUTCOME, _BRANCH, _PITCHING_CHANGE = range(3)
+
+class RandomStream:
+    """경기별 난수 공급 (기본: 살아 있는 경기 수만큼만 추출)"""
+
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def start(self, half: int):
+        pass
+
+    def draw(self, step: int, kind: int, games: np.ndarray) -> np.ndarray:
+        return self.rng.random(games.size)
+
+class CommonRandomStream(RandomStream):
+    """공통 난수: (반 이닝, 타석 순번, 용도, 경기) 위치마다 시드로 고정된 난수
+
+    같은 시드로 돌린 변형들은 같은 경기의 같은 타석에서 같은 난수를 쓰므로 결과 차이의 분산이 작다.
+    끝난 경기 몫도 미리 뽑아 두므로 변형 비교(스윕)에서만 쓴다.
+    """
+
+    def __init__(self, seed: int, n_games: int):
+        super().__init__()
+        self.seed = seed
+        self.n_games = n_games
+
+    def start(self, half: int):
+        self.block = np.random.default_rng([self.seed, half]).random((MAX_PA_PER_INNING, 3, self.n_games))
+
+    def draw(self, step: int, kind: int, games: np.ndarray) -> np.ndarray:
+        return self.block[step, kind, games]
+
+def _half_inning(
+    cdf: np.ndarray,
+    slots: np.ndarray,
+    pitchers: np.ndarray,
+    games: np.ndarray,
+    stream: RandomStream,
+    walkoff_target: Optional[np.ndarray] = None,
+):
+    """games 경기가 slots(경기별 선두 타순)에서 pitchers(경기별 투수)를 상대로 하는 반 이닝
+    → (득점, 다음 선두 타순, 경기별 투구 수, 타석 수 합계)
+
+    walkoff_target이 있으면 그보다 많이 득점한 경기는 그 타석에서 끝냄 (홈런이 아니면 결승점까지만 인정)
+    """
+    n = len(slots)
+    n_hitters = cdf.shape[1]
+    pitches = np.zeros(n)
+    outs = np.zeros(n, dtype=np.int64)
+    bases = np.zeros(n, dtype=np.int64)
+    runs = np.zeros(n, dtype=np.int64)
+    slots = slots.copy()
+    live = np.arange(n)
+    plate_appearances = 0
+
+    for step in range(MAX_PA_PER_INNING):
+        if not live.size:
+            break
+        current = slots[live]
+        u = stream.draw(step, _OUTCOME, games[live])
+        outcome = (u[:, None] >= cdf[pitchers[live], current, :-1]).sum(axis=1)
+        state = bases[live]
+        u = stream.draw(step, _BRANCH, games[live])
+        branch = (u[:, None] >= _CUM_PROB[outcome, state, :-1]).sum(axis=1)
+
+        outs[live] += _IS_OUT[outcome]
+        # 세 번째 아웃이 된 타석의 주루/득점은 무효
+        still = outs[live] < 3
+        bases[live] = _NEXT_BASES[outcome, state, branch]
+        runs[live] += _RUNS[outcome, state, branch] * still
+        slots[live] = (current + 1) % n_hitters
+        pitches[live] += PITCHES_PER_OUTCOME[outcome]
+        plate_appearances += live.size
+
+        finished = ~still
+        if walkoff_target is not None:
+            target = walkoff_target[live]
+            walkoff = runs[live] > target
+            capped = walkoff & (outcome != _HOMERUN)
+            runs[live[capped]] = target[capped] + 1
+            finished |= walkoff
+        live = live[~finished]
+
+    return runs, slots, pitches, plate_appearances
+
+def simulate_games(
+    home_hitters: Sequence[Dict[str, Any]],
+    away_hitters: Sequence[Dict[str, Any]],
+    home_pitchers: Sequence[Dict[str, Any]],
+    away_pitchers: Sequence[Dict[str, Any]],
+    n_games: int = 1000,
+    rng: Optional[np.random.Generator] = None,
+    stream: Optional[RandomStream] = None,
+) -> Dict[str, Any]:
+    """n_games 경기를 동시에 시뮬레이션 (*_pitchers: [선발, 불펜...], 투수 교체는 엔진과 같은 규칙을 경기별로 적용)
+
+    stream을 주면 그 난수 공급을 사용 (변형 비교에는 CommonRandomStream)
+    """
+    stream = stream if stream is not None else RandomStream(rng)
+    # 공격 팀별 [상대 투수, 타순, 결과] 누적 확률과 상대 투수진 상태
+    staffs = {
+        "away": PitchingStaff(home_pitchers, n_games),
+        "home": PitchingStaff(away_pitchers, n_games),
+    }
+    cdfs = {
+        "away": lineup_cdf(away_hitters, staffs["away"].pitchers),
+        "home": lineup_cdf(home_hitters, staffs["home"].pitchers),
+    }
+
+    score = {"home": np.zeros(n_games, dtype=np.int64), "away": np.zeros(n_games, dtype=np.int64)}
+    slots = {"home": np.zeros(n_games, dtype=np.int64), "away": np.zeros(n_games, dtype=np.int64)}
+    innings = np.zeros(n_games, dtype=np.int64)
+    done = np.zeros(n_games, dtype=bool)
+    plate_appearances = 0
+
+    for inning in range(1, MAX_INNINGS + 1):
+        late = inning >= REGULATION_INNINGS
+        for half, team in enumerate(("away", "home"), start=(inning - 1) * 2):
+            if team == "home" and late:
+                # 9회 이후 초 공격 뒤 홈 팀이 앞서면 말 공격 없이 종료
+                done |= score["home"] > score["away"]
+            games = np.flatnonzero(~done)
+            if not games.size:
+                break
+            innings[games] = inning
+            stream.start(half)
+            target = None
+            if team == "home" and late:
+                target = score["away"][games] - score["home"][games]
+            staff = staffs[team]
+            if inning >= CHANGE_FROM_INNING:
+                change = stream.draw(0, _PITCHING_CHANGE, games) < staff.change_probability(inning, games)
+                staff.change(games[change], inning)
+            runs, next_slots, pitches, pa = _half_inning(
+                cdfs[team], slots[team][games], staff.current[games], games, stream, target,
+            )
+            staff.add_pitches(games, pitches, runs)
+            score[team][games] += runs
+            slots[team][games] = next_slots
+            plate_appearances += pa
+        if late:
+            done |= score["home"] != score["away"]
+        if done.all():
+            break
+
+    return {
+        "home_score": score["home"],
+        "away_score": score["away"],
+        "innings": innings,
+        "plate_appearances": plate_appearances,
+    }
+
+def summarize(result: Dict[str, Any]) -> Dict[str, float]:
+    """경기별 결과 → 승리/무승부 확률과 평균 득점"""
+    home, away = result["home_score"], result["away_score"]
+    return {
+        "games": int(len(home)),
+        "home_win_probability": float(np.mean(home > away)),
+        "away_win_probability": float(np.mean(away > home)),
+        "tie_probability": float(np.mean(home == away)),
+        "home_expected_runs": float(np.mean(home)),
+        "away_expected_runs": float(np.mean(away)),
+        "average_innings": float(np.mean(result["innings"])),
+    }
+
+def compare(base: Dict[str, Any], variant: Dict[str, Any]) -> Dict[str, float]:
+    """같은 난수로 돌린 두 결과의 홈 승리 확률 차이와 대응 표본 표준오차"""
+    diff = (variant["home_score"] > variant["away_score"]).astype(float) - (base["home_score"] > base["away_score"])
+    return {
+        "delta_home_win_probability": float(diff.mean()),
+        "delta_std_error": float(diff.std(ddof=1) / np.sqrt(len(diff))) if len(diff) > 1 else 0.0,
+    }
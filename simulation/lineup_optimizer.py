@@ -0,0 +1,133 @@
+# lineup_optimizer.py
+# 타순(및 선발 투수) 탐색: 타석 확률 → 마르코프 기대 득점 평가 + 지역 탐색, 요청 시간 예산 안에서 종료
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from simulation.outcomes import OUT_OUTCOMES, OUTCOMES
+from simulation.matchup import matchup_table
+from simulation.run_expectancy import (
+    BatterMatrix, batter_matrix, expected_game_runs, expected_runs, inning_tables,
+    runs_distribution, win_probability,
+)
+
+# 섭동 재시작이 이만큼 연속으로 개선하지 못하면 탐색 종료
+MAX_STALE_RESTARTS = 20
+
+def lineup_probabilities(hitters: Sequence[Dict[str, Any]], pitcher: Optional[Dict[str, Any]]) -> List[Dict[str, float]]:
+    """타자별 상대 투수와의 매치업 결과 분포"""
+    table = matchup_table(hitters, [pitcher])[:, 0]
+    return [dict(zip(OUTCOMES, row.tolist())) for row in table]
+
+def lineup_matrices(hitters: Sequence[Dict[str, Any]], pitcher: Optional[Dict[str, Any]]) -> List[BatterMatrix]:
+    return [batter_matrix(probs) for probs in lineup_probabilities(hitters, pitcher)]
+
+def team_runs_distribution(hitters, pitcher, innings: int = 9) -> np.ndarray:
+    return runs_distribution(inning_tables(lineup_matrices(hitters, pitcher)), innings)
+
+class _Evaluator:
+    """타순(타자 인덱스 순열) → 목표값. 타자별 전이 행렬은 한 번만 만들고 순서만 바꿔 평가"""
+
+    def __init__(self, mats: List[BatterMatrix], objective: str, opponent_dist: Optional[np.ndarray]):
+        self.mats = mats
+        self.objective = objective
+        self.opponent_dist = opponent_dist
+        self.cache: Dict[tuple, float] = {}
+        self.evaluations = 0
+
+    def runs(self, order: Sequence[int]) -> float:
+        return expected_game_runs([self.mats[i] for i in order])
+
+    def win(self, order: Sequence[int]) -> float:
+        dist = runs_distribution(inning_tables([self.mats[i] for i in order]))
+        return win_probability(dist, self.opponent_dist)
+
+    def __call__(self, order: Sequence[int]) -> float:
+        key = tuple(order)
+        if key not in self.cache:
+            self.evaluations += 1
+            self.cache[key] = self.win(key) if self.objective == "win" else self.runs(key)
+        return self.cache[key]
+
+def _hill_climb(evaluate: _Evaluator, order: List[int], score: float, deadline: float):
+    """두 타자 자리 바꾸기로 개선이 없을 때까지(또는 시간 예산까지) 반복"""
+    n = len(order)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                if time.perf_counter() >= deadline:
+                    return order, score
+                candidate = order[:]
+                candidate[i], candidate[j] = candidate[j], candidate[i]
+                value = evaluate(candidate)
+                if value > score + 1e-9:
+                    order, score, improved = candidate, value, True
+    return order, score
+
+def search_lineup(
+    hitters: Sequence[Dict[str, Any]],
+    opposing_pitcher: Optional[Dict[str, Any]],
+    objective: str = "runs",
+    opponent_dist: Optional[np.ndarray] = None,
+    time_budget: float = 1.5,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """9! 전수 탐색 대신 출루율 순 초기해 + 자리 바꾸기 지역 탐색 + 섭동 재시작.
+    objective="win"이면 opponent_dist(상대 득점 분포) 대비 승리 확률을 최대화"""
+    started = time.perf_counter()
+    deadline = started + time_budget
+    rng = random.Random(seed)
+
+    probs = lineup_probabilities(hitters, opposing_pitcher)
+    evaluate = _Evaluator([batter_matrix(p) for p in probs], objective, opponent_dist)
+
+    given = list(range(len(hitters)))
+    baseline = evaluate(given)
+    best_order, best = given, baseline
+
+    # 출루 확률 순 초기해
+    by_on_base = sorted(given, key=lambda i: sum(probs[i][o] for o in OUT_OUTCOMES))
+    if evaluate(by_on_base) > best:
+        best_order, best = by_on_base, evaluate(by_on_base)
+
+    best_order, best = _hill_climb(evaluate, best_order, best, deadline)
+
+    # 남은 시간 동안 섭동 후 재탐색 (지역 최적 탈출), 연속으로 개선이 없으면 조기 종료
+    stale = 0
+    while time.perf_counter() < deadline and len(given) > 2 and stale < MAX_STALE_RESTARTS:
+        stale += 1
+        candidate = best_order[:]
+        for _ in range(3):
+            i, j = rng.sample(range(len(candidate)), 2)
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+        order, score = _hill_climb(evaluate, candidate, evaluate(candidate), deadline)
+        if score > best + 1e-9:
+            best_order, best, stale = order, score, 0
+
+    runs = evaluate.runs(best_order) if objective == "win" else best
+    baseline_runs = evaluate.runs(given) if objective == "win" else baseline
+    return {
+        "order": best_order,
+        "expected_runs": runs,
+        "baseline_expected_runs": baseline_runs,
+        "win_probability": best if objective == "win" else None,
+        "baseline_win_probability": baseline if objective == "win" else None,
+        "evaluations": evaluate.evaluations,
+        "elapsed": time.perf_counter() - started,
+    }
+
+def choose_starter(
+    pitchers: Sequence[Dict[str, Any]],
+    opponent_hitters: Sequence[Dict[str, Any]],
+    own_dist: Optional[np.ndarray] = None,
+) -> int:
+    """상대 타선 기대 실점이 가장 적은(own_dist가 있으면 승리 확률이 가장 높은) 선발 투수 인덱스"""
+    best_index, best_value = 0, None
+    for index, pitcher in enumerate(pitchers):
+        dist = team_runs_distribution(opponent_hitters, pitcher)
+        value = win_probability(own_dist, dist) if own_dist is not None else -expected_runs(dist)
+        if best_value is None or value > best_value:
+            best_index, best_value = index, value
+    return best_index
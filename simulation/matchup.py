@@ -0,0 +1,125 @@
+# matchup.py
+# 타자×투수 매치업별 타석 결과 분포
+#
+# 타자/투수 기록에서 각자의 결과 비율을 구하고(표본이 적으면 리그 평균 쪽으로 당김),
+# 결과별로 타자 비율 × 투수 비율 / 리그 비율을 정규화하는 다항 log5(오즈비) 방식으로 결합한다.
+# 로스터 단위로 [타자, 투수, 결과] 표를 한 번 만들어 두면 타석마다는 표 조회만 하면 된다.
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from simulation.outcomes import DOUBLE, FLYOUT, GROUNDOUT, HOMERUN, OUTCOMES, SINGLE, STRIKEOUT, TRIPLE, WALK
+
+# log5 결합 범주: 아웃은 삼진과 인플레이 아웃만 구분하고, 인플레이 아웃은 나중에 땅볼/플라이로 나눔
+IN_PLAY_OUT = "in_play_out"
+CATEGORIES = (STRIKEOUT, WALK, SINGLE, DOUBLE, TRIPLE, HOMERUN, IN_PLAY_OUT)
+
+# 리그 평균 타석당 비율 (볼넷은 몸에 맞는 공 포함)
+LEAGUE_RATES = {
+    STRIKEOUT: 0.190,
+    WALK: 0.095,
+    SINGLE: 0.160,
+    DOUBLE: 0.045,
+    TRIPLE: 0.004,
+    HOMERUN: 0.024,
+}
+LEAGUE_RATES[IN_PLAY_OUT] = 1.0 - sum(LEAGUE_RATES.values())
+GROUNDOUT_SHARE = 0.55      # 인플레이 아웃 중 땅볼 비율
+
+# 이만큼의 리그 평균 타석(타자 수)을 더해 표본이 적은 선수의 비율을 안정화
+HITTER_PRIOR_PA = 200
+PITCHER_PRIOR_BF = 150
+
+_LEAGUE = np.array([LEAGUE_RATES[c] for c in CATEGORIES])
+_INDEX = {c: i for i, c in enumerate(CATEGORIES)}
+_HIT_TYPES = (SINGLE, DOUBLE, TRIPLE)
+
+def stat_value(stats: Dict[str, Any], name: str) -> float:
+    """기록 값 (컬럼명 대소문자 무관, 없거나 비어 있으면 0)"""
+    value = stats.get(name, stats.get(name.lower(), stats.get(name.upper())))
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+def _shrink(counts: np.ndarray, trials: float, prior: float) -> np.ndarray:
+    """리그 평균 prior 타석을 더한 비율, 인플레이 아웃은 나머지"""
+    rates = (counts + _LEAGUE * prior) / (trials + prior)
+    rates[_INDEX[IN_PLAY_OUT]] = 0.0
+    rates[_INDEX[IN_PLAY_OUT]] = max(1.0 - rates.sum(), 0.05)
+    return rates / rates.sum()
+
+def hitter_rates(stats: Dict[str, Any]) -> np.ndarray:
+    """타자 기록(PA, AB, H, 2B, 3B, HR, SAC, SF) → CATEGORIES 순서 비율. 삼진 기록이 없어 삼진은 리그 평균"""
+    pa = stat_value(stats, "PA")
+    if pa <= 0:
+        return _LEAGUE.copy()
+    doubles, triples, homeruns = stat_value(stats, "2B"), stat_value(stats, "3B"), stat_value(stats, "HR")
+    counts = np.zeros(len(CATEGORIES))
+    counts[_INDEX[STRIKEOUT]] = LEAGUE_RATES[STRIKEOUT] * pa
+    counts[_INDEX[WALK]] = max(pa - stat_value(stats, "AB") - stat_value(stats, "SAC") - stat_value(stats, "SF"), 0.0)
+    counts[_INDEX[SINGLE]] = max(stat_value(stats, "H") - doubles - triples - homeruns, 0.0)
+    counts[_INDEX[DOUBLE]] = doubles
+    counts[_INDEX[TRIPLE]] = triples
+    counts[_INDEX[HOMERUN]] = homeruns
+    return _shrink(counts, pa, HITTER_PRIOR_PA)
+
+def _outs_recorded(innings: float) -> float:
+    """이닝(크롤러가 저장한 소수, 19⅓ → 19.333) → 잡은 아웃 수"""
+    return round(innings * 3)
+
+def pitcher_rates(stats: Optional[Dict[str, Any]]) -> np.ndarray:
+    """투수 기록(IP, H 또는 WHIP, BB, HBP, SO, HR) → 상대 타자 CATEGORIES 비율. 안타 종류는 리그 비율로 나눔"""
+    if not stats:
+        return _LEAGUE.copy()
+    innings = stat_value(stats, "IP")
+    if innings <= 0:
+        return _LEAGUE.copy()
+    walks = stat_value(stats, "BB") + stat_value(stats, "HBP")
+    hits = stat_value(stats, "H")
+    if hits <= 0 and stat_value(stats, "WHIP") > 0:
+        # 피안타가 없으면 WHIP(이닝당 출루 허용)에서 볼넷을 빼서 추정
+        hits = max(stat_value(stats, "WHIP") * innings - stat_value(stats, "BB"), 0.0)
+    homeruns = min(stat_value(stats, "HR"), hits)
+    batters_faced = _outs_recorded(innings) + hits + walks
+
+    counts = np.zeros(len(CATEGORIES))
+    counts[_INDEX[STRIKEOUT]] = stat_value(stats, "SO")
+    counts[_INDEX[WALK]] = walks
+    counts[_INDEX[HOMERUN]] = homeruns
+    league_hits = sum(LEAGUE_RATES[c] for c in _HIT_TYPES)
+    for c in _HIT_TYPES:
+        counts[_INDEX[c]] = (hits - homeruns) * LEAGUE_RATES[c] / league_hits
+    return _shrink(counts, batters_faced, PITCHER_PRIOR_BF)
+
+def _to_outcomes(rates: np.ndarray) -> np.ndarray:
+    """[..., CATEGORIES] → [..., OUTCOMES] (인플레이 아웃을 땅볼/플라이로 분할)"""
+    out = np.zeros(rates.shape[:-1] + (len(OUTCOMES),))
+    for c in CATEGORIES:
+        if c != IN_PLAY_OUT:
+            out[..., OUTCOMES.index(c)] = rates[..., _INDEX[c]]
+    in_play = rates[..., _INDEX[IN_PLAY_OUT]]
+    out[..., OUTCOMES.index(GROUNDOUT)] = in_play * GROUNDOUT_SHARE
+    out[..., OUTCOMES.index(FLYOUT)] = in_play * (1 - GROUNDOUT_SHARE)
+    return out
+
+def matchup_table(
+    hitters: Sequence[Dict[str, Any]],
+    pitchers: Sequence[Optional[Dict[str, Any]]],
+) -> np.ndarray:
+    """[타자, 투수, 결과(OUTCOMES 순서)] 타석 결과 확률 표. 투수가 없으면 리그 평균 투수 한 명"""
+    pitchers = list(pitchers) or [None]
+    h = np.array([hitter_rates(p) for p in hitters]).reshape(len(hitters), len(CATEGORIES))
+    p = np.array([pitcher_rates(p) for p in pitchers])
+    combined = h[:, None, :] * p[None, :, :] / _LEAGUE
+    combined /= combined.sum(axis=2, keepdims=True)
+    return _to_outcomes(combined)
+
+def matchup_probabilities(hitter: Dict[str, Any], pitcher: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """타자 한 명 대 투수 한 명의 결과 분포"""
+    row = matchup_table([hitter], [pitcher])[0, 0]
+    return dict(zip(OUTCOMES, row.tolist()))
+
+def cumulative(table: np.ndarray) -> np.ndarray:
+    """결과 축 누적 확률 (마지막 값은 정확히 1, 표본 추출용)"""
+    cdf = np.cumsum(table, axis=-1)
+    cdf[..., -1] = 1.0
+    return cdf
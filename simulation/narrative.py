@@ -0,0 +1,42 @@
+# narrative.py
+# 중계 모드: 경기 기록은 엔진이 만들고(권위 있는 기록), LLM은 반 이닝별 짧은 해설만 작성
+#
+# 모든 반 이닝 해설을 한 번의 배치 generate로 만들고, 끝난 해설부터 바로 내보낸다.
+# LLM 출력은 기록에 덧붙는 문장일 뿐이라 선수 이름/점수가 틀린 경기가 만들어지지 않는다.
+from typing import Any, Dict, Iterator, List
+from utils.model import stream_batch_generate
+from simulation.simulate import generate_realistic_simulation_with_pitcher_management, load_roster_stats
+
+COMMENTARY_MAX_TOKENS = 60     # 반 이닝 해설 토큰 상한 (한두 문장)
+
+def commentary_prompt(half: Dict[str, Any], home_team_name: str, away_team_name: str) -> str:
+    plays = "\n".join(f"- {play}" for play in half["plays"]) or "- (기록 없음)"
+    return f"""
+{away_team_name}(원정) 대 {home_team_name}(홈) 경기의 {half['title']} 기록입니다. 점수(원정-홈): {half['score']}
+{plays}
+
+위 기록만 바탕으로 한두 문장의 한국어 야구 중계 해설을 작성하세요.
+기록에 없는 선수 이름이나 사건, 점수는 쓰지 말고 해설 문장만 출력하세요.
+""".strip()
+
+def stream_narrative(
+    home_team_name: str,
+    home_players: List[Dict[str, Any]],
+    away_team_name: str,
+    away_players: List[Dict[str, Any]],
+) -> Iterator[Dict[str, Any]]:
+    """이벤트 순서: game(전체 기록) → commentary(완성되는 순서대로) → done"""
+    home_hitter_stats, home_pitcher_stats, away_hitter_stats, away_pitcher_stats = load_roster_stats(
+        home_players, away_players
+    )
+    game = generate_realistic_simulation_with_pitcher_management(
+        home_hitter_stats, home_pitcher_stats,
+        away_hitter_stats, away_pitcher_stats
+    )
+    yield {"type": "game", "result": game}
+
+    prompts = [commentary_prompt(half, home_team_name, away_team_name) for half in game]
+    for index, text in stream_batch_generate("simulation_commentary", prompts, max_new_tokens=COMMENTARY_MAX_TOKENS):
+        if text:
+            yield {"type": "commentary", "index": index, "title": game[index]["title"], "text": text}
+    yield {"type": "done"}
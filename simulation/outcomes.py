@@ -0,0 +1,129 @@
+# outcomes.py
+# 타석 결과 종류와 주자/아웃 상태 전이표 (시뮬레이션 엔진과 기대 득점 계산이 공유)
+from typing import Dict, List, Tuple
+
+# 주자 상태: 3비트 (1루=1, 2루=2, 3루=4), 상태 인덱스 = 아웃 × 8 + 주자
+FIRST, SECOND, THIRD = 1, 2, 4
+N_BASES = 8
+N_STATES = 3 * N_BASES  # 0~2아웃 × 8 (3아웃은 이닝 종료)
+
+# 경기 규칙: 9회 정규 이닝, 연장은 11회까지 (이후 동점이면 무승부)
+REGULATION_INNINGS = 9
+MAX_INNINGS = 11
+
+# 주루 확률
+SECOND_TO_HOME_ON_HIT = 0.7       # 단타 때 2루 주자 홈인
+FIRST_TO_HOME_ON_DOUBLE = 0.4     # 2루타 때 1루 주자 홈인 (아니면 3루)
+ADVANCE_ON_GROUNDOUT = 0.5        # 땅볼 아웃 때 주자 전원 한 베이스 진루
+TAG_UP_ON_FLYOUT = 0.4            # 플라이 아웃 때 3루 주자 태그업 득점
+
+# 타석 결과 (아웃 3종 + 출루 5종)
+STRIKEOUT, GROUNDOUT, FLYOUT = "strikeout", "groundout", "flyout"
+WALK, SINGLE, DOUBLE, TRIPLE, HOMERUN = "walk", "single", "double", "triple", "homerun"
+OUTCOMES = (STRIKEOUT, GROUNDOUT, FLYOUT, WALK, SINGLE, DOUBLE, TRIPLE, HOMERUN)
+OUT_OUTCOMES = (STRIKEOUT, GROUNDOUT, FLYOUT)
+
+# 엔진 중계 문구
+RESULT_LABELS = {
+    STRIKEOUT: "삼진",
+    GROUNDOUT: "땅볼아웃",
+    FLYOUT: "플라이아웃",
+    WALK: "볼넷",
+    SINGLE: "안타",
+    DOUBLE: "2루타",
+    TRIPLE: "3루타",
+    HOMERUN: "홈런",
+}
+
+def state_index(outs: int, bases: int) -> int:
+    return outs * N_BASES + bases
+
+def _runners(bases: int) -> int:
+    return bin(bases).count("1")
+
+def _walk(bases: int) -> List[Tuple[float, int, int]]:
+    # 밀어내기만 진루
+    if not bases & FIRST:
+        return [(1.0, bases | FIRST, 0)]
+    if not bases & SECOND:
+        return [(1.0, bases | FIRST | SECOND, 0)]
+    if not bases & THIRD:
+        return [(1.0, FIRST | SECOND | THIRD, 0)]
+    return [(1.0, FIRST | SECOND | THIRD, 1)]
+
+def _single(bases: int) -> List[Tuple[float, int, int]]:
+    # 3루 주자 득점, 1루 주자 2루로, 2루 주자는 확률적으로 홈(아니면 3루), 타자 1루
+    runs = 1 if bases & THIRD else 0
+    after = FIRST | (SECOND if bases & FIRST else 0)
+    if bases & SECOND:
+        return [
+            (SECOND_TO_HOME_ON_HIT, after, runs + 1),
+            (1 - SECOND_TO_HOME_ON_HIT, after | THIRD, runs),
+        ]
+    return [(1.0, after, runs)]
+
+def _double(bases: int) -> List[Tuple[float, int, int]]:
+    # 2·3루 주자 득점, 1루 주자는 확률적으로 홈(아니면 3루), 타자 2루
+    runs = _runners(bases & (SECOND | THIRD))
+    if bases & FIRST:
+        return [
+            (FIRST_TO_HOME_ON_DOUBLE, SECOND, runs + 1),
+            (1 - FIRST_TO_HOME_ON_DOUBLE, SECOND | THIRD, runs),
+        ]
+    return [(1.0, SECOND, runs)]
+
+def _triple(bases: int) -> List[Tuple[float, int, int]]:
+    return [(1.0, THIRD, _runners(bases))]
+
+def _homerun(bases: int) -> List[Tuple[float, int, int]]:
+    return [(1.0, 0, 1 + _runners(bases))]
+
+def _groundout(bases: int) -> List[Tuple[float, int, int]]:
+    # 진루타면 주자 전원 한 베이스씩 (3루 주자 득점)
+    if not bases or ADVANCE_ON_GROUNDOUT <= 0:
+        return [(1.0, bases, 0)]
+    advanced = (bases << 1) & (SECOND | THIRD)
+    runs = 1 if bases & THIRD else 0
+    return [(ADVANCE_ON_GROUNDOUT, advanced, runs), (1 - ADVANCE_ON_GROUNDOUT, bases, 0)]
+
+def _flyout(bases: int) -> List[Tuple[float, int, int]]:
+    if not bases & THIRD:
+        return [(1.0, bases, 0)]
+    return [(TAG_UP_ON_FLYOUT, bases & ~THIRD, 1), (1 - TAG_UP_ON_FLYOUT, bases, 0)]
+
+# TRANSITIONS[결과][주자] = [(확률, 다음 주자, 득점), ...]
+# 아웃 결과는 아웃 +1이 함께 적용되며, 그 아웃이 세 번째면 주루/득점 없이 이닝 종료
+TRANSITIONS: Dict[str, List[List[Tuple[float, int, int]]]] = {
+    STRIKEOUT: [[(1.0, bases, 0)] for bases in range(N_BASES)],
+    GROUNDOUT: [_groundout(bases) for bases in range(N_BASES)],
+    FLYOUT: [_flyout(bases) for bases in range(N_BASES)],
+    WALK: [_walk(bases) for bases in range(N_BASES)],
+    SINGLE: [_single(bases) for bases in range(N_BASES)],
+    DOUBLE: [_double(bases) for bases in range(N_BASES)],
+    TRIPLE: [_triple(bases) for bases in range(N_BASES)],
+    HOMERUN: [_homerun(bases) for bases in range(N_BASES)],
+}
+
+MAX_RUNS_PER_PLAY = 4
+
+# 아웃/주자를 합친 상태(state_index)별 전이: 엔진이 타석마다 표 한 번만 조회하도록 미리 계산
+INNING_OVER = N_STATES  # 3아웃
+
+def _state_transitions(outcome: str) -> List[List[Tuple[float, int, int]]]:
+    table = []
+    for state in range(N_STATES):
+        outs, bases = divmod(state, N_BASES)
+        if outcome in OUT_OUTCOMES:
+            outs += 1
+            if outs == 3:
+                table.append([(1.0, INNING_OVER, 0)])
+                continue
+        cumulative, branches = 0.0, []
+        for prob, next_bases, runs in TRANSITIONS[outcome][bases]:
+            cumulative += prob
+            branches.append((cumulative, state_index(outs, next_bases), runs))
+        table.append(branches)
+    return table
+
+# STATE_TRANSITIONS[결과 인덱스(OUTCOMES 순서)][상태] = [(누적 확률, 다음 상태, 득점), ...]
+STATE_TRANSITIONS: List[List[List[Tuple[float, int, int]]]] = [_state_transitions(o) for o in OUTCOMES]
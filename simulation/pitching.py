@@ -0,0 +1,92 @@
+# pitching.py
+# 투수진 상태를 배열로 관리 (경기 수 × 투수): 등판 가능 여부, 투구 수, 피로도, 현재 투수 실점
+#
+# 불펜은 ERA 오름차순으로 한 번만 정렬해 두고, 필승조(후반)는 앞에서부터, 추격조(중반)는
+# 뒤에서부터 포인터로 꺼내 쓴다. 한 경기(엔진)와 수천 경기(배치) 모두 같은 코드로 처리한다.
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+from simulation.outcomes import OUTCOMES, STRIKEOUT, WALK
+from simulation.matchup import stat_value
+
+CHANGE_FROM_INNING = 6      # 이 이닝부터 교체 검토
+LATE_RELIEF_INNING = 7      # 이 이닝부터는 ERA가 가장 낮은 남은 투수(필승조)가 등판
+MAX_CHANGE_PROBABILITY = 0.8
+
+# 투구 수 한계 (넘은 만큼 피로도가 쌓임)
+STARTER_STAMINA = 95
+RELIEVER_STAMINA = 30
+
+# 결과별 평균 투구 수
+PITCHES_PER_OUTCOME = np.array([
+    4.8 if outcome == STRIKEOUT else 5.7 if outcome == WALK else 3.4
+    for outcome in OUTCOMES
+])
+
+DEFAULT_ERA = 4.00
+
+def pitcher_era(pitcher: Optional[Dict[str, Any]]) -> float:
+    """교체/필승조 순위용 ERA (기록이 없거나 0 이하면 DEFAULT_ERA)"""
+    era = stat_value(pitcher, "ERA") if pitcher else 0.0
+    return era if era > 0 else DEFAULT_ERA
+
+class PitchingStaff:
+    """한 팀 투수진의 경기별 상태 (투수 0번이 선발)"""
+
+    def __init__(self, pitchers: Sequence[Optional[Dict[str, Any]]], n_games: int = 1):
+        self.pitchers = list(pitchers) or [None]
+        n = len(self.pitchers)
+        self.era = np.array([pitcher_era(p) for p in self.pitchers])
+        # 선발을 뺀 불펜의 ERA 오름차순 인덱스 (한 번만 정렬)
+        self.bullpen = 1 + np.argsort(self.era[1:], kind="stable")
+        self.stamina = np.full(n, RELIEVER_STAMINA, dtype=float)
+        self.stamina[0] = STARTER_STAMINA
+
+        self.available = np.ones((n_games, n), dtype=bool)
+        self.available[:, 0] = False
+        self.current = np.zeros(n_games, dtype=np.int64)
+        self.best = np.zeros(n_games, dtype=np.int64)                         # 다음 필승조 위치
+        self.worst = np.full(n_games, len(self.bullpen) - 1, dtype=np.int64)  # 다음 추격조 위치
+        self.pitches = np.zeros((n_games, n))
+        self.runs_allowed = np.zeros(n_games)                                 # 현재 투수 실점
+
+    def fatigue(self, games=slice(None)) -> np.ndarray:
+        """현재 투수의 피로도: 투구 수 한계를 넘은 비율 (넘지 않았으면 0)"""
+        current = self.current[games]
+        pitches = self.pitches[games][np.arange(len(current)), current]
+        return np.maximum(pitches - self.stamina[current], 0.0) / self.stamina[current]
+
+    def change_probability(self, inning: int, games=slice(None)) -> np.ndarray:
+        """경기별 현재 투수 교체 확률 (이닝/실점/ERA/피로도)"""
+        runs = self.runs_allowed[games]
+        fatigue = self.fatigue(games)
+        prob = np.full(len(runs), 0.3 * (inning >= 7) + 0.4 * (inning >= 8))
+        prob += np.where(runs >= 4, 0.5, np.where(runs >= 2, 0.2, 0.0))
+        prob += 0.3 * (self.era[self.current[games]] > 5.0)
+        prob += np.where(fatigue > 0, 0.4 + fatigue, 0.0)
+        return np.minimum(prob, MAX_CHANGE_PROBABILITY)
+
+    def change(self, games: np.ndarray, inning: int) -> Tuple[np.ndarray, np.ndarray]:
+        """games 경기의 투수를 불펜 포인터로 교체 → (교체된 경기, 새 투수 인덱스). 불펜이 빈 경기는 제외"""
+        games = np.asarray(games, dtype=np.int64)
+        games = games[self.best[games] <= self.worst[games]]
+        if inning >= LATE_RELIEF_INNING:
+            position = self.best[games]
+            self.best[games] += 1
+        else:
+            position = self.worst[games]
+            self.worst[games] -= 1
+        new = self.bullpen[position]
+        self.current[games] = new
+        self.available[games, new] = False
+        self.runs_allowed[games] = 0
+        return games, new
+
+    def record(self, games, outcomes, runs):
+        """타석 결과(OUTCOMES 인덱스)별 투구 수와 실점 기록"""
+        self.pitches[games, self.current[games]] += PITCHES_PER_OUTCOME[outcomes]
+        self.runs_allowed[games] += runs
+
+    def add_pitches(self, games, pitches, runs):
+        """반 이닝 단위로 모아 둔 투구 수와 실점 기록"""
+        self.pitches[games, self.current[games]] += pitches
+        self.runs_allowed[games] += runs
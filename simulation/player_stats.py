@@ -0,0 +1,125 @@
+# player_stats.py
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Set
+from config.config import settings
+from utils.db import DB_ERRORS, fetch_all
+from utils.data_version import get_changes_since, get_data_version
+
+# 변경 이력으로 부분 갱신할 최대 행 수 (넘으면 전체 재적재가 더 쌈)
+_INCREMENTAL_LIMIT = 500
+
+TABLES = {"투수": "pitcher_info", "타자": "hitter_info"}
+
+class PlayerStatsRepository:
+    """hitter_info/pitcher_info 전체를 메모리 스냅샷으로 유지하는 선수 기록 저장소
+
+    스냅샷은 테이블당 한 번의 쿼리로 적재하고, data_version 값이 바뀌었을 때
+    (크롤러 쓰기 이후) 변경 이력에 있는 선수만 다시 읽는다. 이력을 쓸 수 없으면 전체 재적재.
+    버전 확인은 check_interval마다 한 번만 하므로 정상 상태의 시뮬레이션은
+    DB I/O 없이 메모리에서 선수 기록을 가져온다. 하위 캐시는 version이 바뀌면 새 키로 교체된다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[int, Dict[str, Any]]] = {t: {} for t in TABLES.values()}
+        self._data_versions: Dict[str, Any] = {t: None for t in TABLES.values()}
+        self._loaded_at: Dict[str, float] = {t: float("-inf") for t in TABLES.values()}
+        self._next_check: Dict[str, float] = {t: 0.0 for t in TABLES.values()}
+        # 스냅샷이 바뀔 때마다 증가 (하위 캐시 키로 사용)
+        self.version = 0
+
+    def _reload(self, table: str, data_version):
+        try:
+            rows = fetch_all(f"SELECT * FROM {table}")
+        except DB_ERRORS as e:
+            logging.error("선수 기록 스냅샷 적재 실패(%s): %s", table, e)
+            return
+        with self._lock:
+            self._rows[table] = {row["id"]: row for row in rows}
+            self._data_versions[table] = data_version
+            self._loaded_at[table] = time.monotonic()
+            self.version += 1
+        logging.info("선수 기록 스냅샷 적재: %s %d명 (data_version=%s)", table, len(rows), data_version)
+
+    def _apply_changes(self, table: str, changed_ids: Set[int], data_version) -> bool:
+        """변경 이력에 있는 선수만 다시 읽어 스냅샷에 반영"""
+        if changed_ids:
+            ids = sorted(changed_ids)
+            placeholders = ", ".join(["%s"] * len(ids))
+            try:
+                rows = fetch_all(f"SELECT * FROM {table} WHERE id IN ({placeholders})", ids)
+            except DB_ERRORS as e:
+                logging.error("선수 기록 부분 갱신 실패(%s): %s", table, e)
+                return False
+        else:
+            rows = []
+
+        with self._lock:
+            snapshot = dict(self._rows[table])
+            for pid in changed_ids:
+                snapshot.pop(pid, None)
+            snapshot.update({row["id"]: row for row in rows})
+            self._rows[table] = snapshot
+            self._data_versions[table] = data_version
+            self.version += 1
+        logging.info("선수 기록 부분 갱신: %s %d명 (data_version=%s)", table, len(changed_ids), data_version)
+        return True
+
+    def _ensure_fresh(self, table: str):
+        now = time.monotonic()
+        if now < self._next_check[table]:
+            return
+        self._next_check[table] = now + settings.player_stats_check_interval
+
+        data_version = get_data_version(table)
+        if data_version is None:
+            # 버전 테이블이 없으면 TTL 기준으로 재적재
+            if now < self._loaded_at[table] + settings.player_stats_ttl:
+                return
+        elif data_version == self._data_versions[table]:
+            return
+        else:
+            changed_ids = get_changes_since(table, self._data_versions[table], data_version)
+            if (changed_ids is not None and len(changed_ids) <= _INCREMENTAL_LIMIT
+                    and self._apply_changes(table, changed_ids, data_version)):
+                return
+        self._reload(table, data_version)
+
+    def _fetch_missing(self, table: str, ids: List[int]):
+        """스냅샷 이후 추가된 선수만 바인딩 파라미터로 한 번에 조회"""
+        placeholders = ", ".join(["%s"] * len(ids))
+        try:
+            rows = fetch_all(f"SELECT * FROM {table} WHERE id IN ({placeholders})", ids)
+        except DB_ERRORS as e:
+            logging.error("선수 기록 조회 실패(%s): %s", table, e)
+            return
+        with self._lock:
+            for row in rows:
+                self._rows[table][row["id"]] = row
+
+    def get_players(self, player_ids: Iterable[int], position: str) -> List[Dict[str, Any]]:
+        """요청한 순서대로 선수 기록 반환 (없는 ID는 제외)"""
+        table = TABLES["투수"] if position == "투수" else TABLES["타자"]
+        ids = [int(pid) for pid in player_ids]
+        if not ids:
+            return []
+
+        self._ensure_fresh(table)
+        rows = self._rows[table]
+        missing = [pid for pid in dict.fromkeys(ids) if pid not in rows]
+        if missing:
+            self._fetch_missing(table, missing)
+            rows = self._rows[table]
+        return [rows[pid] for pid in ids if pid in rows]
+
+    def invalidate(self):
+        """다음 조회 시 버전과 관계없이 다시 적재"""
+        with self._lock:
+            for table in TABLES.values():
+                self._data_versions[table] = None
+                self._loaded_at[table] = float("-inf")
+                self._next_check[table] = 0.0
+
+player_stats_repository = PlayerStatsRepository()
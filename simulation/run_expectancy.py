@@ -0,0 +1,136 @@
+# run_expectancy.py
+# 타석 결과 분포로부터 이닝/경기 득점 분포를 마르코프 체인으로 직접 계산 (몬테카를로 없이)
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+import numpy as np
+from simulation.outcomes import MAX_RUNS_PER_PLAY, N_BASES, N_STATES, OUT_OUTCOMES, TRANSITIONS, state_index
+
+MAX_INNING_RUNS = 15      # 한 이닝 득점 상한 (초과분은 상한에 합산)
+MAX_GAME_RUNS = 30        # 한 경기 득점 상한
+MAX_PA_PER_INNING = 24    # 이 이상 이어지는 이닝은 확률상 무시 가능
+
+class BatterMatrix(NamedTuple):
+    """타자 한 명의 타석 전이"""
+    T: np.ndarray           # [득점, 현재 상태, 다음 상태]
+    end: np.ndarray         # [현재 상태] 이 타석으로 3아웃이 될 확률
+    A: np.ndarray           # 득점과 무관한 상태 전이 (T를 득점 축으로 합한 것)
+    run_values: np.ndarray  # [현재 상태] 이 타석의 기대 득점
+
+def batter_matrix(probs: Dict[str, float]) -> BatterMatrix:
+    T = np.zeros((MAX_RUNS_PER_PLAY + 1, N_STATES, N_STATES))
+    end = np.zeros(N_STATES)
+    for outs in range(3):
+        for bases in range(N_BASES):
+            s = state_index(outs, bases)
+            for outcome, p in probs.items():
+                if p <= 0:
+                    continue
+                is_out = outcome in OUT_OUTCOMES
+                if is_out and outs == 2:
+                    end[s] += p
+                    continue
+                next_outs = outs + 1 if is_out else outs
+                for q, next_bases, runs in TRANSITIONS[outcome][bases]:
+                    T[runs, s, state_index(next_outs, next_bases)] += p * q
+    run_values = np.tensordot(np.arange(MAX_RUNS_PER_PLAY + 1), T.sum(axis=2), axes=1)
+    return BatterMatrix(T, end, T.sum(axis=0), run_values)
+
+def _add_shifted(target: np.ndarray, values: np.ndarray, shift: int):
+    """target[..., r + shift] += values[..., r] (상한 초과분은 마지막 칸에 합산)"""
+    if shift == 0:
+        target += values
+        return
+    size = target.shape[-1]
+    target[..., shift:] += values[..., :size - shift]
+    target[..., -1] += values[..., size - shift:].sum(axis=-1)
+
+def half_innings(mats: Sequence[BatterMatrix], start_slots: Sequence[int], start_state: int = 0) -> np.ndarray:
+    """여러 선두 타순의 반 이닝을 한꺼번에 계산: [선두, 득점, 다음 이닝 선두 타순] 결합 분포"""
+    n = len(mats)
+    starts = np.asarray(start_slots)
+    T_all = np.stack([m.T.transpose(0, 2, 1) for m in mats])  # [타자, 득점, 다음 상태, 상태]
+    end_all = np.stack([m.end for m in mats])[:, None, :]      # [타자, 1, 상태]
+    rows = np.arange(len(starts))
+
+    P = np.zeros((len(starts), N_STATES, MAX_INNING_RUNS + 1))
+    P[:, start_state, 0] = 1.0
+    J = np.zeros((len(starts), MAX_INNING_RUNS + 1, n))
+
+    for k in range(MAX_PA_PER_INNING):
+        slots = (starts + k) % n
+        J[rows, :, (slots + 1) % n] += (end_all[slots] @ P)[:, 0]
+        moved = T_all[slots] @ P[:, None]
+        P = moved[:, 0]
+        for runs in range(1, MAX_RUNS_PER_PLAY + 1):
+            _add_shifted(P, moved[:, runs], runs)
+        if P.sum() < 1e-10 * len(starts):
+            break
+
+    totals = J.sum(axis=(1, 2), keepdims=True)
+    return np.divide(J, totals, out=np.zeros_like(J), where=totals > 0)
+
+def half_inning(mats: Sequence[BatterMatrix], start_slot: int, start_state: int = 0) -> np.ndarray:
+    """start_slot 타자부터 시작하는 반 이닝의 (득점, 다음 이닝 선두 타순) 결합 분포"""
+    return half_innings(mats, [start_slot], start_state)[0]
+
+def inning_tables(mats: Sequence[BatterMatrix]) -> List[np.ndarray]:
+    """선두 타순별 반 이닝 분포"""
+    return list(half_innings(mats, range(len(mats))))
+
+def runs_distribution(
+    tables: Sequence[np.ndarray],
+    innings: int = 9,
+    start_slot: int = 0,
+) -> np.ndarray:
+    """innings 이닝 동안의 총 득점 분포 (이닝 사이 타순 이어짐)"""
+    n = len(tables)
+    stacked = np.stack(tables)  # [선두 타순, 이닝 득점, 다음 선두 타순]
+    dist = np.zeros((n, MAX_GAME_RUNS + 1))
+    dist[start_slot % n, 0] = 1.0
+    for _ in range(innings):
+        # shifted[r, s, g] = 선두 타순 s에서 이번 이닝 r점을 더했을 때 누적 g점이 되는 확률
+        shifted = np.zeros((MAX_INNING_RUNS + 1,) + dist.shape)
+        for runs in range(MAX_INNING_RUNS + 1):
+            _add_shifted(shifted[runs], dist, runs)
+        dist = np.einsum("rsg,srt->tg", shifted, stacked)
+    return dist.sum(axis=0)
+
+def half_inning_expectation(mats: Sequence[BatterMatrix], start_slot: int, start_state: int = 0) -> Tuple[float, np.ndarray]:
+    """반 이닝 기대 득점과 다음 이닝 선두 타순 분포 (분포 계산보다 훨씬 가벼움)"""
+    n = len(mats)
+    P = np.zeros(N_STATES)
+    P[start_state] = 1.0
+    runs = 0.0
+    next_slot = np.zeros(n)
+    for k in range(MAX_PA_PER_INNING):
+        slot = (start_slot + k) % n
+        m = mats[slot]
+        runs += m.run_values @ P
+        next_slot[(slot + 1) % n] += m.end @ P
+        P = m.A.T @ P
+        if P.sum() < 1e-10:
+            break
+    total = next_slot.sum()
+    return runs, (next_slot / total if total > 0 else next_slot)
+
+def expected_game_runs(mats: Sequence[BatterMatrix], innings: int = 9, start_slot: int = 0) -> float:
+    """innings 이닝 기대 득점 (이닝 사이 타순 이어짐)"""
+    n = len(mats)
+    per_slot = [half_inning_expectation(mats, slot) for slot in range(n)]
+    runs_by_slot = np.array([runs for runs, _ in per_slot])
+    transition = np.array([next_slot for _, next_slot in per_slot])
+    slots = np.zeros(n)
+    slots[start_slot % n] = 1.0
+    total = 0.0
+    for _ in range(innings):
+        total += slots @ runs_by_slot
+        slots = slots @ transition
+    return float(total)
+
+def expected_runs(dist: np.ndarray) -> float:
+    return float(dist @ np.arange(len(dist)))
+
+def win_probability(dist_a: np.ndarray, dist_b: np.ndarray) -> float:
+    """A 득점 분포가 B를 이길 확률 (동점은 절반으로 계산)"""
+    cdf_b = np.cumsum(dist_b)
+    below = np.concatenate(([0.0], cdf_b[:-1]))
+    return float(dist_a @ below + 0.5 * (dist_a @ dist_b))
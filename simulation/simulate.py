@@ -1,229 +1,132 @@
 # simulate.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import re
 import random
+from bisect import bisect_right
+import numpy as np
 from utils.model import generate_simulation_result
-from utils.db import run_sql_query
+from simulation.player_stats import player_stats_repository
+from simulation.outcomes import (
+    INNING_OVER, MAX_INNINGS, N_BASES, OUTCOMES, REGULATION_INNINGS, RESULT_LABELS, STATE_TRANSITIONS,
+)
+from simulation.matchup import cumulative, matchup_table
+from simulation.pitching import CHANGE_FROM_INNING, PitchingStaff
+from simulation.run_expectancy import MAX_PA_PER_INNING
+from utils.metrics import stage_timer
+from utils.cache import TTLCache
+from config.config import settings
 import json
-import traceback
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 엔진 규칙(전이표/매치업/투수 교체/난수 사용 순서)이 바뀌면 올림. 저장된 시드로 재현 가능한지 판단하는 기준
+ENGINE_VERSION = 1
 
 def get_player_stats_by_ids(player_ids: List[int], position: str) -> List[Dict[str, Any]]:
     if not player_ids:
         return []
-    
-    if position == "투수":
-        sql = f"SELECT * FROM pitcher_info WHERE id IN ({', '.join(map(str, player_ids))});"
-    else:
-        sql = f"SELECT * FROM hitter_info WHERE id IN ({', '.join(map(str, player_ids))});"
-    return run_sql_query(sql)
+    # 메모리 스냅샷에서 요청 순서대로 조회 (타순 유지)
+    return player_stats_repository.get_players(player_ids, position)
 
-def calculate_realistic_probabilities(player_stats, position):
-    """선수 성적을 기반으로 현실적인 확률 계산"""
-    if position == "타자":
-        avg = float(player_stats.get('avg', 0.250))
-        hr = int(player_stats.get('HR', 0))
-        
-        # 현실적인 확률 조정
-        hit_prob = min(avg * 0.8, 0.400)  # 최대 40% 안타율
-        hr_prob = min(hr / 600, 0.050)    # 최대 5% 홈런율
-        walk_prob = 0.08                  # 8% 볼넷율
-        out_prob = 1 - hit_prob - hr_prob - walk_prob
-        
-        return {
-            "hit": hit_prob,
-            "homerun": hr_prob,
-            "walk": walk_prob,
-            "out": max(out_prob, 0.5)  # 최소 50% 아웃율
-        }
-    else:  # 투수
-        era = float(player_stats.get('ERA', 4.00))
-        
-        # ERA가 낮을수록 상대 타율 감소
-        era_factor = min(era / 3.0, 2.0)  # ERA 조정 팩터
-        
-        return {"era_factor": era_factor}
+def determine_pitcher_change(staff: PitchingStaff, inning: int, rng=random) -> bool:
+    """투수 교체 여부 결정 (이닝/실점/ERA/투구 수 피로도)"""
+    return rng.random() < staff.change_probability(inning)[0]
 
-def determine_pitcher_change(current_pitcher, pitching_team_stats, inning, runs_allowed_this_game, outs_pitched):
-    """투수 교체 여부 결정"""
-    
-    # 기본 교체 조건들
-    era = float(current_pitcher.get('ERA', 4.00))
-    
-    # 교체 확률 계산
-    change_prob = 0.0
-    
-    # 이닝별 교체 확률
-    if inning >= 7:
-        change_prob += 0.3
-    if inning >= 8:
-        change_prob += 0.4
-    
-    # 실점에 따른 교체 확률
-    if runs_allowed_this_game >= 4:
-        change_prob += 0.5
-    elif runs_allowed_this_game >= 2:
-        change_prob += 0.2
-    
-    # ERA에 따른 교체 확률
-    if era > 5.0:
-        change_prob += 0.3
-    
-    # 투구 수 (대략적 계산)
-    estimated_pitches = outs_pitched * 15  # 아웃당 평균 15구
-    if estimated_pitches > 100:
-        change_prob += 0.4
-    
-    return random.random() < min(change_prob, 0.8)
+def select_relief_pitcher(staff: PitchingStaff, inning: int) -> Optional[int]:
+    """상황에 맞는 구원투수 선택: 7회 이후 ERA가 가장 낮은 투수, 그 전에는 추격조 (남은 투수가 없으면 None)"""
+    games, new = staff.change(np.zeros(1, dtype=np.int64), inning)
+    return int(new[0]) if len(games) else None
 
-def select_relief_pitcher(pitching_team_stats, used_pitchers, inning, situation):
-    """상황에 맞는 구원투수 선택"""
-    available_pitchers = [p for p in pitching_team_stats if p.get('name') not in used_pitchers]
-    
-    if not available_pitchers:
-        return None
-    
-    # 상황별 투수 선택 로직
-    if inning >= 9:
-        # 9회: 마무리 투수 (ERA가 가장 낮은 투수)
-        return min(available_pitchers, key=lambda p: float(p.get('ERA', 4.00)))
-    elif inning >= 7:
-        # 7-8회: 셋업맨 (ERA 기준 상위 투수)
-        sorted_pitchers = sorted(available_pitchers, key=lambda p: float(p.get('ERA', 4.00)))
-        return sorted_pitchers[0] if sorted_pitchers else None
-    else:
-        # 중간계투: 랜덤 선택
-        return random.choice(available_pitchers)
+def simulate_at_bat(outcome_cdf, rng=random) -> int:
+    """타석 결과 시뮬레이션: 매치업 표의 누적 확률 한 줄에서 추출 → OUTCOMES 인덱스"""
+    return min(bisect_right(outcome_cdf, rng.random()), len(OUTCOMES) - 1)
 
-def simulate_at_bat(hitter_stats, pitcher_era_factor=1.0):
-    """현실적인 타석 결과 시뮬레이션"""
-    probs = calculate_realistic_probabilities(hitter_stats, "타자")
-    
-    # 투수 능력에 따른 확률 조정
-    adjusted_hit_prob = probs["hit"] / pitcher_era_factor
-    adjusted_hr_prob = probs["homerun"] / pitcher_era_factor
-    
-    random_val = random.random()
-    
-    if random_val < adjusted_hr_prob:
-        return "홈런", False
-    elif random_val < adjusted_hr_prob + adjusted_hit_prob:
-        return "안타", False
-    elif random_val < adjusted_hr_prob + adjusted_hit_prob + probs["walk"]:
-        return "볼넷", False
-    else:
-        out_types = ["삼진", "플라이아웃", "땅볼아웃", "스트라이크 아웃"]
-        return random.choice(out_types), True
+def advance_state(outcome: int, state: int, rng=random):
+    """타석 결과(OUTCOMES 인덱스)로 상태 전이 → (다음 상태, 득점). 확률적 진루는 분기 중 하나를 추출"""
+    branches = STATE_TRANSITIONS[outcome][state]
+    u = rng.random()
+    for cumulative_prob, next_state, runs in branches:
+        if u < cumulative_prob:
+            return next_state, runs
+    return branches[-1][1], branches[-1][2]
 
-def simulate_realistic_inning_with_pitcher_management(batting_team_stats, pitching_team_stats, inning_name, game_state):
-    """투수 교체를 포함한 현실적인 이닝 시뮬레이션"""
+def simulate_realistic_inning_with_pitcher_management(batting_team_stats, pitching_team_stats, inning_name, game_state, walkoff_target=None, rng=random):
+    """투수 교체를 포함한 현실적인 이닝 시뮬레이션
+
+    walkoff_target: 9회 이후 말 공격에서 홈 팀이 뒤진 점수 차. 이보다 많이 득점하면 끝내기로 종료
+    rng: 난수 공급 (random.Random(seed)를 주면 같은 로스터/엔진 버전에서 같은 경기가 재현됨)
+    """
     plays = []
-    outs = 0
-    runners = {"1루": False, "2루": False, "3루": False}
+    state = 0   # state_index(아웃, 주자 비트)
     runs_scored = 0
     
-    # 현재 투수 정보
-    current_pitcher = game_state.get('current_pitcher')
-    if not current_pitcher and pitching_team_stats:
-        current_pitcher = pitching_team_stats[0]  # 선발투수
-        game_state['current_pitcher'] = current_pitcher
-        game_state['used_pitchers'] = {current_pitcher.get('name')}
-        game_state['pitcher_runs_allowed'] = 0
-        game_state['pitcher_outs'] = 0
+    # 투수진 상태 (경기당 한 번 생성, 선발은 첫 투수)
+    staff = game_state.get('staff')
+    if staff is None:
+        staff = game_state['staff'] = PitchingStaff(pitching_team_stats)
     
     # 투수 교체 검토
     inning_num = int(inning_name.split('회')[0])
-    if (inning_num >= 6 and 
-        determine_pitcher_change(
-            current_pitcher, 
-            pitching_team_stats, 
-            inning_num, 
-            game_state.get('pitcher_runs_allowed', 0),
-            game_state.get('pitcher_outs', 0)
-        )):
-        
-        # 새 투수 선택
-        new_pitcher = select_relief_pitcher(
-            pitching_team_stats, 
-            game_state.get('used_pitchers', set()), 
-            inning_num, 
-            'normal'
-        )
-        
-        if new_pitcher:
-            old_pitcher_name = current_pitcher.get('name', '투수')
-            new_pitcher_name = new_pitcher.get('name', '투수')
+    if inning_num >= CHANGE_FROM_INNING and determine_pitcher_change(staff, inning_num, rng):
+        old_slot = int(staff.current[0])
+        new_slot = select_relief_pitcher(staff, inning_num)
+        if new_slot is not None:
+            old_pitcher_name = (staff.pitchers[old_slot] or {}).get('name', '투수')
+            new_pitcher_name = (staff.pitchers[new_slot] or {}).get('name', '투수')
             plays.append(f"투수교체: {old_pitcher_name} → {new_pitcher_name}")
-            
-            current_pitcher = new_pitcher
-            game_state['current_pitcher'] = current_pitcher
-            game_state['used_pitchers'].add(new_pitcher_name)
-            game_state['pitcher_runs_allowed'] = 0
-            game_state['pitcher_outs'] = 0
     
-    # 투수 ERA 팩터 계산
-    pitcher_era_factor = 1.0
-    if current_pitcher:
-        pitcher_probs = calculate_realistic_probabilities(current_pitcher, "투수")
-        pitcher_era_factor = pitcher_probs["era_factor"]
+    # 타자×투수 결과 분포 표는 경기당 한 번만 계산 (타석마다 표 조회)
+    matchups = game_state.get('matchups')
+    if matchups is None and batting_team_stats:
+        matchups = game_state['matchups'] = [row.tolist() for row in cumulative(
+            matchup_table(batting_team_stats, staff.pitchers).transpose(1, 0, 2)
+        )]
+    pitcher_slot = int(staff.current[0])
     
-    batter_index = 0
-    max_batters = min(len(batting_team_stats), 15)
+    # 타순은 이닝 사이에 이어짐 (game_state는 상대 투수진 상태이므로 이 공격 팀 전용)
+    batter_index = game_state.get('batter_index', 0)
+    plate_appearances = 0
     
-    while outs < 3 and batter_index < max_batters:
+    while state != INNING_OVER and plate_appearances < MAX_PA_PER_INNING:
         if not batting_team_stats:
             break
             
         batter = batting_team_stats[batter_index % len(batting_team_stats)]
-        batter_name = batter.get('name', f'선수{batter_index+1}')
+        batter_name = batter.get('name', f'선수{batter_index % len(batting_team_stats) + 1}')
         
-        result, is_out = simulate_at_bat(batter, pitcher_era_factor)
+        outcome = simulate_at_bat(matchups[pitcher_slot][batter_index % len(batting_team_stats)], rng)
+        result = RESULT_LABELS[OUTCOMES[outcome]]
+        runs_before = runs_scored
         
-        if is_out:
-            outs += 1
-            game_state['pitcher_outs'] += 1
-            plays.append(f"{batter_name}: {result} ({outs}아웃)")
-        else:
-            if result == "홈런":
-                runs_this_play = 1 + sum(runners.values())
-                runs_scored += runs_this_play
-                game_state['pitcher_runs_allowed'] += runs_this_play
-                runners = {"1루": False, "2루": False, "3루": False}
-                plays.append(f"{batter_name}: {result} ({outs}아웃)")
-            elif result == "안타":
-                runs_this_play = 0
-                if runners["3루"]:
-                    runs_this_play += 1
-                if runners["2루"] and random.random() < 0.7:
-                    runs_this_play += 1
-                    runners["2루"] = False
-                if runners["1루"]:
-                    runners["2루"] = True
-                    runners["1루"] = False
-                runners["1루"] = True
-                
-                runs_scored += runs_this_play
-                game_state['pitcher_runs_allowed'] += runs_this_play
-                plays.append(f"{batter_name}: {result} ({outs}아웃)")
-            elif result == "볼넷":
-                runs_this_play = 0
-                if runners["3루"] and runners["2루"] and runners["1루"]:
-                    runs_this_play += 1
-                if runners["2루"] and runners["1루"]:
-                    runners["3루"] = True
-                if runners["1루"]:
-                    runners["2루"] = True
-                runners["1루"] = True
-                
-                runs_scored += runs_this_play
-                game_state['pitcher_runs_allowed'] += runs_this_play
-                plays.append(f"{batter_name}: {result} ({outs}아웃)")
+        # 아웃/주자 상태 전이와 득점은 공용 전이표에서 (세 번째 아웃이면 주루/득점 없음)
+        state, runs_this_play = advance_state(outcome, state, rng)
+        runs_scored += runs_this_play
+        outs = 3 if state == INNING_OVER else state // N_BASES
+        plays.append(f"{batter_name}: {result} ({outs}아웃)")
         
         batter_index += 1
+        plate_appearances += 1
+
+        walkoff = walkoff_target is not None and runs_scored > walkoff_target
+        if walkoff:
+            # 끝내기: 홈런이 아니면 결승 득점까지만 인정
+            if result != "홈런":
+                runs_scored = walkoff_target + 1
+            plays[-1] = f"{batter_name}: 끝내기 {result} ({outs}아웃)"
+        staff.record(0, outcome, runs_scored - runs_before)
+        if walkoff:
+            break
     
+    game_state['batter_index'] = batter_index % len(batting_team_stats) if batting_team_stats else 0
     return plays, runs_scored
 
-def generate_realistic_simulation_with_pitcher_management(home_hitter_stats, home_pitcher_stats, away_hitter_stats, away_pitcher_stats):
-    """투수 교체를 포함한 현실적인 9이닝 경기 시뮬레이션"""
+def generate_realistic_simulation_with_pitcher_management(home_hitter_stats, home_pitcher_stats, away_hitter_stats, away_pitcher_stats, rng=random):
+    """투수 교체를 포함한 현실적인 경기 시뮬레이션
+
+    9회 이후 초 공격 뒤 홈 팀이 앞서면 말 공격 생략, 말 공격 중 역전하면 끝내기,
+    동점이면 MAX_INNINGS까지 연장하고 그래도 동점이면 무승부로 종료
+    """
     game_result = []
     home_score = 0
     away_score = 0
@@ -232,10 +135,10 @@ def generate_realistic_simulation_with_pitcher_management(home_hitter_stats, hom
     home_pitcher_state = {}
     away_pitcher_state = {}
     
-    for inning in range(1, 10):
+    for inning in range(1, MAX_INNINGS + 1):
         # 초 (원정팀 공격)
         plays, runs = simulate_realistic_inning_with_pitcher_management(
-            away_hitter_stats, home_pitcher_stats, f"{inning}회초", home_pitcher_state
+            away_hitter_stats, home_pitcher_stats, f"{inning}회초", home_pitcher_state, rng=rng,
         )
         away_score += runs
         
@@ -244,10 +147,15 @@ def generate_realistic_simulation_with_pitcher_management(home_hitter_stats, hom
             "plays": plays,
             "score": f"{away_score}-{home_score}"
         })
+
+        late = inning >= REGULATION_INNINGS
+        if late and home_score > away_score:
+            break
         
         # 말 (홈팀 공격)
         plays, runs = simulate_realistic_inning_with_pitcher_management(
-            home_hitter_stats, away_pitcher_stats, f"{inning}회말", away_pitcher_state
+            home_hitter_stats, away_pitcher_stats, f"{inning}회말", away_pitcher_state,
+            walkoff_target=away_score - home_score if late else None, rng=rng,
         )
         home_score += runs
         
@@ -256,6 +164,9 @@ def generate_realistic_simulation_with_pitcher_management(home_hitter_stats, hom
             "plays": plays,
             "score": f"{away_score}-{home_score}"
         })
+
+        if late and home_score != away_score:
+            break
     
     return game_result
 
@@ -411,52 +322,78 @@ def clean_json_result(result: str) -> str:
     else:
         return result
 
-def simulate_game_rag(home_team_name, home_players, away_team_name, away_players):
-    try:
-        request = {
-            "home_team_name": home_team_name,
-            "home_players": home_players,
-            "away_team_name": away_team_name,
-            "away_players": away_players
-        }
-        
-        # 1. 선수 ID 추출
-        home_pitcher_ids = [p["id"] for p in request["home_players"] if p["position"] == "투수"]
-        home_hitter_ids = [p["id"] for p in request["home_players"] if p["position"] != "투수"]
-        away_pitcher_ids = [p["id"] for p in request["away_players"] if p["position"] == "투수"]
-        away_hitter_ids = [p["id"] for p in request["away_players"] if p["position"] != "투수"]
+# 로스터별 프롬프트 메모이제이션 (선수 기록 스냅샷 버전이 키에 포함되어 기록 갱신 시 자연히 교체)
+_prompt_cache = TTLCache(maxsize=settings.simulation_prompt_cache_size)
 
-        # 2. DB에서 기록 가져오기
-        home_pitcher_stats = get_player_stats_by_ids(home_pitcher_ids, "투수")
-        home_hitter_stats = get_player_stats_by_ids(home_hitter_ids, "타자")
-        away_pitcher_stats = get_player_stats_by_ids(away_pitcher_ids, "투수")
-        away_hitter_stats = get_player_stats_by_ids(away_hitter_ids, "타자")
+def get_prompt(home_team_name, away_team_name, home_pitcher_stats, home_hitter_stats, away_pitcher_stats, away_hitter_stats):
+    """generate_prompt 결과를 로스터(팀 이름 + 순서 있는 선수 ID) 단위로 캐시"""
+    key = (
+        home_team_name, away_team_name,
+        *(tuple(p.get('id') for p in stats)
+          for stats in (home_pitcher_stats, home_hitter_stats, away_pitcher_stats, away_hitter_stats)),
+        player_stats_repository.version,
+    )
+    prompt = _prompt_cache.get(key)
+    if prompt is None:
+        prompt = generate_prompt(
+            home_team_name,
+            away_team_name,
+            home_pitcher_stats,
+            home_hitter_stats,
+            away_pitcher_stats,
+            away_hitter_stats
+        )
+        _prompt_cache.set(key, prompt, settings.simulation_prompt_cache_ttl)
+    return prompt
+
+def load_roster_stats(home_players, away_players):
+    """요청 선수 목록 → (홈 타자, 홈 투수, 원정 타자, 원정 투수) 기록 (요청 순서 유지)"""
+    stats = []
+    for players in (home_players, away_players):
+        stats.append(get_player_stats_by_ids([p["id"] for p in players if p["position"] != "투수"], "타자"))
+        stats.append(get_player_stats_by_ids([p["id"] for p in players if p["position"] == "투수"], "투수"))
+    return tuple(stats)
+
+def simulate_game_rag(home_team_name, home_players, away_team_name, away_players, include_prompt=False, seed=None):
+    with stage_timer("simulation"):
+        return _simulate_game_rag(home_team_name, home_players, away_team_name, away_players, include_prompt, seed)
+
+def _simulate_game_rag(home_team_name, home_players, away_team_name, away_players, include_prompt=False, seed=None):
+    # 경기마다 시드를 정해 두면 같은 로스터/엔진 버전에서 같은 경기를 다시 만들 수 있음
+    seed = seed if seed is not None else random.randrange(2 ** 31)
+    try:
+        # 1~2. 선수 ID 추출 후 기록 가져오기
+        home_hitter_stats, home_pitcher_stats, away_hitter_stats, away_pitcher_stats = load_roster_stats(
+            home_players, away_players
+        )
 
         # 3. 투수 교체를 포함한 현실적인 시뮬레이션 생성
         realistic_result = generate_realistic_simulation_with_pitcher_management(
             home_hitter_stats, home_pitcher_stats, 
-            away_hitter_stats, away_pitcher_stats
+            away_hitter_stats, away_pitcher_stats,
+            rng=random.Random(seed),
         )
         
         # JSON 형태로 변환
         
         realistic_json = json.dumps(realistic_result, ensure_ascii=False, indent=2)
 
-        # 4. 프롬프트 생성 (기존 방식 유지)
-        prompt = generate_prompt(
-            home_team_name,
-            away_team_name,
-            home_pitcher_stats,
-            home_hitter_stats,
-            away_pitcher_stats,
-            away_hitter_stats
-        )
+        # 4. 프롬프트는 요청한 경우에만 생성 (LLM 경로를 쓰지 않으므로 기본 생략)
+        prompt = None
+        if include_prompt:
+            prompt = get_prompt(
+                home_team_name,
+                away_team_name,
+                home_pitcher_stats,
+                home_hitter_stats,
+                away_pitcher_stats,
+                away_hitter_stats
+            )
 
         # 5. 현실적인 시뮬레이션 결과 반환
-        return {"prompt": prompt, "result": realistic_json}
+        return {"prompt": prompt, "result": realistic_json, "game": realistic_result, "seed": seed}
         
     except Exception as e:
         
-        error_details = traceback.format_exc()
-        print(f"상세 오류: {error_details}")
-        return {"prompt": "", "result": f"시뮬레이션 처리 중 오류: {str(e)}"}
+        logger.exception("시뮬레이션 처리 오류: %s", e)
+        return {"prompt": None, "result": f"시뮬레이션 처리 중 오류: {str(e)}", "game": None, "seed": seed}
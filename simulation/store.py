@@ -0,0 +1,100 @@
+# store.py
+# 시뮬레이션 결과 저장소: 공유 링크/새로고침 시 엔진을 다시 돌리지 않고 ID로 같은 경기를 보여줌
+#
+# 경기 기록은 공백 없는 JSON을 zlib으로 압축해 한 행에 저장하고(보통 1KB 안팎),
+# 재현용 시드와 엔진 버전을 함께 남긴다. 테이블은 앱 시작 시 ensure_simulation_store()로 만들고,
+# 만료된 행은 시작 시와 저장 시(주기마다 한 번) 지운다.
+import json
+import logging
+import secrets
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+from config.config import settings
+from utils.db import DB_ERRORS, db_cursor, fetch_one
+
+SIMULATION_RESULT_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS simulation_result (
+    id CHAR(16) PRIMARY KEY,
+    engine_version INT NOT NULL,
+    seed BIGINT NOT NULL,
+    home_team_name VARCHAR(50) NOT NULL,
+    away_team_name VARCHAR(50) NOT NULL,
+    game BLOB NOT NULL,
+    created_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    KEY idx_simulation_result_expires_at (expires_at)
+)
+"""
+
+_lock = threading.Lock()
+_last_cleanup = 0.0
+
+def encode_game(game: List[Dict[str, Any]]) -> bytes:
+    return zlib.compress(json.dumps(game, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def decode_game(data: bytes) -> List[Dict[str, Any]]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+def ensure_simulation_store():
+    """결과 테이블 생성과 만료 행 정리 (앱 시작 시 한 번, 실패하면 저장/조회만 실패하고 서비스는 계속)"""
+    global _last_cleanup
+    try:
+        with db_cursor() as cursor:
+            cursor.execute(SIMULATION_RESULT_TABLE_SQL)
+            cursor.execute("DELETE FROM simulation_result WHERE expires_at < NOW()")
+        _last_cleanup = time.monotonic()
+    except DB_ERRORS as e:
+        logging.error("시뮬레이션 결과 테이블 준비 실패: %s", e)
+
+def _cleanup_due() -> bool:
+    global _last_cleanup
+    with _lock:
+        now = time.monotonic()
+        if now - _last_cleanup < settings.simulation_store_cleanup_interval:
+            return False
+        _last_cleanup = now
+        return True
+
+def save_simulation(
+    game: List[Dict[str, Any]],
+    seed: int,
+    engine_version: int,
+    home_team_name: str,
+    away_team_name: str,
+) -> Optional[str]:
+    """경기 기록 저장 → ID. 저장에 실패하면 None (시뮬레이션 응답은 그대로 나감)"""
+    simulation_id = secrets.token_urlsafe(12)
+    try:
+        with db_cursor() as cursor:
+            if _cleanup_due():
+                cursor.execute("DELETE FROM simulation_result WHERE expires_at < NOW()")
+            cursor.execute("""
+                INSERT INTO simulation_result
+                    (id, engine_version, seed, home_team_name, away_team_name, game, created_at, expires_at)
+                VALUES (%s, %s, %s, %s, %s, %s, NOW(), NOW() + INTERVAL %s SECOND)
+            """, (
+                simulation_id, engine_version, seed, home_team_name, away_team_name,
+                encode_game(game), settings.simulation_store_ttl,
+            ))
+        return simulation_id
+    except DB_ERRORS as e:
+        logging.warning("시뮬레이션 결과 저장 실패: %s", e)
+        return None
+
+def load_simulation(simulation_id: str) -> Optional[Dict[str, Any]]:
+    """저장된 경기 (만료되었거나 없으면 None)"""
+    try:
+        row = fetch_one("""
+            SELECT id, engine_version, seed, home_team_name, away_team_name, game, created_at
+            FROM simulation_result
+            WHERE id = %s AND expires_at >= NOW()
+        """, (simulation_id,))
+    except DB_ERRORS as e:
+        logging.warning("시뮬레이션 결과 조회 실패(%s): %s", simulation_id, e)
+        return None
+    if row is None:
+        return None
+    row["game"] = decode_game(row["game"])
+    return row
@@ -0,0 +1,187 @@
+# win_expectancy.py
+# 경기 중간 상태(이닝/초말/아웃/주자/점수/타순)에서의 승리 확률과 남은 기대 득점
+#
+# 매치업(양 팀 타순 + 투수)마다 반 이닝 분포를 만든 뒤, 마지막 이닝부터 거꾸로
+# "반 이닝이 끝난 직후 상태 → (홈 승리, 무승부, 홈 남은 득점, 원정 남은 득점)" 표를 한 번 계산해 둔다.
+# 조회는 현재 반 이닝의 남은 부분만 계산해 표와 결합하므로 즉시 응답한다.
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from config.config import settings
+from utils.cache import TTLCache
+from simulation.outcomes import MAX_INNINGS, REGULATION_INNINGS, state_index
+from simulation.run_expectancy import MAX_INNING_RUNS, half_innings, half_inning
+from simulation.lineup_optimizer import lineup_matrices
+from simulation.pitching import pitcher_era
+
+LATE_INNING = 7           # 이 이닝부터 필승조(남은 투수 중 ERA 최저)가 던진다고 가정
+MAX_DIFF = 30             # 점수 차 상한 (넘는 차이는 상한으로 취급)
+
+# 기록이 없을 때 쓰는 리그 평균 선수 (점수만 아는 중계 경기용 기본 표)
+LEAGUE_HITTER = {"name": "리그평균", "avg": 0.265, "HR": 15}
+LEAGUE_PITCHER = {"name": "리그평균", "ERA": 4.30}
+
+HOME_WIN, TIE, HOME_RUNS, AWAY_RUNS = range(4)
+
+def late_pitcher(current: Dict[str, Any], available: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """후반 이닝 투수: 현재 투수와 남은 투수 중 ERA가 가장 낮은 투수 (엔진 PitchingStaff와 같은 기준)"""
+    return min([current, *available], key=pitcher_era)
+
+def _shift_diff(values: np.ndarray, runs: int) -> np.ndarray:
+    """values[:, d] → values[:, d + runs] 위치의 값 (점수 차 축은 양 끝에서 고정)"""
+    size = values.shape[1]
+    index = np.clip(np.arange(size) + runs, 0, size - 1)
+    return values[:, index]
+
+class MatchupModel:
+    """한 매치업의 승리 확률 표"""
+
+    def __init__(
+        self,
+        home_hitters: Sequence[Dict[str, Any]],
+        away_hitters: Sequence[Dict[str, Any]],
+        home_pitchers: Sequence[Dict[str, Any]],
+        away_pitchers: Sequence[Dict[str, Any]],
+    ):
+        """*_pitchers: [현재 투수, 남은 투수...] (비어 있으면 리그 평균)"""
+        home_pitchers = list(home_pitchers) or [LEAGUE_PITCHER]
+        away_pitchers = list(away_pitchers) or [LEAGUE_PITCHER]
+        self.home_hitters = list(home_hitters) or [LEAGUE_HITTER]
+        self.away_hitters = list(away_hitters) or [LEAGUE_HITTER]
+
+        # 공격 팀별, 국면별(초중반/후반) 타석 전이: 상대 투수는 국면마다 고정
+        self.mats = {
+            "away": [
+                lineup_matrices(self.away_hitters, home_pitchers[0]),
+                lineup_matrices(self.away_hitters, late_pitcher(home_pitchers[0], home_pitchers[1:])),
+            ],
+            "home": [
+                lineup_matrices(self.home_hitters, away_pitchers[0]),
+                lineup_matrices(self.home_hitters, late_pitcher(away_pitchers[0], away_pitchers[1:])),
+            ],
+        }
+        self.tables = {
+            team: [half_innings(mats, range(len(mats))) for mats in phases]
+            for team, phases in self.mats.items()
+        }
+        self._build()
+
+    @staticmethod
+    def _phase(inning: int) -> int:
+        return 1 if inning >= LATE_INNING else 0
+
+    def _terminal(self, k: int, after: np.ndarray) -> np.ndarray:
+        """반 이닝 k 직후 경기가 끝나는 상태의 값을 덮어씀"""
+        inning, bottom = k // 2 + 1, k % 2 == 1
+        diff = np.arange(-MAX_DIFF, MAX_DIFF + 1)
+        after = after.copy()
+        if inning >= REGULATION_INNINGS:
+            if bottom:
+                decided = diff != 0
+                after[:, decided] = 0.0
+                after[HOME_WIN, diff > 0] = 1.0
+            else:
+                # 9회 이후 초 공격 뒤 홈 팀이 앞서면 말 공격 없이 종료
+                after[:, diff > 0] = 0.0
+                after[HOME_WIN, diff > 0] = 1.0
+        if bottom and inning == MAX_INNINGS:
+            after[:, diff == 0] = 0.0
+            after[TIE, diff == 0] = 1.0
+        return after
+
+    def _play(self, k: int, after: np.ndarray, table: np.ndarray) -> np.ndarray:
+        """반 이닝 k 시작 상태의 값 = 반 이닝 결과 분포 × 직후 상태의 값
+
+        table: [선두 타순, 득점, 다음 선두 타순] (선두 타순 축은 일부만 있어도 됨)
+        """
+        bottom = k % 2 == 1
+        runs_component = HOME_RUNS if bottom else AWAY_RUNS
+        result = 0.0
+        for runs in range(MAX_INNING_RUNS + 1):
+            weights = table[:, runs, :]
+            if not weights.any():
+                continue
+            shifted = _shift_diff(after, runs if bottom else -runs)
+            if bottom:
+                # after[c, d, 홈 다음 타순, 원정 타순]
+                result = result + np.einsum("cdba,hb->cdha", shifted, weights)
+            else:
+                result = result + np.einsum("cdhb,ab->cdha", shifted, weights)
+        expected = np.einsum("srt,r->s", table, np.arange(MAX_INNING_RUNS + 1))
+        if bottom:
+            result[runs_component] += expected[None, :, None]
+        else:
+            result[runs_component] += expected[None, None, :]
+        return result
+
+    def _build(self):
+        n_home, n_away = len(self.home_hitters), len(self.away_hitters)
+        # 마지막 반 이닝 직후: 값은 종료 처리에서 채워짐 (동점은 무승부)
+        after = np.zeros((4, 2 * MAX_DIFF + 1, n_home, n_away))
+        self.after = [None] * (2 * MAX_INNINGS)
+        for k in reversed(range(2 * MAX_INNINGS)):
+            after = self._terminal(k, after)
+            self.after[k] = after
+            inning, team = k // 2 + 1, ("home" if k % 2 else "away")
+            after = self._play(k, after, self.tables[team][self._phase(inning)])
+        self.start = after  # 경기 시작 전 상태의 값
+
+    def evaluate(
+        self,
+        inning: int,
+        bottom: bool,
+        outs: int,
+        bases: int,
+        home_score: int,
+        away_score: int,
+        home_slot: int = 0,
+        away_slot: int = 0,
+    ) -> Dict[str, float]:
+        """현재 반 이닝의 남은 부분만 계산해 직후 표와 결합"""
+        inning = min(max(inning, 1), MAX_INNINGS)
+        k = (inning - 1) * 2 + (1 if bottom else 0)
+        team = "home" if bottom else "away"
+        mats = self.mats[team][self._phase(inning)]
+        slot = (home_slot if bottom else away_slot) % len(mats)
+
+        partial = half_inning(mats, slot, state_index(outs, bases))[None]
+        values = self._play(k, self.after[k], partial)
+
+        diff = int(np.clip(home_score - away_score, -MAX_DIFF, MAX_DIFF)) + MAX_DIFF
+        if bottom:
+            result = values[:, diff, 0, away_slot % len(self.away_hitters)]
+        else:
+            result = values[:, diff, home_slot % len(self.home_hitters), 0]
+        home_win, tie = float(result[HOME_WIN]), float(result[TIE])
+        return {
+            "home_win_probability": home_win,
+            "away_win_probability": max(0.0, 1.0 - home_win - tie),
+            "tie_probability": tie,
+            "home_expected_remaining_runs": float(result[HOME_RUNS]),
+            "away_expected_remaining_runs": float(result[AWAY_RUNS]),
+        }
+
+# 매치업 표 메모이제이션 (선수 기록 스냅샷 버전이 키에 포함되어 기록 갱신 시 자연히 교체)
+_models = TTLCache(maxsize=settings.win_expectancy_cache_size)
+
+def _key(players: Sequence[Dict[str, Any]]) -> tuple:
+    return tuple(p.get("id") for p in players)
+
+def get_matchup_model(home_hitters, away_hitters, home_pitchers, away_pitchers, version: int = 0) -> MatchupModel:
+    key = (_key(home_hitters), _key(away_hitters), _key(home_pitchers), _key(away_pitchers), version)
+    model = _models.get(key)
+    if model is None:
+        model = MatchupModel(home_hitters, away_hitters, home_pitchers, away_pitchers)
+        _models.set(key, model, settings.win_expectancy_cache_ttl)
+    return model
+
+_league_model: Optional[MatchupModel] = None
+
+def get_league_model() -> MatchupModel:
+    """리그 평균 매치업 (점수/이닝만 아는 경기용, 기록과 무관하므로 한 번만 계산)"""
+    global _league_model
+    if _league_model is None:
+        _league_model = MatchupModel([LEAGUE_HITTER] * 9, [LEAGUE_HITTER] * 9, [LEAGUE_PITCHER], [LEAGUE_PITCHER])
+    return _league_model
+
+def get_win_expectancy_cache_stats() -> dict:
+    return _models.stats()
@@ -0,0 +1,90 @@
+# cache.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+_MISSING = object()
+
+class TTLCache:
+    """항목별 TTL을 갖는 크기 제한 LRU 캐시
+
+    만료된 항목도 stale_ttl 동안은 get_stale()로 꺼낼 수 있다
+    (업스트림 오류 시 폴백, stale-while-revalidate 용도).
+    """
+
+    def __init__(self, maxsize: int = 1024, stale_ttl: float = 0.0):
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._data: OrderedDict = OrderedDict()  # key → (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] <= now:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] + self.stale_ttl <= time.monotonic():
+                return default
+            return item[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 비동기 호출을 한 번의 실행으로 합친다 (request coalescing)"""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+
+            def _done(finished, key=key):
+                if self._inflight.get(key) is finished:
+                    del self._inflight[key]
+
+            task.add_done_callback(_done)
+        # 한 호출자가 취소돼도 다른 대기자의 요청은 계속 진행
+        return await asyncio.shield(task)
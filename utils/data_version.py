@@ -0,0 +1,109 @@
+# data_version.py
+import logging
+from typing import Dict, Optional, Set
+from utils.db import DB_ERRORS, fetch_all, fetch_one
+
+# 테이블별 데이터 버전 (크롤러가 쓰기 후 올리고, 캐시는 값이 바뀌면 다시 적재)
+DATA_VERSION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS data_version (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+)
+"""
+
+# 버전별로 바뀐 행 ID (캐시가 바뀐 행만 다시 읽을 수 있도록)
+DATA_CHANGELOG_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS data_changelog (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL,
+    version BIGINT NOT NULL,
+    row_id BIGINT NOT NULL,
+    change_type VARCHAR(10) NOT NULL,
+    changed_at DATETIME NOT NULL,
+    KEY idx_data_changelog_name_version (name, version)
+)
+"""
+
+# 마지막으로 저장한 행의 해시 (변경 감지용)
+DATA_ROW_HASH_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS data_row_hash (
+    name VARCHAR(50) NOT NULL,
+    row_id BIGINT NOT NULL,
+    row_hash CHAR(40) NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (name, row_id)
+)
+"""
+
+def ensure_data_version_tables(cursor):
+    """버전/변경 이력 테이블 생성. DDL은 암묵적 커밋을 일으키므로 데이터 트랜잭션 시작 전에 호출"""
+    cursor.execute(DATA_VERSION_TABLE_SQL)
+    cursor.execute(DATA_CHANGELOG_TABLE_SQL)
+    cursor.execute(DATA_ROW_HASH_TABLE_SQL)
+
+def _first_value(row):
+    if row is None:
+        return None
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+def bump_data_version(cursor, name: str, changes: Optional[Dict[int, str]] = None) -> int:
+    """name의 데이터 버전을 1 올리고 바뀐 행({row_id: "insert"|"update"})을 이력에 기록.
+    데이터 쓰기와 같은 트랜잭션에서 호출 (ensure_data_version_tables 선행 필요)"""
+    cursor.execute("""
+        INSERT INTO data_version (name, version, updated_at)
+        VALUES (%s, 1, NOW())
+        ON DUPLICATE KEY UPDATE version = version + 1, updated_at = NOW()
+    """, (name,))
+    cursor.execute("SELECT version FROM data_version WHERE name = %s", (name,))
+    version = _first_value(cursor.fetchone())
+
+    if changes:
+        cursor.executemany("""
+            INSERT INTO data_changelog (name, version, row_id, change_type, changed_at)
+            VALUES (%s, %s, %s, %s, NOW())
+        """, [(name, version, row_id, change_type) for row_id, change_type in changes.items()])
+    return version
+
+def prune_changelog(cursor, keep_days: int = 30):
+    """오래된 변경 이력 삭제 (이보다 오래된 버전의 구독자는 전체 재적재로 처리됨)"""
+    cursor.execute(
+        "DELETE FROM data_changelog WHERE changed_at < NOW() - INTERVAL %s DAY", (keep_days,)
+    )
+
+def prune_row_hashes(cursor, table: str):
+    """table에서 사라진 행의 해시 삭제 (남은 해시는 행당 하나라 테이블 크기를 넘지 않음)"""
+    cursor.execute(f"""
+        DELETE h FROM data_row_hash h
+        LEFT JOIN {table} t ON t.id = h.row_id
+        WHERE h.name = %s AND t.id IS NULL
+    """, (table,))
+
+def get_data_version(name: str) -> Optional[int]:
+    """현재 데이터 버전. 버전 테이블을 읽을 수 없으면 None"""
+    try:
+        row = fetch_one("SELECT version FROM data_version WHERE name = %s", (name,))
+        return row["version"] if row else 0
+    except DB_ERRORS as e:
+        logging.debug("데이터 버전 조회 실패(%s): %s", name, e)
+        return None
+
+def get_changes_since(name: str, since_version: Optional[int], current_version: int) -> Optional[Set[int]]:
+    """since_version 이후 current_version까지 바뀐 행 ID.
+    이력이 없는 버전(전체 쓰기, 정리된 이력 등)이 끼어 있으면 None → 전체 재적재 필요"""
+    if since_version is None or current_version < since_version:
+        return None
+    if current_version == since_version:
+        return set()
+    try:
+        rows = fetch_all("""
+            SELECT version, row_id FROM data_changelog
+            WHERE name = %s AND version > %s AND version <= %s
+        """, (name, since_version, current_version))
+    except DB_ERRORS as e:
+        logging.debug("변경 이력 조회 실패(%s): %s", name, e)
+        return None
+
+    if len({row["version"] for row in rows}) != current_version - since_version:
+        return None
+    return {row["row_id"] for row in rows}
@@ -1,9 +1,16 @@
 # db.py
 import pymysql
 import logging
-from sqlalchemy import create_engine
-from sqlalchemy import text
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SQLAlchemyError
 from config.config import settings
+from utils.metrics import observe_stage
+
+# 풀 체크아웃 실패(SQLAlchemy)와 쿼리 실패(pymysql)를 함께 처리
+DB_ERRORS = (pymysql.Error, SQLAlchemyError)
 
 # 환경변수 기반 연결 설정
 def get_db_config():
@@ -16,152 +23,203 @@ def get_db_config():
         'charset': settings.db_charset
     }
 
-def get_sqlalchemy_engine():
+def _create_engine():
     config = get_db_config()
     return create_engine(
-        f"mysql+pymysql://{config['user']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}?charset={config['charset']}"
+        f"mysql+pymysql://{config['user']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}?charset={config['charset']}",
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,  # 체크아웃 시 끊긴 연결 감지 후 재연결
+        connect_args={
+            "connect_timeout": settings.db_connect_timeout,
+            "read_timeout": settings.db_query_timeout,
+            "write_timeout": settings.db_query_timeout,
+        },
     )
 
-def run_sql_query(query: str) -> list[dict]:
-    config = get_db_config()
-    conn = pymysql.connect(
-        host=config['host'],
-        port=config['port'],
-        user=config['user'],
-        password=config['password'],
-        db=config['database'],
-        charset=config['charset'],
-        cursorclass=pymysql.cursors.DictCursor
-    )
-    
+# 애플리케이션 전체가 공유하는 엔진(연결 풀)
+engine = _create_engine()
+
+# 풀 지표
+_metrics_lock = threading.Lock()
+_pool_metrics = {
+    "connects": 0,
+    "checkouts": 0,
+    "checkout_wait_seconds_total": 0.0,
+    "checkout_wait_seconds_max": 0.0,
+    "invalidated": 0,
+    "query_errors": 0,
+}
+
+def _incr(key: str, value=1):
+    with _metrics_lock:
+        _pool_metrics[key] += value
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _incr("connects")
+    # 서버 측에서도 SELECT 실행 시간을 제한 (MySQL 5.7.8+)
     try:
-        cursor = conn.cursor()
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        return rows
-    except Exception as e:
-        logging.error(f"SQL 쿼리 실행 오류: {e}")
-        return []
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(
+                "SET SESSION MAX_EXECUTION_TIME = %s",
+                (settings.db_query_timeout * 1000,)
+            )
+    except pymysql.Error as e:
+        logging.warning("MAX_EXECUTION_TIME 설정 실패: %s", e)
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _incr("invalidated")
+
+def get_sqlalchemy_engine():
+    return engine
+
+def get_pool_metrics() -> dict:
+    """연결 풀 상태와 누적 지표"""
+    pool = engine.pool
+    with _metrics_lock:
+        metrics = dict(_pool_metrics)
+    metrics.update({
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    })
+    return metrics
+
+@contextmanager
+def db_cursor():
+    """풀에서 연결을 빌려 DictCursor를 제공하고, 사용 후 풀로 반환"""
+    started = time.perf_counter()
+    conn = engine.raw_connection()
+    waited = time.perf_counter() - started
+    with _metrics_lock:
+        _pool_metrics["checkouts"] += 1
+        _pool_metrics["checkout_wait_seconds_total"] += waited
+        _pool_metrics["checkout_wait_seconds_max"] = max(
+            _pool_metrics["checkout_wait_seconds_max"], waited
+        )
+
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        try:
+            yield cursor
+            conn.commit()
+        finally:
+            cursor.close()
+    except pymysql.OperationalError:
+        # 타임아웃/끊긴 연결은 풀에 되돌리지 않고 폐기
+        _incr("query_errors")
+        conn.invalidate()
+        raise
+    except Exception:
+        _incr("query_errors")
+        try:
+            conn.rollback()
+        except DB_ERRORS:
+            conn.invalidate()
+        raise
     finally:
-        cursor.close()
         conn.close()
+        observe_stage("db", time.perf_counter() - started)
+
+def fetch_all(sql: str, params=None) -> list[dict]:
+    with db_cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+def fetch_one(sql: str, params=None):
+    with db_cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()
 
-def get_connection():
-    """연결 풀 방식으로 개선"""
+def run_sql_query(query: str, params=None) -> list[dict]:
     try:
-        config = get_db_config()
-        return pymysql.connect(
-            **config,
-            cursorclass=pymysql.cursors.DictCursor
-        )
-    except Exception as e:
-        logging.error(f"DB 연결 생성 실패: {e}")
-        return None
+        return fetch_all(query, params)
+    except DB_ERRORS as e:
+        logging.error(f"SQL 쿼리 실행 오류: {e}")
+        return []
 
 def get_hitter_info_by_id(player_id: int):
-    connection = get_connection()
-    if not connection:
-        return None
-        
     try:
-        with connection, connection.cursor() as cursor:
-            sql = "SELECT * FROM hitter_info WHERE id = %s"
-            cursor.execute(sql, (player_id,))
-            return cursor.fetchone()
-    except pymysql.Error as e:
+        return fetch_one("SELECT * FROM hitter_info WHERE id = %s", (player_id,))
+    except DB_ERRORS as e:
         logging.error("타자 정보 조회 실패: %s", e)
         return None
 
 def get_pitcher_info_by_id(player_id: int):
-    connection = get_connection()
-    if not connection:
-        return None
-        
     try:
-        with connection, connection.cursor() as cursor:
-            sql = "SELECT * FROM pitcher_info WHERE id = %s"
-            cursor.execute(sql, (player_id,))
-            return cursor.fetchone()
-    except pymysql.Error as e:
+        return fetch_one("SELECT * FROM pitcher_info WHERE id = %s", (player_id,))
+    except DB_ERRORS as e:
         logging.error("투수 정보 조회 실패: %s", e)
         return None
 
 def get_stadium_by_team_name(team_name: str):
-    connection = get_connection()
-    if not connection:
-        return None
     try:
-        with connection, connection.cursor() as cursor:
-            sql = "SELECT stadium FROM team WHERE team_name = %s"
-            cursor.execute(sql, (team_name,))
-            row = cursor.fetchone()
-            return row['stadium'] if row else None
-    except pymysql.Error as e:
+        row = fetch_one("SELECT stadium FROM team WHERE team_name = %s", (team_name,))
+        return row['stadium'] if row else None
+    except DB_ERRORS as e:
         logging.error("구장 정보 조회 실패: %s", e)
         return None
 
 def get_team_id_by_name(team_name: str):
-    connection = get_connection()
-    if not connection:
-        return None
     try:
-        with connection, connection.cursor() as cursor:
-            sql = "SELECT id FROM team WHERE team_name = %s"
-            cursor.execute(sql, (team_name,))
-            row = cursor.fetchone()
-            return row['id'] if row else None
-    except pymysql.Error as e:
+        row = fetch_one("SELECT id FROM team WHERE team_name = %s", (team_name,))
+        return row['id'] if row else None
+    except DB_ERRORS as e:
         logging.error("팀 조회 실패: %s", e)
         return None
 
 def get_match_id_by_teams_and_date(home_team_id: int, away_team_id: int, match_date: str):
-    connection = get_connection()
-    if not connection:
-        return None
     try:
-        with connection, connection.cursor() as cursor:
-            sql = """
-            SELECT id FROM matches
-            WHERE home_team_id = %s AND away_team_id = %s AND DATE(match_date) = DATE(%s)
-            """
-            cursor.execute(sql, (home_team_id, away_team_id, match_date))
-            row = cursor.fetchone()
-            return row['id'] if row else None
-    except pymysql.Error as e:
+        sql = """
+        SELECT id FROM matches
+        WHERE home_team_id = %s AND away_team_id = %s AND DATE(match_date) = DATE(%s)
+        """
+        row = fetch_one(sql, (home_team_id, away_team_id, match_date))
+        return row['id'] if row else None
+    except DB_ERRORS as e:
         logging.error("경기 조회 실패: %s", e)
         return None
 
 def get_pitchers_by_team_id(team_id: int):
-    connection = get_connection()
-    if not connection:
-        return None
     try:
-        with connection, connection.cursor() as cursor:
-            sql = """
-            SELECT id, name, position, back_num FROM pitcher_info
-            WHERE team_id = %s
-            """
-            cursor.execute(sql, (team_id,))
-            rows = cursor.fetchall()
-            return rows
-    except pymysql.Error as e:
+        sql = """
+        SELECT id, name, position, back_num FROM pitcher_info
+        WHERE team_id = %s
+        """
+        return fetch_all(sql, (team_id,))
+    except DB_ERRORS as e:
         logging.error("투수 선수 정보 조회 실패: %s", e)
         return None
 
 def get_hitters_by_team_id(team_id: int):
-    connection = get_connection()
-    if not connection:
-        return None
     try:
-        with connection, connection.cursor() as cursor:
-            sql = """
-            SELECT id, name, position, back_num FROM hitter_info
-            WHERE team_id = %s
-            """
-            cursor.execute(sql, (team_id,))
-            rows = cursor.fetchall()
-            return rows
-    except pymysql.Error as e:
+        sql = """
+        SELECT id, name, position, back_num FROM hitter_info
+        WHERE team_id = %s
+        """
+        return fetch_all(sql, (team_id,))
+    except DB_ERRORS as e:
         logging.error("타자 선수 정보 조회 실패: %s", e)
         return None
 
+def get_match_ids_by_date(match_date: str) -> dict[tuple[int, int], int]:
+    """해당 날짜의 경기 ID를 한 번의 쿼리로 조회 ((home_team_id, away_team_id) → id)"""
+    try:
+        sql = """
+        SELECT id, home_team_id, away_team_id FROM matches
+        WHERE match_date >= DATE(%s) AND match_date < DATE(%s) + INTERVAL 1 DAY
+        ORDER BY id
+        """
+        match_ids = {}
+        for row in fetch_all(sql, (match_date, match_date)):
+            # 더블헤더는 기존 단건 조회와 동일하게 첫 경기 ID 사용
+            match_ids.setdefault((row['home_team_id'], row['away_team_id']), row['id'])
+        return match_ids
+    except DB_ERRORS as e:
+        logging.error("경기 일괄 조회 실패: %s", e)
+        return {}
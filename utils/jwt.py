@@ -1,32 +1,133 @@
 import base64
+import hashlib
+import time
+import httpx
 import jwt
-import requests
 
 from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import HTTPException, Request, Header
 from config.config import settings
+from utils.cache import TTLCache, SingleFlight
+from utils.metrics import stage_timer
+
+def _load_verify_keys() -> list[bytes]:
+    """현재 키 + 교체 중인 이전 키들을 시작 시 한 번만 디코딩"""
+    secrets = [settings.jwt_secret]
+    secrets += [s.strip() for s in settings.jwt_previous_secrets.split(",") if s.strip()]
+    return [base64.b64decode(secret) for secret in secrets]
+
+_verify_keys = _load_verify_keys()
+
+# 검증된 토큰 → payload 캐시 (토큰 만료 시각 이후에는 사용하지 않음)
+_verified_cache = TTLCache(maxsize=settings.jwt_verify_cache_size)
+
+def _decode_with_keys(token: str) -> dict:
+    last_error = None
+    for key in _verify_keys:
+        try:
+            return jwt.decode(token, key, algorithms=["HS256"])
+        except jwt.InvalidSignatureError as e:
+            last_error = e  # 다른 활성 키로 재시도
+    raise last_error
 
 # JWT 토큰 검증 함수 (만료/유효성)
 def verify_token(token: str):
+    cached = _verified_cache.get(token)
+    if cached is not None:
+        return dict(cached)
     try:
-        key = base64.b64decode(settings.jwt_secret)
-        payload = jwt.decode(token, key, algorithms=["HS256"])
-        return payload
+        payload = _decode_with_keys(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Expired token") # 만료된 토큰
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token") from None # 잘못된 토큰
 
-# 외부 유저 서비스에 블랙리스트 체크 요청
-def is_token_blacklisted(token: str) -> bool:
+    ttl = settings.jwt_verify_cache_ttl
+    exp = payload.get("exp")
+    if exp:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _verified_cache.set(token, payload, ttl)
+    return dict(payload)
+
+# 블랙리스트 조회 결과 캐시 (토큰 jti 또는 해시 → 블랙리스트 여부)
+_blacklist_cache = TTLCache(maxsize=settings.jwt_blacklist_cache_size)
+_blacklist_inflight = SingleFlight()
+_user_service_client: Optional[httpx.AsyncClient] = None
+
+def _get_user_service_client() -> httpx.AsyncClient:
+    global _user_service_client
+    if _user_service_client is None or _user_service_client.is_closed:
+        _user_service_client = httpx.AsyncClient(
+            timeout=2,
+            verify=settings.user_service_verify_ssl,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        )
+    return _user_service_client
+
+async def close_user_service_client():
+    if _user_service_client is not None:
+        await _user_service_client.aclose()
+
+def _token_key(token: str, payload: dict) -> str:
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+def _blacklist_ttl(payload: dict, blacklisted: bool) -> float:
+    """블랙리스트 토큰은 오래, 정상 토큰은 짧게 캐시하되 토큰 만료 시각을 넘기지 않음"""
+    ttl = settings.jwt_blacklist_positive_ttl if blacklisted else settings.jwt_blacklist_negative_ttl
+    exp = payload.get("exp")
+    if exp:
+        ttl = min(ttl, exp - time.time())
+    return ttl
+
+# 외부 유저 서비스에 블랙리스트 체크 요청 (실패 시 None)
+async def _fetch_blacklist_status(token: str) -> Optional[bool]:
     url = f"{settings.user_service_url}/user/api/token/blacklist-check"
     try:
-        resp = requests.post(url, json={"token": token}, timeout=2, verify=False)
+        resp = await _get_user_service_client().post(url, json={"token": token})
         if resp.status_code == 200:
             return resp.json().get("blacklisted", False)
     except Exception:
         pass
-    return True  # 실패 시 안전하게 막음
+    return None
+
+async def is_token_blacklisted(token: str, payload: dict) -> bool:
+    key = _token_key(token, payload)
+    cached = _blacklist_cache.get(key)
+    if cached is not None:
+        return cached
+
+    blacklisted = await _blacklist_inflight.do(key, lambda: _fetch_blacklist_status(token))
+    if blacklisted is None:
+        return True  # 실패 시 안전하게 막음 (캐시하지 않음)
+
+    ttl = _blacklist_ttl(payload, blacklisted)
+    if ttl > 0:
+        _blacklist_cache.set(key, blacklisted, ttl)
+    return blacklisted
+
+def mark_token_blacklisted(token: Optional[str] = None, jti: Optional[str] = None) -> bool:
+    """유저 서비스의 블랙리스트 등록 이벤트를 캐시에 즉시 반영"""
+    if token:
+        try:
+            payload = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            return False
+        key = _token_key(token, payload)
+    elif jti:
+        payload = {}
+        key = jti
+    else:
+        return False
+    _blacklist_cache.set(key, True, max(_blacklist_ttl(payload, True), 1))
+    return True
+
+def get_jwt_cache_stats() -> dict:
+    return {
+        "verified": _verified_cache.stats(),
+        "blacklist": _blacklist_cache.stats(),
+    }
 
 # 헤더에서 토큰 추출
 def get_token_from_header(request: Request):
@@ -37,11 +138,13 @@ def get_token_from_header(request: Request):
     return token
 
 # FastAPI Dependency: 토큰 검증 및 블랙리스트 체크
-def get_current_user(request: Request):
-    token = get_token_from_header(request)
-    if is_token_blacklisted(token):
-        raise HTTPException(status_code=401, detail="Blacklisted token")
-    payload = verify_token(token)
-    if payload is None:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return payload
+async def get_current_user(request: Request):
+    with stage_timer("auth"):
+        token = get_token_from_header(request)
+        # 서명/만료를 먼저 로컬에서 검증해 잘못된 토큰은 유저 서비스 호출 없이 거절
+        payload = verify_token(token)
+        if payload is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        if await is_token_blacklisted(token, payload):
+            raise HTTPException(status_code=401, detail="Blacklisted token")
+        return payload
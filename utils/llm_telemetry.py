@@ -0,0 +1,94 @@
+# llm_telemetry.py
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional
+from utils.metrics import counter, histogram
+
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+RATE_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 40, 60, 80, 120, 200)
+
+llm_ttft = histogram("playus_llm_ttft_seconds", "첫 토큰까지 걸린 시간 (prefill)", ("task",))
+llm_decode_seconds = histogram("playus_llm_decode_seconds", "첫 토큰 이후 디코딩 시간", ("task",))
+llm_queue_wait = histogram("playus_llm_queue_wait_seconds", "GPU 사용 대기 시간", ("task",))
+llm_decode_rate = histogram(
+    "playus_llm_decode_tokens_per_second", "디코딩 속도(토큰/초)", ("task",), buckets=RATE_BUCKETS
+)
+llm_prompt_tokens = histogram(
+    "playus_llm_prompt_tokens", "요청당 프롬프트 토큰 수", ("task",), buckets=TOKEN_BUCKETS
+)
+llm_generated_tokens = histogram(
+    "playus_llm_generated_tokens", "요청당 생성 토큰 수", ("task",), buckets=TOKEN_BUCKETS
+)
+llm_truncations = counter("playus_llm_truncations_total", "max_length 초과로 잘린 프롬프트 수", ("task",))
+llm_stop_reasons = counter("playus_llm_stop_reasons_total", "시퀀스별 생성 종료 사유", ("task", "reason"))
+
+@dataclass
+class GenerationRecord:
+    """model.generate 호출 1회의 텔레메트리"""
+    task: str
+    batch_size: int
+    prompt_tokens: int
+    generated_tokens: int
+    max_new_tokens: Optional[int]
+    queue_wait_seconds: float
+    ttft_seconds: float
+    decode_seconds: float
+    decode_tokens_per_second: float
+    truncated_tokens: int
+    stop_reasons: List[str]
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def truncated(self) -> bool:
+        return self.truncated_tokens > 0
+
+_lock = threading.Lock()
+_recent: deque = deque(maxlen=200)
+
+def record_generation(record: GenerationRecord):
+    task = record.task
+    llm_queue_wait.observe(record.queue_wait_seconds, task=task)
+    llm_ttft.observe(record.ttft_seconds, task=task)
+    llm_decode_seconds.observe(record.decode_seconds, task=task)
+    llm_decode_rate.observe(record.decode_tokens_per_second, task=task)
+    llm_prompt_tokens.observe(record.prompt_tokens, task=task)
+    llm_generated_tokens.observe(record.generated_tokens, task=task)
+    if record.truncated:
+        llm_truncations.inc(task=task)
+        logging.warning("LLM 프롬프트 잘림(%s): %d 토큰 손실", task, record.truncated_tokens)
+    for reason in record.stop_reasons:
+        llm_stop_reasons.inc(task=task, reason=reason)
+
+    with _lock:
+        _recent.append(record)
+
+def recent_generations(task: Optional[str] = None, limit: int = 50) -> List[dict]:
+    with _lock:
+        records = [r for r in _recent if task is None or r.task == task]
+    return [{**asdict(r), "truncated": r.truncated} for r in records[-limit:]]
+
+def summarize() -> dict:
+    """최근 기록 기준 작업별 요약 (하드웨어 산정/배치 검토용)"""
+    with _lock:
+        records = list(_recent)
+    summary = {}
+    for r in records:
+        s = summary.setdefault(r.task, {
+            "count": 0, "truncated": 0, "prompt_tokens": 0, "generated_tokens": 0,
+            "ttft_seconds": 0.0, "decode_tokens_per_second": 0.0, "queue_wait_seconds": 0.0,
+        })
+        s["count"] += 1
+        s["truncated"] += int(r.truncated)
+        s["prompt_tokens"] += r.prompt_tokens
+        s["generated_tokens"] += r.generated_tokens
+        s["ttft_seconds"] += r.ttft_seconds
+        s["decode_tokens_per_second"] += r.decode_tokens_per_second
+        s["queue_wait_seconds"] += r.queue_wait_seconds
+    for s in summary.values():
+        n = s["count"]
+        for key in ("prompt_tokens", "generated_tokens", "ttft_seconds", "decode_tokens_per_second", "queue_wait_seconds"):
+            s[f"avg_{key}"] = s.pop(key) / n
+    return summary
@@ -1,6 +1,16 @@
+import logging
+import queue
+import threading
+import time
+from typing import Iterator, List, Tuple
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline,GenerationConfig, BitsAndBytesConfig
+from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline,GenerationConfig, BitsAndBytesConfig, StoppingCriteria, StoppingCriteriaList
+from transformers.generation.streamers import BaseStreamer
 from config.config import settings
+from utils.metrics import counter, observe_stage
+from utils.llm_telemetry import GenerationRecord, record_generation
+
+logger = logging.getLogger(__name__)
 
 # Llama-3.1-8B 최적화된 양자화 설정
 quantization_config = BitsAndBytesConfig(
@@ -32,9 +42,98 @@ try:
     if not hasattr(model, 'quantization_config'):
         model = torch.compile(model, mode="reduce-overhead")
     else:
-        print("양자화된 모델에서는 torch.compile을 건너뜁니다.")
+        logger.info("양자화된 모델에서는 torch.compile을 건너뜁니다.")
 except Exception as e:
-    print(f"torch.compile 적용 실패: {e}")
+    logger.warning("torch.compile 적용 실패: %s", e)
+
+# LLM 토큰 수 지표
+llm_tokens = counter("playus_llm_tokens_total", "LLM 프롬프트/생성 토큰 수", ("task", "kind"))
+
+# 단일 GPU 모델을 동시에 generate하지 않도록 직렬화 (대기 시간은 queue wait로 기록)
+_generate_lock = threading.Lock()
+
+class _FirstTokenTimer(StoppingCriteria):
+    """첫 토큰이 생성된 시각을 기록 (prefill/decode 구간 분리용, 생성은 멈추지 않음)"""
+
+    def __init__(self):
+        self.first_token_at = None
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        return torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
+def encode_prompt(text, max_length: int = None):
+    """토크나이즈 후 max_length를 넘는 뒷부분을 잘라내고, 잘린 토큰 수를 함께 반환"""
+    inputs = tokenizer(text, return_tensors="pt")
+    truncated_tokens = 0
+    if max_length is not None and inputs["input_ids"].shape[1] > max_length:
+        truncated_tokens = inputs["input_ids"].shape[1] - max_length
+        inputs = {k: v[:, :max_length] for k, v in inputs.items()}
+    return {k: v.to(model.device) for k, v in inputs.items()}, truncated_tokens
+
+def _stop_reasons(generated, eos_token_id, max_new_tokens):
+    eos_ids = set(eos_token_id if isinstance(eos_token_id, (list, tuple)) else [eos_token_id])
+    reasons, lengths = [], []
+    for row in generated.tolist():
+        eos_at = next((i for i, token in enumerate(row) if token in eos_ids), None)
+        if eos_at is not None:
+            reasons.append("eos")
+            lengths.append(eos_at + 1)
+        elif max_new_tokens is not None and len(row) >= max_new_tokens:
+            reasons.append("length")
+            lengths.append(len(row))
+        else:
+            reasons.append("stop_criteria")
+            lengths.append(len(row))
+    return reasons, lengths
+
+def timed_generate(task: str, inputs, truncated_tokens: int = 0, **generation_kwargs):
+    """model.generate를 실행하고 대기/prefill/decode 시간, 토큰 수, 잘림, 종료 사유를 기록"""
+    timer = _FirstTokenTimer()
+    stopping_criteria = StoppingCriteriaList(generation_kwargs.pop("stopping_criteria", None) or [])
+    stopping_criteria.append(timer)
+
+    queued = time.perf_counter()
+    with _generate_lock:
+        started = time.perf_counter()
+        with torch.no_grad():
+            outputs = model.generate(**inputs, stopping_criteria=stopping_criteria, **generation_kwargs)
+        finished = time.perf_counter()
+
+    first_token_at = timer.first_token_at or finished
+    observe_stage("llm_prefill", first_token_at - started)
+    observe_stage("llm_decode", finished - first_token_at)
+
+    input_ids = inputs["input_ids"]
+    attention_mask = inputs.get("attention_mask")
+    prompt_tokens = int(attention_mask.sum()) if attention_mask is not None else input_ids.numel()
+    max_new_tokens = generation_kwargs.get("max_new_tokens")
+    stop_reasons, lengths = _stop_reasons(
+        outputs[:, input_ids.shape[1]:],
+        generation_kwargs.get("eos_token_id", tokenizer.eos_token_id),
+        max_new_tokens,
+    )
+    generated_tokens = sum(lengths)
+    llm_tokens.inc(prompt_tokens, task=task, kind="prompt")
+    llm_tokens.inc(generated_tokens, task=task, kind="generated")
+
+    decode_seconds = finished - first_token_at
+    decode_tokens = max(generated_tokens - len(lengths), 0)  # 첫 토큰은 prefill 구간
+    record_generation(GenerationRecord(
+        task=task,
+        batch_size=int(input_ids.shape[0]),
+        prompt_tokens=prompt_tokens,
+        generated_tokens=generated_tokens,
+        max_new_tokens=max_new_tokens,
+        queue_wait_seconds=started - queued,
+        ttft_seconds=first_token_at - started,
+        decode_seconds=decode_seconds,
+        decode_tokens_per_second=decode_tokens / decode_seconds if decode_seconds > 0 else 0.0,
+        truncated_tokens=truncated_tokens,
+        stop_reasons=stop_reasons,
+    ))
+    return outputs
 
 # Llama-3.1 Chat Template 함수
 def format_llama_prompt(prompt: str) -> str:
@@ -50,22 +149,22 @@ def generate_simulation_result(prompt: str):
         # Llama-3.1 Chat Template 적용
         formatted_prompt = format_llama_prompt(prompt)
         
-        inputs = tokenizer(formatted_prompt, return_tensors="pt", truncation=True, max_length=2048)
-        inputs = {k: v.to(model.device) for k, v in inputs.items()}
+        inputs, truncated_tokens = encode_prompt(formatted_prompt, max_length=2048)
         
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_new_tokens=2048,
-                do_sample=True,
-                temperature=0.7,  # Llama-3.1에 최적화된 값
-                top_p=0.9,
-                repetition_penalty=1.1,
-                num_beams=1,
-                pad_token_id=tokenizer.eos_token_id,
-                eos_token_id=tokenizer.eos_token_id,
-                use_cache=True  # 속도 향상
-            )
+        outputs = timed_generate(
+            "simulation",
+            inputs,
+            truncated_tokens=truncated_tokens,
+            max_new_tokens=2048,
+            do_sample=True,
+            temperature=0.7,  # Llama-3.1에 최적화된 값
+            top_p=0.9,
+            repetition_penalty=1.1,
+            num_beams=1,
+            pad_token_id=tokenizer.eos_token_id,
+            eos_token_id=tokenizer.eos_token_id,
+            use_cache=True  # 속도 향상
+        )
         
         full_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
         # Chat template 제거하고 응답만 추출
@@ -79,21 +178,94 @@ def generate_simulation_result(prompt: str):
     except Exception as e:
         return f"야구 시뮬레이션 생성 중 오류가 발생했습니다: {str(e)}"
 
+class _BatchStreamer(BaseStreamer):
+    """배치 생성 중 EOS에 도달한 행부터 (행 번호, 텍스트)를 큐로 내보냄"""
+
+    def __init__(self, batch_size: int):
+        eos = tokenizer.eos_token_id
+        self.eos_ids = set(eos if isinstance(eos, (list, tuple)) else [eos])
+        self.tokens = [[] for _ in range(batch_size)]
+        self.done = [False] * batch_size
+        self.queue = queue.Queue()
+        self._prompt_skipped = False
+        self._ended = False
+
+    def _finish(self, row: int):
+        self.done[row] = True
+        self.queue.put((row, tokenizer.decode(self.tokens[row], skip_special_tokens=True).strip()))
+
+    def put(self, value):
+        # 첫 호출은 프롬프트 토큰
+        if not self._prompt_skipped:
+            self._prompt_skipped = True
+            return
+        for row, token in enumerate(value.reshape(len(self.tokens), -1)[:, -1].tolist()):
+            if self.done[row]:
+                continue
+            if token in self.eos_ids:
+                self._finish(row)
+            else:
+                self.tokens[row].append(token)
+
+    def end(self):
+        if self._ended:
+            return
+        self._ended = True
+        for row, done in enumerate(self.done):
+            if not done:
+                self._finish(row)  # 토큰 상한에 걸린 행
+        self.queue.put(None)
+
+    def __iter__(self):
+        return iter(self.queue.get, None)
+
+def stream_batch_generate(task: str, prompts: List[str], max_new_tokens: int = 64, max_length: int = 512) -> Iterator[Tuple[int, str]]:
+    """여러 프롬프트를 한 번의 generate로 처리하고, 끝난 행부터 (프롬프트 번호, 응답)을 내보냄"""
+    formatted = [format_llama_prompt(prompt) for prompt in prompts]
+    inputs = tokenizer(formatted, return_tensors="pt", padding=True, truncation=True, max_length=max_length)
+    inputs = {k: v.to(model.device) for k, v in inputs.items()}
+    streamer = _BatchStreamer(len(prompts))
+
+    def run():
+        try:
+            timed_generate(
+                task,
+                inputs,
+                streamer=streamer,
+                max_new_tokens=max_new_tokens,
+                do_sample=True,
+                temperature=0.7,
+                top_p=0.9,
+                repetition_penalty=1.1,
+                pad_token_id=tokenizer.eos_token_id,
+                eos_token_id=tokenizer.eos_token_id,
+                use_cache=True
+            )
+        except Exception as e:
+            logger.exception("배치 생성 실패(%s): %s", task, e)
+        finally:
+            streamer.end()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    yield from streamer
+    thread.join()
+
 def detect_profanity(prompt: str):
     try:
         formatted_prompt = format_llama_prompt(prompt)
-        inputs = tokenizer(formatted_prompt, return_tensors="pt", truncation=True, max_length=512)
-        inputs = {k: v.to(model.device) for k, v in inputs.items()}
+        inputs, truncated_tokens = encode_prompt(formatted_prompt, max_length=512)
         
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_new_tokens=100,
-                do_sample=False,
-                temperature=0.1,
-                pad_token_id=tokenizer.eos_token_id,
-                eos_token_id=tokenizer.eos_token_id
-            )
+        outputs = timed_generate(
+            "detect",
+            inputs,
+            truncated_tokens=truncated_tokens,
+            max_new_tokens=100,
+            do_sample=False,
+            temperature=0.1,
+            pad_token_id=tokenizer.eos_token_id,
+            eos_token_id=tokenizer.eos_token_id
+        )
         
         full_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
         if "<|start_header_id|>assistant<|end_header_id|>" in full_text:
@@ -108,21 +280,21 @@ def detect_profanity(prompt: str):
 
 def generate_text(prompt: str, max_tokens: int = 1024) -> str:
     formatted_prompt = format_llama_prompt(prompt)
-    inputs = tokenizer(formatted_prompt, return_tensors="pt").to(model.device)
+    inputs, _ = encode_prompt(formatted_prompt)
     
-    with torch.no_grad():
-        outputs = model.generate(
-            **inputs,
-            max_new_tokens=max_tokens,
-            do_sample=True,
-            temperature=0.7,  # Llama-3.1 최적화 값
-            top_p=0.9,
-            repetition_penalty=1.1,
-            no_repeat_ngram_size=3,
-            pad_token_id=tokenizer.eos_token_id,
-            eos_token_id=tokenizer.eos_token_id,
-            use_cache=True
-        )
+    outputs = timed_generate(
+        "text",
+        inputs,
+        max_new_tokens=max_tokens,
+        do_sample=True,
+        temperature=0.7,  # Llama-3.1 최적화 값
+        top_p=0.9,
+        repetition_penalty=1.1,
+        no_repeat_ngram_size=3,
+        pad_token_id=tokenizer.eos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        use_cache=True
+    )
     
     full_output = tokenizer.decode(outputs[0], skip_special_tokens=True)
     
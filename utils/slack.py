@@ -1,26 +1,145 @@
+import asyncio
+import logging
+import os
+import time
 import traceback
 from datetime import datetime
+from typing import Optional
 
-import requests
+import httpx
 
 from config.config import settings
 
 
-def send_slack_message(error: Exception):
-        now = datetime.now()
-        formatted_time = now.isoformat(sep=' ', timespec='milliseconds')
+class SlackReporter:
+    """예외를 백그라운드에서 모아 Slack 다이제스트로 전송
 
-        error_name = type(error).__name__
-        error_message = str(error)
-        error_stack = traceback.format_exc()
+    - report()는 큐에 넣기만 하므로 요청 처리 경로를 막지 않음 (큐가 가득 차면 버림)
+    - 예외 타입 + 발생 위치가 같은 오류는 하나로 묶고 횟수만 집계
+    - flush_interval마다 묶음 1건으로 전송하고, 분당 전송 수를 제한
+      (한도를 넘으면 다음 주기로 이월해 합산)
+    """
 
-        log_message = f"*🚨[{settings.sentry_environment}]* {formatted_time} ERROR {error_name} - {error_message}\n```{error_stack}```\n<{settings.sentry_repository_uri}|Go-To-Sentry>"
+    def __init__(
+        self,
+        webhook_url: str,
+        flush_interval: float = 10.0,
+        max_queue: int = 1000,
+        max_messages_per_minute: int = 6,
+        max_groups_per_message: int = 10,
+    ):
+        self.webhook_url = webhook_url
+        self.flush_interval = flush_interval
+        self.max_messages_per_minute = max_messages_per_minute
+        self.max_groups_per_message = max_groups_per_message
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._pending: dict = {}  # fingerprint → 집계
+        self._sent_at: list[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.dropped = 0
 
-        payload = {"text": log_message}
+    @staticmethod
+    def _fingerprint(error: Exception) -> tuple:
+        frames = traceback.extract_tb(error.__traceback__)
+        location = f"{os.path.basename(frames[-1].filename)}:{frames[-1].lineno}" if frames else "unknown"
+        return type(error).__name__, location
 
+    def report(self, error: Exception):
+        """예외를 큐에 넣고 즉시 반환"""
+        if self._task is None:
+            return
         try:
-            response = requests.post(settings.slack_webhook_url, json=payload)
+            self._queue.put_nowait((
+                self._fingerprint(error),
+                str(error),
+                "".join(traceback.format_exception(type(error), error, error.__traceback__)),
+                datetime.now(),
+            ))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def start(self):
+        if self._task is None:
+            self._client = httpx.AsyncClient(timeout=5)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # 남은 오류를 마지막으로 전송
+        self._drain()
+        await self._flush(ignore_rate_limit=True)
+        await self._client.aclose()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self._drain()
+            try:
+                await self._flush()
+            except Exception as e:
+                logging.error("Slack 다이제스트 처리 실패: %s", e)
+
+    def _drain(self):
+        while True:
+            try:
+                fingerprint, message, stack, occurred_at = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            group = self._pending.get(fingerprint)
+            if group is None:
+                self._pending[fingerprint] = {
+                    "message": message,
+                    "stack": stack,
+                    "first_at": occurred_at,
+                    "last_at": occurred_at,
+                    "count": 1,
+                }
+            else:
+                group["count"] += 1
+                group["last_at"] = occurred_at
+
+    def _rate_limited(self) -> bool:
+        now = time.monotonic()
+        self._sent_at = [t for t in self._sent_at if now - t < 60]
+        return len(self._sent_at) >= self.max_messages_per_minute
+
+    async def _flush(self, ignore_rate_limit: bool = False):
+        if not self._pending or (not ignore_rate_limit and self._rate_limited()):
+            return
+        groups = sorted(self._pending.items(), key=lambda item: -item[1]["count"])
+        self._pending = {}
+        self._sent_at.append(time.monotonic())
+
+        dropped, self.dropped = self.dropped, 0
+        text = self._format_digest(groups[:self.max_groups_per_message], len(groups), dropped)
+        try:
+            response = await self._client.post(self.webhook_url, json={"text": text})
             response.raise_for_status()
         except Exception as e:
-            print(f"Slack 메시지 전송 실패: {e}")
-            return e
+            logging.error(f"Slack 메시지 전송 실패: {e}")
+
+    def _format_digest(self, groups: list, total_groups: int, dropped: int) -> str:
+        total = sum(group["count"] for _, group in groups)
+        lines = [f"*🚨[{settings.sentry_environment}]* 오류 {total}건 ({total_groups}종)"]
+        for (error_name, location), group in groups:
+            first_at = group["first_at"].isoformat(sep=' ', timespec='milliseconds')
+            lines.append(f"• {first_at} ERROR {error_name} @ {location} ×{group['count']} - {group['message']}")
+        # 가장 많이 발생한 오류의 스택만 첨부
+        lines.append(f"```{groups[0][1]['stack'][-2500:]}```")
+        if total_groups > len(groups):
+            lines.append(f"외 {total_groups - len(groups)}종 생략")
+        if dropped:
+            lines.append(f"큐 초과로 {dropped}건 누락")
+        lines.append(f"<{settings.sentry_repository_uri}|Go-To-Sentry>")
+        return "\n".join(lines)
+
+
+slack_reporter = SlackReporter(settings.slack_webhook_url)
@@ -0,0 +1,100 @@
+# team_cache.py
+import logging
+import threading
+import time
+from typing import Optional
+from config.config import settings
+from utils.db import DB_ERRORS, fetch_all
+
+# KBO 10개 구단 기본 정보 (KBO 사이트 팀 코드 포함, DB 조회 실패 시 폴백)
+DEFAULT_TEAMS = [
+    {"id": 1, "team_name": "KIA", "code": "HT", "stadium": None},
+    {"id": 2, "team_name": "삼성", "code": "SS", "stadium": None},
+    {"id": 3, "team_name": "LG", "code": "LG", "stadium": None},
+    {"id": 4, "team_name": "두산", "code": "OB", "stadium": None},
+    {"id": 5, "team_name": "KT", "code": "KT", "stadium": None},
+    {"id": 6, "team_name": "SSG", "code": "SK", "stadium": None},
+    {"id": 7, "team_name": "롯데", "code": "LT", "stadium": None},
+    {"id": 8, "team_name": "한화", "code": "HH", "stadium": None},
+    {"id": 9, "team_name": "NC", "code": "NC", "stadium": None},
+    {"id": 10, "team_name": "키움", "code": "WO", "stadium": None},
+]
+
+_CODES_BY_NAME = {team["team_name"]: team["code"] for team in DEFAULT_TEAMS}
+
+# 실패 시 재시도 간격(초)
+_RETRY_INTERVAL = 60
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()    # TTL 만료 시 한 호출만 다시 적재
+_teams: list[dict] = []
+_by_id: dict[int, dict] = {}
+_by_name: dict[str, dict] = {}
+_by_code: dict[str, dict] = {}
+_expires_at = 0.0
+
+def _build_index(teams: list[dict]):
+    global _teams, _by_id, _by_name, _by_code
+    _teams = sorted(teams, key=lambda t: t["id"])
+    _by_id = {t["id"]: t for t in _teams}
+    _by_name = {t["team_name"]: t for t in _teams}
+    _by_code = {t["code"]: t for t in _teams if t.get("code")}
+
+def refresh_teams() -> int:
+    """team 테이블을 다시 읽어 캐시를 교체. 실패하면 기존(또는 기본) 데이터를 유지"""
+    global _expires_at
+    try:
+        rows = fetch_all("SELECT id, team_name, stadium FROM team")
+    except DB_ERRORS as e:
+        logging.error("팀 정보 로드 실패: %s", e)
+        rows = []
+
+    with _lock:
+        if rows:
+            _build_index([
+                {
+                    "id": row["id"],
+                    "team_name": row["team_name"],
+                    "code": _CODES_BY_NAME.get(row["team_name"]),
+                    "stadium": row["stadium"],
+                }
+                for row in rows
+            ])
+            _expires_at = time.monotonic() + settings.team_cache_ttl
+        else:
+            if not _teams:
+                _build_index([dict(team) for team in DEFAULT_TEAMS])
+            _expires_at = time.monotonic() + _RETRY_INTERVAL
+        return len(_teams)
+
+def _ensure_loaded():
+    if time.monotonic() < _expires_at:
+        return
+    with _refresh_lock:
+        # 기다리는 동안 다른 호출이 이미 갱신했으면 건너뜀
+        if time.monotonic() >= _expires_at:
+            refresh_teams()
+
+def get_teams() -> list[dict]:
+    _ensure_loaded()
+    return list(_teams)
+
+def get_team_by_id(team_id: int) -> Optional[dict]:
+    _ensure_loaded()
+    return _by_id.get(team_id)
+
+def get_team_by_name(team_name: str) -> Optional[dict]:
+    _ensure_loaded()
+    return _by_name.get(team_name)
+
+def get_team_by_code(code: str) -> Optional[dict]:
+    _ensure_loaded()
+    return _by_code.get(code)
+
+def get_team_id_by_name(team_name: str) -> Optional[int]:
+    team = get_team_by_name(team_name)
+    return team["id"] if team else None
+
+def get_stadium_by_team_name(team_name: str) -> Optional[str]:
+    team = get_team_by_name(team_name)
+    return team["stadium"] if team else None